@@ -0,0 +1,215 @@
+# tp_IA/autojogo.py
+# Jogador automático: decide se um mapa pode ser vencido com as regras do jogo
+# (inimigos custam vida, armadilhas custam duas, a espada quebra no terceiro
+# inimigo) e, se puder, joga a partida no simulador sem tela (estado.EstadoJogo).
+#
+# A busca é sobre (posição, chave, espada e sua durabilidade, vida, baús abertos),
+# mas quase tudo isso se resolve sem enumerar estados:
+#   - perder vida nunca ajuda: atacar um inimigo sem espada não o tira do lugar e
+#     uma armadilha só vira parede, então a vida não entra na busca e inimigos
+#     (sem espada) e armadilhas são paredes;
+#   - abrir um baú só abre passagem, então baús são chão, e a chave e a espada
+#     estão disponíveis assim que o baú delas é alcançável;
+#   - eliminar um inimigo também só abre passagem. O que resta escolher é quais
+#     inimigos eliminar (no máximo a durabilidade da espada): a busca em largura
+#     é sobre esses conjuntos, com uma inundação da área alcançável por conjunto.
+#
+# Exemplo (confere todos os níveis de um pacote em vários processos):
+#   python autojogo.py niveis.tppk --processos 4
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from caminhos import SEM_CAMINHO, campo_distancias
+from estado import DIRECOES, EstadoJogo, Evento
+from grade import Celula
+
+# Células por onde o jogador automático anda (baús são abertos no caminho)
+ANDAVEIS = frozenset((Celula.VAZIO, Celula.BAU, Celula.JOGADOR))
+
+
+def _posicao_saida(mapa):
+    return divmod(bytes(mapa.celulas).index(Celula.SAIDA), mapa.colunas)
+
+
+# ========== BUSCA ==========
+
+def planejar(estado):
+    """Inimigos a eliminar, na ordem, para vencer a partida a partir do estado
+    atual: lista de posições (vazia se não for preciso eliminar nenhum), ou None se
+    o mapa não pode mais ser vencido. Entre os planos possíveis, o de menos
+    inimigos eliminados."""
+    if estado.fim is not None:
+        return [] if estado.fim == 'vitoria' else None
+    mapa = estado.mapa.copiar()  # os inimigos eliminados viram chão só na cópia
+    celulas = mapa.celulas
+    linhas, colunas = mapa.linhas, mapa.colunas
+    inicio = (estado.x, estado.y)
+    i_chave = estado.bau_com_chave[0] * colunas + estado.bau_com_chave[1]
+    i_espada = estado.bau_com_espada[0] * colunas + estado.bau_com_espada[1]
+    saida = _posicao_saida(mapa)
+    i_saida = saida[0] * colunas + saida[1]
+    # A espada ainda pode ser usada se está com o jogador ou se o baú dela está fechado
+    espada_disponivel = estado.tem_espada or celulas[i_espada] == Celula.BAU
+    durabilidade = estado.vida_espada if espada_disponivel else 0
+
+    fila = deque([()])
+    vistos = {frozenset()}
+    while fila:
+        eliminados = fila.popleft()
+        for i in eliminados:
+            celulas[i] = Celula.VAZIO
+        # A inundação dá distância também às vizinhas não passáveis da área alcançada:
+        # baús, inimigos e a saída "alcançados" são os que estão na borda da área
+        distancias = campo_distancias(mapa, inicio, linhas, colunas, ANDAVEIS)
+        for i in eliminados:
+            celulas[i] = Celula.INIMIGO
+        tem_chave = estado.tem_chave or distancias[i_chave] != SEM_CAMINHO
+        if tem_chave and distancias[i_saida] != SEM_CAMINHO:
+            return [divmod(i, colunas) for i in eliminados]
+        tem_espada = estado.tem_espada or (espada_disponivel and distancias[i_espada] != SEM_CAMINHO)
+        if not tem_espada or len(eliminados) >= durabilidade:
+            continue
+        for i, distancia in enumerate(distancias):
+            if distancia != SEM_CAMINHO and celulas[i] == Celula.INIMIGO and i not in eliminados:
+                conjunto = frozenset(eliminados) | {i}
+                if conjunto not in vistos:
+                    vistos.add(conjunto)
+                    fila.append(eliminados + (i,))
+    return None
+
+
+# ========== JOGO AUTOMÁTICO ==========
+
+def _ir_ate(estado, alvo):
+    """Anda pelo caminho mais curto até a célula vizinha de 'alvo' e entra nele
+    (abre o baú, ataca o inimigo ou sai do mapa). Baús no caminho são abertos.
+    Retorna o evento da entrada no alvo, ou None se o jogador já está nele."""
+    mapa = estado.mapa
+    linhas, colunas = mapa.linhas, mapa.colunas
+    celulas = mapa.celulas
+    distancias = campo_distancias(mapa, alvo, linhas, colunas, ANDAVEIS)
+    while True:
+        x, y = estado.x, estado.y
+        distancia = distancias[x * colunas + y]
+        if distancia == 0:
+            return None
+        if distancia == SEM_CAMINHO:
+            raise RuntimeError(f"Sem caminho de {(x, y)} até {alvo}")
+        if distancia == 1:
+            return estado.mover(alvo[0] - x, alvo[1] - y)[0]
+        # Próxima célula do caminho: uma vizinha andável um passo mais perto do alvo
+        for dx, dy in DIRECOES:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < linhas and 0 <= ny < colunas and distancias[nx * colunas + ny] == distancia - 1 \
+                    and celulas[nx * colunas + ny] in ANDAVEIS:
+                break
+        else:
+            raise RuntimeError(f"Nenhuma vizinha de {(x, y)} fica mais perto de {alvo}")
+        evento, _alteradas = estado.mover(dx, dy)
+        if evento not in (Evento.ANDOU, Evento.BAU_VAZIO, Evento.CHAVE, Evento.ESPADA):
+            raise RuntimeError(f"Movimento inesperado no caminho: {evento.name}")
+
+
+def jogar(estado, plano=None):
+    """Joga a partida no simulador até o fim seguindo 'plano' (ver planejar()).
+    Retorna True se venceu; os movimentos ficam no log do estado. Sem plano (mapa
+    que não pode ser vencido) retorna False sem mover."""
+    if plano is None:
+        plano = planejar(estado)
+        if plano is None:
+            return False
+    # Os alvos são conferidos só na hora: o caminho até um alvo anterior pode já ter
+    # aberto o baú da espada ou da chave
+    alvos = []
+    if plano:
+        alvos.append(('espada', estado.bau_com_espada))
+    alvos.extend(('inimigo', posicao) for posicao in plano)
+    alvos.append(('chave', estado.bau_com_chave))
+    alvos.append(('saida', _posicao_saida(estado.mapa)))
+    for tipo, alvo in alvos:
+        if estado.fim is not None:
+            break
+        if (tipo == 'espada' and estado.tem_espada) or (tipo == 'chave' and estado.tem_chave):
+            continue
+        _ir_ate(estado, tuple(alvo))
+    return estado.fim == 'vitoria'
+
+
+def eh_ganhavel(mapa, jogador, bau_com_chave, bau_com_espada):
+    """O mapa gerado pode ser vencido? Joga uma cópia no simulador, então um 'sim'
+    vem de uma partida vencida de fato, não só do plano."""
+    return jogar(EstadoJogo(mapa.copiar(), jogador, bau_com_chave, bau_com_espada))
+
+
+# ========== CONFERÊNCIA EM LOTE ==========
+
+def conferir_niveis(caminho_pacote, niveis):
+    """Executado em cada processo: joga os níveis do pacote e retorna o pid, o tempo
+    gasto, quantos foram vencidos, os que não podem ser vencidos e o total de
+    movimentos das partidas vencidas."""
+    from pacote import LeitorPacote  # só a conferência de pacotes precisa dele
+    inicio = time.perf_counter()
+    vencidos, perdidos, movimentos = 0, [], 0
+    with LeitorPacote(caminho_pacote) as leitor:
+        for n in niveis:
+            mapa, jogador, bau_com_chave, bau_com_espada = leitor.carregar(n)
+            estado = EstadoJogo(mapa, jogador, bau_com_chave, bau_com_espada)  # a Grade já é cópia na escrita
+            if jogar(estado):
+                vencidos += 1
+                movimentos += len(estado.log)
+            else:
+                perdidos.append(n)
+            del mapa, estado  # libera a fatia do mmap antes de fechar o leitor
+    return os.getpid(), time.perf_counter() - inicio, vencidos, perdidos, movimentos
+
+
+def conferir_pacote(caminho_pacote, inicio=0, fim=None, processos=None, tamanho_fatia=200):
+    """Distribui os níveis [inicio, fim) do pacote entre os processos. Retorna
+    (vencidos, níveis que não podem ser vencidos, total de movimentos)."""
+    from lote import dividir_sementes
+    from pacote import LeitorPacote
+    with LeitorPacote(caminho_pacote) as leitor:
+        fim = len(leitor) if fim is None else min(fim, len(leitor))
+    vencidos, perdidos, movimentos = 0, [], 0
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = [executor.submit(conferir_niveis, caminho_pacote, fatia)
+                   for fatia in dividir_sementes(inicio, fim, tamanho_fatia)]
+        for futuro in as_completed(futuros):
+            _pid, _tempo, v, p, m = futuro.result()
+            vencidos += v
+            perdidos.extend(p)
+            movimentos += m
+    return vencidos, sorted(perdidos), movimentos
+
+
+def main(argv=None):
+    from lote import ler_intervalo  # lote importa este módulo
+    parser = argparse.ArgumentParser(description="Confere se os níveis de um pacote podem ser vencidos.")
+    parser.add_argument("pacote")
+    parser.add_argument("--niveis", type=ler_intervalo, default=(0, None),
+                        help="intervalo 'inicio:fim' (padrão: todos)")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="número de processos (padrão: número de CPUs)")
+    parser.add_argument("--fatia", type=int, default=200, help="níveis por tarefa enviada a um processo")
+    args = parser.parse_args(argv)
+
+    inicio, fim = args.niveis
+    comeco = time.perf_counter()
+    vencidos, perdidos, movimentos = conferir_pacote(args.pacote, inicio, fim, args.processos, args.fatia)
+    duracao = time.perf_counter() - comeco
+    total = vencidos + len(perdidos)
+    print(f"{vencidos}/{total} níveis vencidos em {duracao:.2f} s "
+          f"({total / duracao if duracao else 0.0:.0f} níveis/s, "
+          f"{movimentos / vencidos if vencidos else 0.0:.0f} movimentos por partida)")
+    if perdidos:
+        print(f"{len(perdidos)} níveis sem vitória possível: {perdidos[:20]}{' ...' if len(perdidos) > 20 else ''}")
+    return 0 if not perdidos else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,471 @@
+# tp_IA/benchmark.py
+# Medições de desempenho do gerador de mapas e dos trechos quentes do jogo.
+#
+# Exemplos:
+#   python benchmark.py --repeticoes 30
+#   python benchmark.py --secoes varredura micro --json atual.json --base referencia.json
+#   python benchmark.py --secoes varredura --perfil geracao.prof
+#   python benchmark.py --secoes regras --tamanhos 18x18 --cargas 10:12 20:20
+
+import argparse
+import contextlib
+import copy
+import cProfile
+import csv
+import io
+import json
+import os
+import platform
+import pstats
+import random
+import statistics
+import sys
+import time
+
+from gerador import (ErroGeracaoImpossivel, criar_mapa_base, existe_caminho, gerar_mapa_com_backtracking, montar_itens,
+                     resolver_backtracking)
+from grade import Celula
+from indice import IndiceCelulasLivres
+from metricas import Metricas
+from restricoes import REGRAS_DISTANCIA, VerificadorDistancias, eh_distribuicao_valida
+
+
+# ========== ÍNDICE DE CÉLULAS LIVRES x VARREDURA DA GRADE ==========
+
+def medir_posicionamento(linhas, colunas, num_baus, num_inimigos, usar_indice, repeticoes, semente=0,
+                         usar_tabela_espacial=True):
+    """Roda o posicionamento de itens 'repeticoes' vezes e devolve o tempo médio (ms)
+    e a média de passos. Com usar_indice=False o backtracking varre a grade a cada nível;
+    com usar_tabela_espacial=False as distâncias são checadas contra o contexto inteiro."""
+    random.seed(semente)
+    tempo_total = 0.0
+    passos_total = 0
+    for _ in range(repeticoes):
+        mapa = criar_mapa_base(linhas, colunas)
+        itens = montar_itens(num_baus, num_inimigos)
+        estado_busca = {'passos': 0, 'limite_passos': 500}
+
+        inicio = time.perf_counter()
+        if usar_indice:
+            estado_busca['livres'] = IndiceCelulasLivres.do_mapa(mapa, linhas, colunas)
+        if usar_tabela_espacial:
+            estado_busca['restricoes'] = VerificadorDistancias()
+        resolver_backtracking(mapa, itens, {}, estado_busca, linhas, colunas)
+        tempo_total += time.perf_counter() - inicio
+        passos_total += estado_busca['passos']
+    return tempo_total / repeticoes * 1000, passos_total / repeticoes
+
+
+def comparar_indice(tamanhos, num_baus, num_inimigos, repeticoes):
+    """Imprime uma tabela com o tempo de posicionamento com e sem o índice de células livres."""
+    print(f"{'mapa':>10} {'varredura (ms)':>15} {'índice (ms)':>12} {'ganho':>7}")
+    for linhas, colunas in tamanhos:
+        tempo_varredura, _ = medir_posicionamento(linhas, colunas, num_baus, num_inimigos, False, repeticoes)
+        tempo_indice, _ = medir_posicionamento(linhas, colunas, num_baus, num_inimigos, True, repeticoes)
+        ganho = tempo_varredura / tempo_indice if tempo_indice else float("inf")
+        print(f"{f'{linhas}x{colunas}':>10} {tempo_varredura:>15.3f} {tempo_indice:>12.3f} {ganho:>6.1f}x")
+
+
+# ========== TABELA ESPACIAL x CONTEXTO INTEIRO ==========
+
+def comparar_restricoes(linhas, colunas, quantidades, repeticoes):
+    """Imprime o tempo de posicionamento checando as distâncias contra o contexto
+    inteiro e com a tabela espacial, para quantidades crescentes de baús e inimigos."""
+    print(f"{'itens':>10} {'contexto (ms)':>14} {'tabela (ms)':>12} {'ganho':>7}")
+    for quantidade in quantidades:
+        tempo_contexto, _ = medir_posicionamento(linhas, colunas, quantidade, quantidade, True, repeticoes,
+                                                 usar_tabela_espacial=False)
+        tempo_tabela, _ = medir_posicionamento(linhas, colunas, quantidade, quantidade, True, repeticoes)
+        ganho = tempo_contexto / tempo_tabela if tempo_tabela else float("inf")
+        print(f"{2 * quantidade:>10} {tempo_contexto:>14.3f} {tempo_tabela:>12.3f} {ganho:>6.1f}x")
+
+
+# ========== BACKTRACKING x FORWARD CHECKING ==========
+
+def medir_geracao(linhas, colunas, num_baus, num_inimigos, modo, repeticoes):
+    """Gera 'repeticoes' mapas completos no modo dado e devolve a taxa de sucesso,
+    a média de tentativas, a média de passos e o tempo médio (ms) por mapa."""
+    sucessos = tentativas = passos = 0
+    tempo_total = 0.0
+    for semente in range(repeticoes):
+        estatisticas = {}
+        inicio = time.perf_counter()
+        try:
+            gerar_mapa_com_backtracking(linhas, colunas, num_baus, num_inimigos, verboso=False,
+                                        modo=modo, estatisticas=estatisticas, semente=semente)
+            sucessos += 1
+        except ErroGeracaoImpossivel:
+            pass
+        tempo_total += time.perf_counter() - inicio
+        tentativas += estatisticas['tentativas']
+        passos += estatisticas['passos']
+    return (sucessos / repeticoes, tentativas / repeticoes, passos / repeticoes,
+            tempo_total / repeticoes * 1000)
+
+
+def comparar_solvers(configuracoes, repeticoes):
+    """Imprime, lado a lado, passos e tempo de parede dos dois modos de resolução."""
+    print(f"{'configuração':>22} {'modo':>17} {'sucesso':>8} {'tentativas':>11} {'passos':>9} {'tempo (ms)':>11}")
+    for linhas, colunas, num_baus, num_inimigos in configuracoes:
+        rotulo = f"{linhas}x{colunas} b={num_baus} i={num_inimigos}"
+        for modo in ('backtracking', 'forward_checking'):
+            sucesso, tentativas, passos, tempo = medir_geracao(linhas, colunas, num_baus, num_inimigos,
+                                                              modo, repeticoes)
+            print(f"{rotulo:>22} {modo:>17} {sucesso:>8.0%} {tentativas:>11.2f} {passos:>9.1f} {tempo:>11.2f}")
+
+
+# ========== GRADE COMPACTA x LISTA DE LISTAS ==========
+
+def tamanho_lista_de_listas(mapa):
+    """Bytes ocupados pela lista externa e pelas listas das linhas (os símbolos são
+    strings compartilhadas pelo interpretador e não entram na conta)."""
+    return sys.getsizeof(mapa) + sum(sys.getsizeof(linha) for linha in mapa)
+
+
+def comparar_grade(tamanhos, repeticoes):
+    """Imprime memória por mapa e custo de clonagem da Grade contra a lista de listas."""
+    print(f"{'mapa':>10} {'lista (B)':>10} {'grade (B)':>10} {'deepcopy (µs)':>14} {'copiar (µs)':>12}")
+    for linhas, colunas in tamanhos:
+        grade = criar_mapa_base(linhas, colunas)
+        lista = grade.para_lista()
+
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            copy.deepcopy(lista)
+        tempo_lista = (time.perf_counter() - inicio) / repeticoes * 1e6
+
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            grade.copiar()
+        tempo_grade = (time.perf_counter() - inicio) / repeticoes * 1e6
+
+        print(f"{f'{linhas}x{colunas}':>10} {tamanho_lista_de_listas(lista):>10} "
+              f"{sys.getsizeof(grade.celulas):>10} {tempo_lista:>14.1f} {tempo_grade:>12.2f}")
+
+# ========== VARREDURA DE PARÂMETROS ==========
+
+def varrer_geracao(tamanhos, cargas, modos, sementes):
+    """Gera um mapa por semente para cada combinação de tamanho, carga (baús,
+    inimigos) e modo. Imprime uma linha por combinação e devolve os registros."""
+    registros = []
+    print(f"{'mapa':>8} {'baús':>5} {'inim.':>5} {'modo':>17} {'sucesso':>8} {'tentativas':>11} "
+          f"{'passos':>9} {'mediana (ms)':>13} {'média (ms)':>11}")
+    for linhas, colunas in tamanhos:
+        for num_baus, num_inimigos in cargas:
+            for modo in modos:
+                tempos, passos, tentativas, sucessos, relaxados = [], [], [], 0, 0
+                for semente in range(sementes):
+                    estatisticas = {}
+                    inicio = time.perf_counter()
+                    try:
+                        gerar_mapa_com_backtracking(linhas, colunas, num_baus, num_inimigos, verboso=False,
+                                                    modo=modo, estatisticas=estatisticas, semente=semente)
+                        sucessos += 1
+                        relaxados += estatisticas['regras_relaxadas'] is not None
+                    except ErroGeracaoImpossivel:
+                        pass
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+                    passos.append(estatisticas['passos'])
+                    tentativas.append(estatisticas['tentativas'])
+                registro = {
+                    "secao": "varredura",
+                    "nome": f"{linhas}x{colunas} b={num_baus} i={num_inimigos} {modo}",
+                    "linhas": linhas, "colunas": colunas, "baus": num_baus, "inimigos": num_inimigos,
+                    "modo": modo, "sementes": sementes,
+                    "sucesso": sucessos / sementes,
+                    "relaxados": relaxados / sementes,
+                    "tentativas": statistics.fmean(tentativas),
+                    "passos": statistics.fmean(passos),
+                    "tempo_mediana_ms": statistics.median(tempos),
+                    "tempo_medio_ms": statistics.fmean(tempos),
+                    "tempo_max_ms": max(tempos),
+                }
+                registros.append(registro)
+                print(f"{f'{linhas}x{colunas}':>8} {num_baus:>5} {num_inimigos:>5} {modo:>17} "
+                      f"{registro['sucesso']:>8.0%} {registro['tentativas']:>11.2f} {registro['passos']:>9.1f} "
+                      f"{registro['tempo_mediana_ms']:>13.2f} {registro['tempo_medio_ms']:>11.2f}")
+    return registros
+
+
+# ========== DIAGNÓSTICO DAS REGRAS ==========
+
+def diagnosticar_regras(tamanhos, cargas, modos, sementes):
+    """Soma as métricas do gerador (ver metricas.py) em 'sementes' gerações de cada
+    combinação e imprime quantos candidatos cada regra de distância rejeitou, os
+    retrocessos, as rejeições por conectividade e o tempo de cada fase. Mostra qual
+    regra faz a busca explodir em cada configuração."""
+    regras = [regra['nome'] for regra in REGRAS_DISTANCIA] + ['conectividade']
+    registros = []
+    print(f"{'mapa':>8} {'baús':>5} {'inim.':>5} {'modo':>17} "
+          + " ".join(f"{regra:>18}" for regra in regras)
+          + f" {'retrocessos':>12} {'busca (ms)':>11} {'valid. (ms)':>12}")
+    for linhas, colunas in tamanhos:
+        for num_baus, num_inimigos in cargas:
+            for modo in modos:
+                metricas = Metricas()
+                for semente in range(sementes):
+                    try:
+                        gerar_mapa_com_backtracking(linhas, colunas, num_baus, num_inimigos, modo=modo,
+                                                    semente=semente, metricas=metricas)
+                    except ErroGeracaoImpossivel:
+                        pass  # as métricas da tentativa frustrada também contam
+                contadores = metricas.contadores
+                retrocessos = sum(valor for nome, valor in contadores.items() if nome.startswith('retrocessos.'))
+                registro = {
+                    "secao": "regras",
+                    "nome": f"{linhas}x{colunas} b={num_baus} i={num_inimigos} {modo}",
+                    "linhas": linhas, "colunas": colunas, "baus": num_baus, "inimigos": num_inimigos,
+                    "modo": modo, "sementes": sementes,
+                    "retrocessos": retrocessos / sementes,
+                    "tempo_busca_ms": metricas.tempos['fase.busca'] / sementes * 1000,
+                    "tempo_validacao_ms": metricas.tempos['fase.validacao'] / sementes * 1000,
+                }
+                for regra in regras:
+                    registro[f"rejeicoes_{regra}"] = contadores[f'rejeicoes.{regra}'] / sementes
+                registros.append(registro)
+                print(f"{f'{linhas}x{colunas}':>8} {num_baus:>5} {num_inimigos:>5} {modo:>17} "
+                      + " ".join(f"{registro[f'rejeicoes_{regra}']:>18.1f}" for regra in regras)
+                      + f" {registro['retrocessos']:>12.1f} {registro['tempo_busca_ms']:>11.2f}"
+                      f" {registro['tempo_validacao_ms']:>12.3f}")
+    return registros
+
+
+# ========== MICROBENCHMARKS ==========
+
+def cronometrar(funcao, repeticoes, lotes=5):
+    """Tempo por chamada (µs) de funcao(): o melhor de 'lotes' lotes de 'repeticoes'
+    chamadas, para reduzir o ruído de outros processos."""
+    melhor = float("inf")
+    for _ in range(lotes):
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor / repeticoes * 1e6
+
+
+def contexto_do_mapa(mapa, bau_com_chave, bau_com_espada):
+    """Reconstrói o contexto (tipo -> posição) de um mapa gerado, como o gerador o deixa."""
+    contexto = {'CHAVE': bau_com_chave, 'ESPADA': bau_com_espada}
+    contadores = {}
+    nomes = {Celula.JOGADOR: 'JOGADOR', Celula.SAIDA: 'SAIDA', Celula.BAU: 'BAU',
+             Celula.INIMIGO: 'INIMIGO', Celula.ARMADILHA: 'ARMADILHA'}
+    for indice, codigo in enumerate(mapa.celulas):
+        pos = divmod(indice, mapa.colunas)
+        nome = nomes.get(codigo)
+        if nome is None or pos in (bau_com_chave, bau_com_espada):
+            continue
+        if nome in ('JOGADOR', 'SAIDA'):
+            contexto[nome] = pos
+        else:
+            contadores[nome] = contadores.get(nome, -1) + 1
+            contexto[f'{nome}_{contadores[nome]}'] = pos
+    return contexto
+
+
+def _registro_micro(nome, linhas, colunas, microssegundos):
+    print(f"{nome:>32} {f'{linhas}x{colunas}':>9} {microssegundos:>12.2f}")
+    return {"secao": "micro", "nome": f"{nome} {linhas}x{colunas}", "linhas": linhas, "colunas": colunas,
+            "us_por_chamada": microssegundos}
+
+
+def medir_micro(tamanhos, repeticoes):
+    """Tempo por chamada das funções chamadas a cada passo da busca ou a cada quadro:
+    existe_caminho, eh_distribuicao_valida, mover (e desfazer/refazer o log de
+    movimentos) e desenhar_mapa (em uma superfície
+    fora da tela, com o driver de vídeo 'dummy' se não houver outro definido)."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    import config
+    from estado import EstadoJogo
+    from jogo import mover
+    from renderizador import Camera, desenhar_mapa
+
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))  # permite converter os sprites para o formato da tela
+
+    registros = []
+    print(f"{'função':>32} {'mapa':>9} {'µs/chamada':>12}")
+    for linhas, colunas in tamanhos:
+        num_itens = max(2, linhas * colunas // 60)
+        mapa, jogador, bau_com_chave, bau_com_espada = gerar_mapa_com_backtracking(
+            linhas, colunas, num_itens, num_itens, verboso=False, modo='forward_checking', semente=0)
+        contexto = contexto_do_mapa(mapa, bau_com_chave, bau_com_espada)
+
+        # Busca em largura completa: do baú da chave até a saída
+        registros.append(_registro_micro("existe_caminho", linhas, colunas, cronometrar(
+            lambda: existe_caminho(mapa, bau_com_chave, contexto['SAIDA'], linhas, colunas), repeticoes)))
+
+        # Checagem de distância contra o contexto inteiro, em posições de chão variadas
+        livres = [divmod(i, colunas) for i, codigo in enumerate(mapa.celulas) if codigo == Celula.VAZIO]
+        proxima = iter(livres * (repeticoes * 5 // len(livres) + 1)).__next__
+        registros.append(_registro_micro("eh_distribuicao_valida", linhas, colunas, cronometrar(
+            lambda: eh_distribuicao_valida(contexto, 'BAU_extra', proxima()), repeticoes)))
+
+        # Movimento de ida e volta entre duas células de chão vizinhas
+        r, c = next((r, c) for r, c in livres if (r, c + 1) in set(livres))
+        copia = mapa.copiar()
+        copia.definir(r, c, Celula.JOGADOR)
+        estado = EstadoJogo(copia, dict(jogador, x=r, y=c), bau_com_chave, bau_com_espada)
+        passos = iter([1, -1] * (repeticoes * 5)).__next__
+        with contextlib.redirect_stdout(io.StringIO()):  # mover() imprime mensagens do jogo
+            tempo = cronometrar(lambda: mover(0, passos(), estado), repeticoes)
+        registros.append(_registro_micro("mover (chão)", linhas, colunas, tempo))
+
+        # Desfazer e refazer o log gravado acima, por movimento (as idas e voltas são em
+        # número par, então o jogador termina cada etapa na célula de partida)
+        log = bytes(estado.log)
+        registros.append(_registro_micro("desfazer", linhas, colunas, cronometrar(estado.desfazer, len(log), 1)))
+        registros.append(_registro_micro("reproduzir (por movimento)", linhas, colunas, cronometrar(
+            lambda: estado.reproduzir(log), 1, 1) / len(log)))
+        estado.log = bytearray()
+        registros.append(_registro_micro("avancar (por movimento)", linhas, colunas, cronometrar(
+            lambda: estado.avancar(log), 1, 1) / len(log)))
+
+        # Redesenho completo do mapa em uma superfície fora da tela
+        superficie = pygame.Surface((colunas * config.TAMANHO_CELULA,
+                                     linhas * config.TAMANHO_CELULA + config.HUD_HEIGHT))
+        registros.append(_registro_micro("desenhar_mapa (fora da tela)", linhas, colunas, cronometrar(
+            lambda: desenhar_mapa(superficie, mapa, linhas, colunas), max(1, repeticoes // 100))))
+
+        # Só a parte visível, como no jogo: o custo depende da janela, não do mapa
+        camera = Camera(linhas, colunas, config.COLUNAS_VISIVEIS * config.TAMANHO_CELULA,
+                        config.LINHAS_VISIVEIS * config.TAMANHO_CELULA)
+        camera.mirar(linhas // 2, colunas // 2)
+        camera.pular()
+        registros.append(_registro_micro("desenhar_mapa (visão da câmera)", linhas, colunas, cronometrar(
+            lambda: desenhar_mapa(superficie, mapa, linhas, colunas, camera), max(1, repeticoes // 100))))
+    pygame.display.quit()
+    return registros
+
+
+# ========== SAÍDA E COMPARAÇÃO ==========
+
+def gravar_json(caminho, registros):
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump({
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "resultados": registros,
+        }, arquivo, indent=2, ensure_ascii=False)
+
+
+def gravar_csv(caminho, registros):
+    campos = []
+    for registro in registros:
+        campos.extend(campo for campo in registro if campo not in campos)
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=campos)
+        escritor.writeheader()
+        escritor.writerows(registros)
+
+
+# Métrica comparada entre execuções em cada seção
+METRICAS = {"varredura": "tempo_mediana_ms", "micro": "us_por_chamada"}
+
+
+def comparar_com_base(registros, caminho_base, tolerancia):
+    """Compara as métricas com as de um JSON gravado antes. Imprime as medições que
+    ficaram mais de 'tolerancia' (fração) mais lentas e devolve quantas foram."""
+    with open(caminho_base, encoding="utf-8") as arquivo:
+        base = {(r["secao"], r["nome"]): r for r in json.load(arquivo)["resultados"]}
+    regressoes = 0
+    for registro in registros:
+        metrica = METRICAS.get(registro["secao"])
+        anterior = base.get((registro["secao"], registro["nome"]))
+        if metrica is None or anterior is None or not anterior.get(metrica):
+            continue
+        razao = registro[metrica] / anterior[metrica]
+        if razao > 1 + tolerancia:
+            regressoes += 1
+            print(f"REGRESSÃO {registro['nome']}: {anterior[metrica]:.2f} -> {registro[metrica]:.2f} "
+                  f"{metrica} ({razao:.2f}x)")
+    if not regressoes:
+        print(f"Nenhuma regressão acima de {tolerancia:.0%} em relação a {caminho_base}.")
+    return regressoes
+
+
+def ler_tamanho(texto):
+    """Converte '18x18' (ou apenas '18', mapa quadrado) em (linhas, colunas)."""
+    linhas, _, colunas = texto.lower().partition("x")
+    return int(linhas), int(colunas or linhas)
+
+
+def ler_carga(texto):
+    """Converte 'baus:inimigos' em (baus, inimigos)."""
+    baus, _, inimigos = texto.partition(":")
+    return int(baus), int(inimigos or baus)
+
+
+def main(argv=None):
+    secoes = ["indice", "restricoes", "solvers", "grade", "varredura", "regras", "micro"]
+    parser = argparse.ArgumentParser(description="Benchmarks do gerador de mapas e do laço do jogo.")
+    parser.add_argument("--baus", type=int, default=6)
+    parser.add_argument("--inimigos", type=int, default=8)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--secoes", nargs="+", default=secoes, choices=secoes, help="quais comparações rodar")
+    parser.add_argument("--tamanhos", nargs="+", type=ler_tamanho,
+                        default=[(12, 12), (15, 15), (18, 18), (30, 30), (50, 50)],
+                        help="tamanhos da varredura e dos microbenchmarks (ex.: 18x18)")
+    parser.add_argument("--cargas", nargs="+", type=ler_carga, default=[(3, 3), (6, 8), (10, 12)],
+                        help="quantidades 'baus:inimigos' da varredura")
+    parser.add_argument("--modos", nargs="+", default=["backtracking", "forward_checking"],
+                        choices=["backtracking", "forward_checking"])
+    parser.add_argument("--sementes", type=int, default=10, help="sementes por combinação da varredura")
+    parser.add_argument("--json", help="grava os resultados da varredura e dos microbenchmarks em JSON")
+    parser.add_argument("--csv", help="grava os mesmos resultados em CSV")
+    parser.add_argument("--base", help="JSON de uma execução anterior; aponta as medições mais lentas")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="fração de piora aceita na comparação com --base (padrão: 0.2)")
+    parser.add_argument("--perfil", help="roda sob cProfile e grava as estatísticas neste arquivo "
+                                         "(abra com snakeviz ou converta em flamegraph com flameprof)")
+    args = parser.parse_args(argv)
+
+    perfilador = cProfile.Profile() if args.perfil else None
+    if perfilador:
+        perfilador.enable()
+
+    registros = []
+    if "indice" in args.secoes:
+        tamanhos = [(18, 18), (50, 50), (100, 100), (200, 200)]
+        comparar_indice(tamanhos, args.baus, args.inimigos, args.repeticoes)
+        print()
+    if "restricoes" in args.secoes:
+        comparar_restricoes(60, 60, [10, 20, 40, 80], args.repeticoes)
+        print()
+    if "solvers" in args.secoes:
+        # As configurações densas fazem o backtracking simples esgotar tentativas (leva segundos)
+        configuracoes = [(18, 18, 10, 10), (18, 18, 30, 30), (18, 18, 38, 20), (18, 18, 40, 20)]
+        comparar_solvers(configuracoes, args.repeticoes)
+        print()
+    if "grade" in args.secoes:
+        comparar_grade([(18, 18), (100, 100), (500, 500)], args.repeticoes)
+        print()
+    if "varredura" in args.secoes:
+        registros += varrer_geracao(args.tamanhos, args.cargas, args.modos, args.sementes)
+        print()
+    if "regras" in args.secoes:
+        registros += diagnosticar_regras(args.tamanhos, args.cargas, args.modos, args.sementes)
+        print()
+    if "micro" in args.secoes:
+        registros += medir_micro(args.tamanhos, max(args.repeticoes, 100))
+        print()
+
+    if perfilador:
+        perfilador.disable()
+        perfilador.dump_stats(args.perfil)
+        pstats.Stats(perfilador).sort_stats("cumulative").print_stats(25)
+        print(f"Perfil gravado em {args.perfil}")
+
+    if args.json:
+        gravar_json(args.json, registros)
+    if args.csv:
+        gravar_csv(args.csv, registros)
+    if args.base:
+        return 1 if comparar_com_base(registros, args.base, args.tolerancia) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+# tp_IA/cache_mapas.py
+# Cache persistente de mapas já resolvidos. Com semente fixa a geração é
+# determinística, então (linhas, colunas, baús, inimigos, semente, modo, regras)
+# identifica o mapa: a chave é o resumo desses valores e o arquivo guarda o mapa
+# em formato binário compacto. Na frente do disco fica um LRU em memória, e o
+# diretório é limitado a um número de arquivos, descartando os menos usados. A
+# lista dos arquivos (na ordem de uso) fica em memória: o diretório é lido ao
+# abrir o cache e de novo a cada RELEITURA gravações, para enxergar os arquivos
+# gravados ou apagados por outros processos que usam o mesmo diretório. Só a
+# primeira leitura ordena pela data de modificação; as seguintes mantêm a ordem de
+# uso já conhecida (um acerto na memória não toca no arquivo).
+
+import hashlib
+import os
+import struct
+import tempfile
+from collections import OrderedDict
+
+from grade import Grade
+from restricoes import assinatura_regras
+
+# Muda sempre que o formato do arquivo ou o algoritmo de geração mudar, para que
+# entradas antigas deixem de ser encontradas
+VERSAO_FORMATO = 3
+MAGICA = b'TPMC'
+EXTENSAO = '.mapa'
+
+# Cabeçalho: mágica, versão, linhas, colunas e as posições (linha, coluna) do
+# jogador, do baú da chave e do baú da espada. Depois vêm as células, duas por
+# byte (os códigos de Celula cabem em 4 bits).
+_CABECALHO = struct.Struct('<4sB8H')
+
+_ASSINATURA_PADRAO = assinatura_regras()
+
+RELEITURA = 1000  # gravações entre duas leituras do diretório
+
+
+# ========== FORMATO BINÁRIO ==========
+
+def codificar(mapa, pos_jogador, bau_com_chave, bau_com_espada):
+    """Serializa o mapa e as posições especiais em bytes."""
+    celulas = mapa.celulas
+    pares = bytearray((len(celulas) + 1) // 2)
+    for i, codigo in enumerate(celulas):
+        pares[i >> 1] |= codigo << (4 * (i & 1))
+    return _CABECALHO.pack(MAGICA, VERSAO_FORMATO, mapa.linhas, mapa.colunas,
+                           *pos_jogador, *bau_com_chave, *bau_com_espada) + bytes(pares)
+
+
+def decodificar(dados):
+    """Inverso de codificar(): retorna (mapa, pos_jogador, bau_com_chave, bau_com_espada).
+    Levanta ValueError se os bytes não forem de um mapa desta versão."""
+    if len(dados) < _CABECALHO.size:
+        raise ValueError("Arquivo de mapa truncado")
+    magica, versao, linhas, colunas, jr, jc, cr, cc, er, ec = _CABECALHO.unpack_from(dados)
+    if magica != MAGICA or versao != VERSAO_FORMATO:
+        raise ValueError("Arquivo de mapa com formato desconhecido")
+    n = linhas * colunas
+    pares = dados[_CABECALHO.size:]
+    if len(pares) != (n + 1) // 2:
+        raise ValueError("Arquivo de mapa truncado")
+    celulas = bytearray(n)
+    for i in range(n):
+        celulas[i] = (pares[i >> 1] >> (4 * (i & 1))) & 0x0F
+    return Grade(linhas, colunas, celulas), (jr, jc), (cr, cc), (er, ec)
+
+
+# ========== CACHE ==========
+
+class CacheMapas:
+    """Cache de mapas em dois níveis: LRU em memória e arquivos em 'diretorio'.
+
+    obter() devolve sempre uma cópia do mapa, então o chamador pode alterá-lo à
+    vontade (o jogo altera o mapa a cada movimento)."""
+
+    def __init__(self, diretorio, max_arquivos=10000, max_memoria=256):
+        self.diretorio = diretorio
+        self.max_arquivos = max_arquivos
+        self.max_memoria = max_memoria
+        self.memoria = OrderedDict()  # chave -> (mapa, pos_jogador, chave, espada)
+        self.arquivos = OrderedDict()  # chave -> None, do usado há mais tempo ao mais recente
+        self.acertos = 0
+        self.falhas = 0
+        os.makedirs(diretorio, exist_ok=True)
+        self._ler_diretorio()
+
+    @staticmethod
+    def chave(linhas, colunas, num_baus, num_inimigos, semente, modo, regras=None, limites_caminho=None,
+              relaxar=True, ordem='essenciais'):
+        """Chave (hex) do mapa gerado com estes parâmetros."""
+        assinatura = _ASSINATURA_PADRAO if regras is None else assinatura_regras(regras)
+        texto = f"{VERSAO_FORMATO}|{linhas}|{colunas}|{num_baus}|{num_inimigos}|{semente}|{modo}|{assinatura}"
+        if limites_caminho is not None:
+            texto += f"|{tuple(limites_caminho)}"
+        if not relaxar:
+            texto += "|estrito"
+        if ordem != 'essenciais':
+            texto += f"|{ordem}"
+        return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave + EXTENSAO)
+
+    def _lembrar(self, chave, entrada):
+        self.memoria[chave] = entrada
+        self.memoria.move_to_end(chave)
+        while len(self.memoria) > self.max_memoria:
+            self.memoria.popitem(last=False)
+
+    def obter(self, chave):
+        """Retorna (mapa, pos_jogador, bau_com_chave, bau_com_espada) ou None."""
+        entrada = self.memoria.get(chave)
+        if entrada is not None:
+            self.memoria.move_to_end(chave)
+        else:
+            caminho = self._caminho(chave)
+            try:
+                with open(caminho, 'rb') as arquivo:
+                    entrada = decodificar(arquivo.read())
+                os.utime(caminho)  # marca como usado recentemente para o descarte LRU
+            except (OSError, ValueError):
+                self.falhas += 1
+                return None
+            self._lembrar(chave, entrada)
+        if chave in self.arquivos:
+            self.arquivos.move_to_end(chave)
+        self.acertos += 1
+        mapa, pos_jogador, bau_com_chave, bau_com_espada = entrada
+        return mapa.copiar(), pos_jogador, bau_com_chave, bau_com_espada
+
+    def guardar(self, chave, mapa, pos_jogador, bau_com_chave, bau_com_espada):
+        """Grava o mapa no disco (escrita atômica) e na memória."""
+        entrada = (mapa.copiar(), tuple(pos_jogador), tuple(bau_com_chave), tuple(bau_com_espada))
+        dados = codificar(*entrada)
+        descritor, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+        with os.fdopen(descritor, 'wb') as arquivo:
+            arquivo.write(dados)
+        os.replace(temporario, self._caminho(chave))
+        self._lembrar(chave, entrada)
+        self.arquivos[chave] = None
+        self.arquivos.move_to_end(chave)
+        self.gravacoes += 1
+        if self.gravacoes % RELEITURA == 0:
+            self._ler_diretorio()
+        if len(self.arquivos) > self.max_arquivos:
+            self._descartar_excesso()
+
+    def _ler_diretorio(self):
+        """Atualiza a lista de arquivos com o diretório. Os arquivos já conhecidos
+        mantêm a sua ordem de uso; os novos (todos, na primeira leitura) entram como
+        os mais recentes, em ordem de data de modificação."""
+        encontrados = []
+        for entrada in os.scandir(self.diretorio):
+            if entrada.name.endswith(EXTENSAO):
+                try:
+                    estado = entrada.stat()
+                except OSError:
+                    continue  # apagado por outro processo que usa o mesmo diretório
+                encontrados.append((estado.st_mtime, entrada.name[:-len(EXTENSAO)]))
+        encontrados.sort()
+        presentes = {chave for _mtime, chave in encontrados}
+        arquivos = OrderedDict((chave, None) for chave in self.arquivos if chave in presentes)
+        for _mtime, chave in encontrados:
+            arquivos.setdefault(chave)
+        self.arquivos = arquivos
+        self.gravacoes = 0
+
+    def _descartar_excesso(self):
+        """Apaga os arquivos usados há mais tempo até o diretório voltar ao limite."""
+        while len(self.arquivos) > self.max_arquivos:
+            chave, _ = self.arquivos.popitem(last=False)
+            try:
+                os.remove(self._caminho(chave))
+            except OSError:
+                pass  # já apagado por outro processo
+            self.memoria.pop(chave, None)
+
+    def limpar(self):
+        """Remove todas as entradas (memória e disco)."""
+        self.memoria.clear()
+        self.arquivos.clear()
+        for entrada in os.scandir(self.diretorio):
+            if entrada.name.endswith(EXTENSAO):
+                os.remove(entrada.path)
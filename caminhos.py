@@ -0,0 +1,238 @@
+# tp_IA/caminhos.py
+# Busca de caminhos para o gerador e para o jogo. existe_caminho (gerador.py) só
+# responde sim ou não; aqui ficam:
+#   - campos de distância: uma busca em largura a partir de um ponto (jogador,
+#     chave, saída) dá a distância de todas as células até ele, então o tamanho
+#     de qualquer rota até esse ponto e o próximo passo dela saem em O(1);
+#   - CamposDistancia: os campos de um mapa, calculados uma vez e atualizados
+#     quando uma célula muda (baú aberto, inimigo eliminado...) em vez de refeitos;
+#   - A*: a rota mais barata entre dois pontos com custos por tipo de célula, por
+#     exemplo para saber se a saída só é alcançável passando por inimigos.
+#
+# Como em existe_caminho, anda-se pelas células passáveis e o ponto de chegada
+# pode ser de qualquer tipo (o jogador e a saída ficam na parede da borda). No
+# campo isso vira: toda célula vizinha de uma passável alcançada recebe distância,
+# mas só as passáveis continuam a busca.
+
+import heapq
+from array import array
+from collections import deque
+
+from grade import PASSAVEIS, Celula
+
+SEM_CAMINHO = -1
+
+# Nos campos o próprio jogador não bloqueia a passagem: ele sai da célula ao andar
+PASSAVEIS_CAMPO = PASSAVEIS | {Celula.JOGADOR}
+
+# Custo de entrar em cada tipo de célula no A* (None = intransponível). Inimigos
+# e armadilhas custam vida, então só entram na rota quando não há alternativa.
+CUSTOS_PADRAO = {
+    Celula.PAREDE: None,
+    Celula.VAZIO: 1,
+    Celula.JOGADOR: 1,
+    Celula.SAIDA: 1,
+    Celula.BAU: 1,
+    Celula.INIMIGO: 8,
+    Celula.ARMADILHA: 16,
+    Celula.ARMADILHA_ATIVA: None,
+}
+
+
+def _vizinhos(i, linhas, colunas):
+    x, y = divmod(i, colunas)
+    if x > 0:
+        yield i - colunas
+    if x < linhas - 1:
+        yield i + colunas
+    if y > 0:
+        yield i - 1
+    if y < colunas - 1:
+        yield i + 1
+
+
+# ========== CAMPOS DE DISTÂNCIA ==========
+
+def campo_distancias(mapa, origem, linhas, colunas, passaveis=PASSAVEIS_CAMPO):
+    """Busca em largura a partir de 'origem'. Retorna um array com a distância (em
+    passos) de cada célula até a origem, ou SEM_CAMINHO onde não há caminho."""
+    celulas = mapa.celulas
+    distancias = array('i', [SEM_CAMINHO]) * (linhas * colunas)
+    inicio = origem[0] * colunas + origem[1]
+    distancias[inicio] = 0
+    fila = deque([inicio])
+    while fila:
+        i = fila.popleft()
+        proxima = distancias[i] + 1
+        for j in _vizinhos(i, linhas, colunas):
+            if distancias[j] == SEM_CAMINHO:
+                distancias[j] = proxima
+                if celulas[j] in passaveis:
+                    fila.append(j)
+    return distancias
+
+
+def _propagar_abertura(distancias, celulas, i, linhas, colunas, passaveis):
+    """Célula i passou a ser passável: as distâncias só podem diminuir, e só a partir
+    dela. Refaz a busca em largura apenas na região que melhora."""
+    melhor = distancias[i]
+    for j in _vizinhos(i, linhas, colunas):
+        if distancias[j] != SEM_CAMINHO and celulas[j] in passaveis and \
+                (melhor == SEM_CAMINHO or distancias[j] + 1 < melhor):
+            melhor = distancias[j] + 1
+    if melhor == SEM_CAMINHO:
+        return  # continua isolada da origem
+    distancias[i] = melhor
+    fila = deque([i])
+    while fila:
+        k = fila.popleft()
+        proxima = distancias[k] + 1
+        for j in _vizinhos(k, linhas, colunas):
+            if distancias[j] == SEM_CAMINHO or proxima < distancias[j]:
+                distancias[j] = proxima
+                if celulas[j] in passaveis:
+                    fila.append(j)
+
+
+class CamposDistancia:
+    """Campos de distância de um mapa, um por ponto de interesse, guardados para
+    consulta em O(1).
+
+    pontos é um dict nome -> (linha, coluna), por exemplo {'CHAVE': ..., 'SAIDA': ...}.
+    Depois de mudar células do mapa, chame atualizar(celulas_alteradas): uma célula
+    que abriu passagem só propaga a melhora a partir dela; uma que fechou passagem
+    (raro no jogo) refaz os campos."""
+
+    def __init__(self, mapa, linhas, colunas, pontos, passaveis=PASSAVEIS_CAMPO):
+        self.mapa = mapa
+        self.linhas = linhas
+        self.colunas = colunas
+        self.pontos = dict(pontos)
+        self.passaveis = passaveis
+        self.passavel = bytearray(codigo in passaveis for codigo in mapa.celulas)
+        self.campos = {nome: campo_distancias(mapa, pos, linhas, colunas, passaveis)
+                       for nome, pos in self.pontos.items()}
+
+    def distancia(self, nome, pos):
+        """Passos de 'pos' até o ponto 'nome', ou SEM_CAMINHO."""
+        return self.campos[nome][pos[0] * self.colunas + pos[1]]
+
+    def proximo_passo(self, nome, pos):
+        """Vizinho de 'pos' um passo mais perto do ponto 'nome' (None se já chegou ou
+        se não há caminho). Serve para dicas e para a IA dos inimigos."""
+        campo = self.campos[nome]
+        colunas = self.colunas
+        i = pos[0] * colunas + pos[1]
+        atual = campo[i]
+        if atual <= 0:
+            return None
+        celulas = self.mapa.celulas
+        for j in _vizinhos(i, self.linhas, colunas):
+            # O passo precisa ser passável, a não ser que seja a própria chegada
+            if campo[j] == atual - 1 and (campo[j] == 0 or celulas[j] in self.passaveis):
+                return divmod(j, colunas)
+        return None
+
+    def rota(self, nome, pos):
+        """Lista de posições de 'pos' até o ponto 'nome' (inclusive), ou None."""
+        if self.distancia(nome, pos) == SEM_CAMINHO:
+            return None
+        rota = [tuple(pos)]
+        while True:
+            passo = self.proximo_passo(nome, rota[-1])
+            if passo is None:
+                return rota
+            rota.append(passo)
+
+    def atualizar(self, alteradas):
+        """Ajusta os campos às células (linha, coluna) que mudaram no mapa."""
+        celulas = self.mapa.celulas
+        fechou = False
+        abertas = []
+        for r, c in alteradas:
+            i = r * self.colunas + c
+            agora = celulas[i] in self.passaveis
+            if agora != self.passavel[i]:
+                self.passavel[i] = agora
+                if agora:
+                    abertas.append(i)
+                else:
+                    fechou = True
+        if fechou:
+            self.campos = {nome: campo_distancias(self.mapa, pos, self.linhas, self.colunas, self.passaveis)
+                           for nome, pos in self.pontos.items()}
+            return
+        for campo in self.campos.values():
+            for i in abertas:
+                _propagar_abertura(campo, celulas, i, self.linhas, self.colunas, self.passaveis)
+
+
+def comprimentos_criticos(mapa, contexto, linhas, colunas):
+    """Comprimento das rotas jogador -> chave e chave -> saída com uma única busca
+    (o campo da chave). Retorna (jogador_chave, chave_saida), com SEM_CAMINHO onde
+    não há rota."""
+    campo = campo_distancias(mapa, contexto['CHAVE'], linhas, colunas, PASSAVEIS)
+    jogador, saida = contexto['JOGADOR'], contexto['SAIDA']
+    return campo[jogador[0] * colunas + jogador[1]], campo[saida[0] * colunas + saida[1]]
+
+
+# ========== A* ==========
+
+def a_estrela(mapa, inicio, fim, linhas, colunas, custos=CUSTOS_PADRAO):
+    """Rota mais barata de 'inicio' até 'fim' (inclusive) somando o custo de cada
+    célula em que se entra; 'fim' sempre pode ser a chegada. Retorna (custo, rota)
+    ou None se não houver caminho."""
+    celulas = mapa.celulas
+    tabela = [custos.get(codigo) for codigo in range(len(Celula))]
+    menor_custo = min(custo for custo in tabela if custo is not None)
+    origem = inicio[0] * colunas + inicio[1]
+    destino = fim[0] * colunas + fim[1]
+    fx, fy = fim
+
+    def estimativa(i):
+        x, y = divmod(i, colunas)
+        return (abs(x - fx) + abs(y - fy)) * menor_custo
+
+    custo_ate = {origem: 0}
+    anterior = {origem: None}
+    abertos = [(estimativa(origem), 0, origem)]
+    while abertos:
+        _f, custo, i = heapq.heappop(abertos)
+        if i == destino:
+            rota = []
+            while i is not None:
+                rota.append(divmod(i, colunas))
+                i = anterior[i]
+            return custo, rota[::-1]
+        if custo > custo_ate[i]:
+            continue  # entrada velha da fila
+        for j in _vizinhos(i, linhas, colunas):
+            passo = tabela[celulas[j]]
+            if passo is None:
+                if j != destino:
+                    continue
+                passo = menor_custo
+            novo = custo + passo
+            if novo < custo_ate.get(j, novo + 1):
+                custo_ate[j] = novo
+                anterior[j] = i
+                heapq.heappush(abertos, (novo + estimativa(j), novo, j))
+    return None
+
+
+def analisar_rota(mapa, inicio, fim, linhas, colunas, custos=CUSTOS_PADRAO):
+    """Resumo da rota mais barata para pontuar a dificuldade de um mapa: custo,
+    comprimento e quantos inimigos e armadilhas ela obriga a atravessar. None se
+    não houver caminho."""
+    resultado = a_estrela(mapa, inicio, fim, linhas, colunas, custos)
+    if resultado is None:
+        return None
+    custo, rota = resultado
+    codigos = [mapa.codigo(r, c) for r, c in rota[1:-1]]
+    return {
+        'custo': custo,
+        'comprimento': len(rota) - 1,
+        'inimigos': codigos.count(Celula.INIMIGO),
+        'armadilhas': codigos.count(Celula.ARMADILHA),
+        'rota': rota,
+    }
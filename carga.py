@@ -0,0 +1,181 @@
+# tp_IA/carga.py
+# Cliente do servidor de partidas (servidor.py) e teste de carga: abre algumas
+# conexões, cria milhares de sessões espalhadas entre elas, faz todas jogarem ao
+# mesmo tempo com movimentos aleatórios e mede a latência de cada movimento (do
+# envio até a resposta), mostrando os percentis.
+#
+# Exemplo (com o servidor já rodando):
+#   python carga.py --porta 8765 --conexoes 20 --sessoes 2000 --movimentos 200
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+from grade import Grade
+from servidor import (CRIADA, CRIAR, DERROTA, DESFAZER, ENCERRAR, ERRO, MOVER, RESPOSTAS, VITORIA, empacotar,
+                      ler_mensagem)
+
+
+class ErroServidor(RuntimeError):
+    """O servidor respondeu ERRO; 'codigo' é um dos códigos de servidor.py."""
+
+    def __init__(self, codigo):
+        super().__init__(f"Erro do servidor (código {codigo})")
+        self.codigo = codigo
+
+
+class ClienteJogo:
+    """Uma conexão com o servidor. Várias sessões podem usar a mesma conexão ao
+    mesmo tempo: as respostas trazem a sessão (ou o pedido, em CRIAR) e uma tarefa
+    de leitura entrega cada uma a quem está esperando. Cada sessão espera a
+    resposta de um pedido antes de mandar o próximo."""
+
+    def __init__(self, leitor, escritor):
+        self.leitor = leitor
+        self.escritor = escritor
+        self.pedidos = {}   # pedido de CRIAR -> futuro
+        self.esperando = {}  # sessão -> futuro da resposta pendente
+        self.proximo_pedido = 1
+        self.leitura = asyncio.create_task(self._ler())
+
+    @classmethod
+    async def conectar(cls, porta=None, caminho_unix=None):
+        if caminho_unix:
+            leitor, escritor = await asyncio.open_unix_connection(caminho_unix)
+        else:
+            leitor, escritor = await asyncio.open_connection('127.0.0.1', porta)
+        return cls(leitor, escritor)
+
+    async def _ler(self):
+        try:
+            while True:
+                tipo, valores = await ler_mensagem(self.leitor, RESPOSTAS)
+                if tipo == CRIADA:
+                    pedido, sessao, linhas, colunas, semente = valores
+                    celulas = bytearray(await self.leitor.readexactly(linhas * colunas))
+                    self.pedidos.pop(pedido).set_result((sessao, semente, Grade(linhas, colunas, celulas)))
+                elif tipo == ERRO:
+                    ident, tipo_pedido, codigo = valores
+                    futuros = self.pedidos if tipo_pedido == CRIAR else self.esperando
+                    futuro = futuros.pop(ident, None)
+                    if futuro is not None:
+                        futuro.set_exception(ErroServidor(codigo))
+                else:
+                    self.esperando.pop(valores[0]).set_result(valores[1:])
+        except (asyncio.IncompleteReadError, ConnectionError) as erro:
+            for futuro in [*self.pedidos.values(), *self.esperando.values()]:
+                if not futuro.done():
+                    futuro.set_exception(ConnectionError(f"Conexão encerrada: {erro}"))
+
+    def _enviar(self, futuros, chave, mensagem):
+        futuro = asyncio.get_running_loop().create_future()
+        futuros[chave] = futuro
+        self.escritor.write(mensagem)
+        return futuro
+
+    async def criar(self, linhas, colunas, num_baus, num_inimigos, semente=-1):
+        """Cria uma sessão. Retorna (sessão, semente, Grade com o mapa inicial)."""
+        pedido = self.proximo_pedido
+        self.proximo_pedido += 1
+        return await self._enviar(self.pedidos, pedido,
+                                  empacotar(CRIAR, pedido, linhas, colunas, num_baus, num_inimigos, semente))
+
+    async def mover(self, sessao, direcao):
+        """Move o jogador da sessão (direção = índice em estado.DIRECOES). Retorna
+        (evento, vida, situação, durabilidade da espada)."""
+        return await self._enviar(self.esperando, sessao, empacotar(MOVER, sessao, direcao))
+
+    async def desfazer(self, sessao):
+        return await self._enviar(self.esperando, sessao, empacotar(DESFAZER, sessao))
+
+    async def encerrar(self, sessao):
+        await self._enviar(self.esperando, sessao, empacotar(ENCERRAR, sessao))
+
+    async def fechar(self):
+        self.escritor.close()
+        await self.escritor.wait_closed()
+        self.leitura.cancel()
+
+
+# ========== TESTE DE CARGA ==========
+
+def percentil(ordenados, fracao):
+    """Valor no percentil 'fracao' (0 a 1) de uma lista já ordenada."""
+    return ordenados[min(len(ordenados) - 1, int(fracao * len(ordenados)))]
+
+
+async def _jogar(cliente, sessao, movimentos, rng, latencias):
+    """Faz 'movimentos' movimentos aleatórios na sessão (depois do fim da partida o
+    servidor continua respondendo, com o movimento bloqueado)."""
+    fins = 0
+    relogio = time.perf_counter
+    for _ in range(movimentos):
+        inicio = relogio()
+        _evento, _vida, situacao, _durabilidade = await cliente.mover(sessao, rng.randrange(4))
+        latencias.append(relogio() - inicio)
+        fins = situacao & (VITORIA | DERROTA)
+    return fins
+
+
+async def testar_carga(porta, caminho_unix, conexoes, sessoes, movimentos, linhas, colunas, num_baus,
+                       num_inimigos, semente=0):
+    """Cria todas as sessões, joga todas ao mesmo tempo e encerra. Retorna um dict
+    com os tempos das fases e as latências dos movimentos, em segundos."""
+    rng = random.Random(semente)
+    clientes = [await ClienteJogo.conectar(porta, caminho_unix) for _ in range(conexoes)]
+    try:
+        inicio = time.perf_counter()
+        criadas = await asyncio.gather(*(
+            clientes[n % conexoes].criar(linhas, colunas, num_baus, num_inimigos, semente + n)
+            for n in range(sessoes)))
+        tempo_criacao = time.perf_counter() - inicio
+
+        latencias = []
+        inicio = time.perf_counter()
+        fins = await asyncio.gather(*(
+            _jogar(clientes[n % conexoes], sessao, movimentos, random.Random(rng.random()), latencias)
+            for n, (sessao, _semente, _mapa) in enumerate(criadas)))
+        tempo_jogo = time.perf_counter() - inicio
+
+        await asyncio.gather(*(clientes[n % conexoes].encerrar(sessao)
+                               for n, (sessao, _semente, _mapa) in enumerate(criadas)))
+    finally:
+        for cliente in clientes:
+            await cliente.fechar()
+    return {"tempo_criacao": tempo_criacao, "tempo_jogo": tempo_jogo, "latencias": latencias,
+            "partidas_encerradas": sum(1 for fim in fins if fim)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor de partidas.")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="caminho do socket Unix do servidor")
+    parser.add_argument("--conexoes", type=int, default=20)
+    parser.add_argument("--sessoes", type=int, default=1000, help="sessões simultâneas")
+    parser.add_argument("--movimentos", type=int, default=100, help="movimentos por sessão")
+    parser.add_argument("--linhas", type=int, default=14)
+    parser.add_argument("--colunas", type=int, default=14)
+    parser.add_argument("--baus", type=int, default=10)
+    parser.add_argument("--inimigos", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    resultado = asyncio.run(testar_carga(args.porta, args.unix, args.conexoes, args.sessoes, args.movimentos,
+                                         args.linhas, args.colunas, args.baus, args.inimigos))
+    latencias = sorted(resultado["latencias"])
+    print(f"{args.sessoes} sessões criadas em {resultado['tempo_criacao']:.2f} s "
+          f"({args.sessoes / resultado['tempo_criacao']:.0f} mapas/s)")
+    print(f"{len(latencias)} movimentos em {resultado['tempo_jogo']:.2f} s "
+          f"({len(latencias) / resultado['tempo_jogo']:.0f} movimentos/s), "
+          f"{resultado['partidas_encerradas']} partidas terminaram")
+    print("latência (ms): " + ", ".join(
+        f"p{rotulo} {percentil(latencias, fracao) * 1000:.2f}"
+        for rotulo, fracao in (("50", 0.5), ("90", 0.9), ("99", 0.99), ("99.9", 0.999)))
+        + f", máx {latencias[-1] * 1000:.2f}, média {statistics.fmean(latencias) * 1000:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# tp_IA/conectividade.py
+# Acompanha a conectividade do chão do mapa enquanto o gerador coloca e retira
+# itens que bloqueiam a passagem (inimigos e armadilhas), sem refazer uma busca
+# em largura a cada passo.
+#
+# A ideia é olhar para as barreiras em vez do chão: as células bloqueadas (paredes
+# da borda + bloqueios) são unidas em componentes com vizinhança de 8 células, em
+# uma union-find que pode ser desfeita em pilha. Um novo bloqueio só consegue
+# separar o chão em duas partes se fechar um laço, isto é, se encostar duas vezes,
+# por lados diferentes, na mesma barreira. Enquanto nenhum laço estiver fechado,
+# todo o chão é uma única região e qualquer consulta é respondida em O(1); só
+# depois de um laço é que uma busca em largura é feita (e guardada até a próxima
+# mudança).
+
+from collections import deque
+
+from grade import Celula
+
+# Células que bloqueiam a passagem dentro do interior
+CODIGOS_BLOQUEIO = frozenset((Celula.INIMIGO, Celula.ARMADILHA, Celula.ARMADILHA_ATIVA))
+
+# Vizinhança de 8 células em ordem circular (N, NE, L, SE, S, SO, O, NO)
+_ANEL = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+_ORTOGONAIS = {0, 2, 4, 6}  # posições do anel que são vizinhas diretas
+
+
+def portal(pos, linhas, colunas):
+    """Célula do interior por onde se entra em uma porta da borda (jogador ou saída)."""
+    r, c = pos
+    if r == 0:
+        return 1, c
+    if r == linhas - 1:
+        return r - 1, c
+    if c == 0:
+        return r, 1
+    return r, c - 1
+
+
+class ConectividadeIncremental:
+    """Union-find das barreiras com desfazer, para responder "o jogador alcança a
+    chave e a chave alcança a saída?" a cada passo da busca."""
+
+    def __init__(self, mapa, linhas, colunas):
+        self.linhas, self.colunas = linhas, colunas
+        n = linhas * colunas
+        self.pai = list(range(n))
+        self.tamanho = [1] * n
+        self.bloqueado = bytearray(n)
+        self.historico = []   # uniões feitas, para desfazer: (filho, tamanho_antigo_do_pai)
+        self.pilha = []       # por bloqueio: (posição, nº de uniões antes, fechou_laco)
+        self.lacos = 0        # bloqueios na pilha que fecharam um laço
+        self.versao = 0
+        self._cache = (-1, None, None)  # (versao, origem, células alcançáveis)
+
+        # A borda inteira é uma única barreira (portas entram pelo portal, ver portal())
+        raiz = 0
+        for r in range(linhas):
+            for c in range(colunas):
+                if r in (0, linhas - 1) or c in (0, colunas - 1):
+                    i = r * colunas + c
+                    self.bloqueado[i] = 1
+                    if i != raiz:
+                        self.pai[i] = raiz
+                        self.tamanho[raiz] += 1
+
+        # Bloqueios que já estejam no mapa entram pelo mesmo caminho incremental
+        celulas = mapa.celulas
+        for r in range(1, linhas - 1):
+            for c in range(1, colunas - 1):
+                if celulas[r * colunas + c] in CODIGOS_BLOQUEIO:
+                    self.bloquear((r, c))
+
+    # ---------- union-find com desfazer ----------
+
+    def _raiz(self, i):
+        pai = self.pai
+        while pai[i] != i:
+            i = pai[i]
+        return i
+
+    def _unir(self, a, b):
+        a, b = self._raiz(a), self._raiz(b)
+        if a == b:
+            return
+        if self.tamanho[a] < self.tamanho[b]:
+            a, b = b, a
+        self.historico.append((b, self.tamanho[a]))
+        self.pai[b] = a
+        self.tamanho[a] += self.tamanho[b]
+
+    # ---------- bloqueios ----------
+
+    def _fecha_laco(self, r, c):
+        """Diz se bloquear (r, c) fecha um laço, olhando o anel de 8 vizinhos: se duas
+        sequências de células bloqueadas que separam trechos de chão pertencem à mesma
+        barreira, o chão ao redor da célula fica dividido em dois lados."""
+        colunas, bloqueado = self.colunas, self.bloqueado
+        anel = [bloqueado[(r + dr) * colunas + (c + dc)] for dr, dc in _ANEL]
+        if all(anel) or not any(anel):
+            return False
+
+        # Lê o anel a partir do começo de uma sequência bloqueada, de modo que ele se
+        # divide em pares (sequência bloqueada, sequência de chão)
+        inicio = next(k for k in range(8) if anel[k] and not anel[k - 1])
+        pares = []  # [raiz da barreira, o chão seguinte toca a célula por um lado?]
+        for k in range(8):
+            indice = (inicio + k) % 8
+            if anel[indice]:
+                if not pares or pares[-1][1] is not None:
+                    dr, dc = _ANEL[indice]
+                    pares.append([self._raiz((r + dr) * colunas + (c + dc)), None])
+            else:
+                pares[-1][1] = bool(pares[-1][1]) or indice in _ORTOGONAIS
+
+        # Chão só na diagonal não chega à célula: as barreiras dos dois lados dele são
+        # a mesma sequência (já estão unidas pela diagonal) e contam uma vez só
+        raizes = []
+        trechos_de_chao = 0
+        juntar = False
+        for raiz, ortogonal in pares:
+            if not juntar:
+                raizes.append(raiz)
+            juntar = not ortogonal
+            trechos_de_chao += ortogonal
+        if juntar and len(raizes) > 1:
+            raizes.pop(0)  # o último trecho diagonal liga a última barreira à primeira
+        if trechos_de_chao < 2:
+            return False
+        return len(set(raizes)) < len(raizes)
+
+    def bloquear(self, pos):
+        """Registra um bloqueio (inimigo ou armadilha) em 'pos'. Desfeito por desbloquear()."""
+        r, c = pos
+        colunas = self.colunas
+        fechou_laco = self._fecha_laco(r, c)
+        self.pilha.append((pos, len(self.historico), fechou_laco))
+        if fechou_laco:
+            self.lacos += 1
+
+        i = r * colunas + c
+        self.bloqueado[i] = 1
+        for dr, dc in _ANEL:
+            j = (r + dr) * colunas + (c + dc)
+            if self.bloqueado[j]:
+                self._unir(i, j)
+        self.versao += 1
+
+    def desbloquear(self):
+        """Desfaz o último bloquear() (a ordem de pilha do backtracking é obrigatória)."""
+        pos, unioes, fechou_laco = self.pilha.pop()
+        historico, pai, tamanho = self.historico, self.pai, self.tamanho
+        while len(historico) > unioes:
+            filho, tamanho_antigo = historico.pop()
+            tamanho[pai[filho]] = tamanho_antigo
+            pai[filho] = filho
+        if fechou_laco:
+            self.lacos -= 1
+        self.bloqueado[pos[0] * self.colunas + pos[1]] = 0
+        self.versao += 1
+
+    # ---------- consultas ----------
+
+    def _alcancaveis(self, origem):
+        """Células de chão alcançáveis a partir de 'origem' (guardadas até a próxima mudança)."""
+        versao, origem_cache, alcancaveis = self._cache
+        if versao == self.versao and origem_cache == origem:
+            return alcancaveis
+        colunas, bloqueado = self.colunas, self.bloqueado
+        inicio = origem[0] * colunas + origem[1]
+        alcancaveis = {inicio}
+        fila = deque([inicio])
+        while fila:
+            i = fila.popleft()
+            for j in (i - colunas, i + colunas, i - 1, i + 1):
+                if not bloqueado[j] and j not in alcancaveis:
+                    alcancaveis.add(j)
+                    fila.append(j)
+        self._cache = (self.versao, origem, alcancaveis)
+        return alcancaveis
+
+    def conectados(self, pontos):
+        """Diz se todas as células de chão em 'pontos' estão na mesma região."""
+        colunas, bloqueado = self.colunas, self.bloqueado
+        for r, c in pontos:
+            if bloqueado[r * colunas + c]:
+                return False
+        if self.lacos == 0 or len(pontos) < 2:
+            return True  # nenhum laço fechado: o chão é uma região só
+        alcancaveis = self._alcancaveis(pontos[0])
+        return all(r * colunas + c in alcancaveis for r, c in pontos[1:])
+
+    def caminhos_criticos_ok(self, contexto):
+        """Versão incremental de verificar_caminhos_criticos para o meio da busca: com
+        os itens já posicionados, jogador, chave e saída continuam interligados?"""
+        pontos = []
+        for tipo in ('JOGADOR', 'CHAVE', 'SAIDA'):
+            pos = contexto.get(tipo)
+            if pos is not None:
+                pontos.append(pos if tipo == 'CHAVE' else portal(pos, self.linhas, self.colunas))
+        return self.conectados(pontos)
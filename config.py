@@ -1,4 +1,11 @@
 # tp_IA/config.py
 
 TAMANHO_CELULA = 45 # Tamanho de cada célula do jogo
-HUD_HEIGHT = 60  # Altura da HUD
\ No newline at end of file
+HUD_HEIGHT = 60  # Altura da HUD
+
+# Mapas maiores que a janela rolam com a câmera (ver renderizador.Camera)
+LINHAS_VISIVEIS = 14  # Máximo de linhas do mapa mostradas de uma vez
+COLUNAS_VISIVEIS = 20  # Máximo de colunas do mapa mostradas de uma vez
+SUAVIDADE_CAMERA = 0.25  # Fração da distância até o alvo que a câmera anda por quadro
+LADO_MINIMAPA = 160  # Lado máximo do minimapa, em pixels
+MAPA_MAXIMO = 500  # Maior número de linhas ou colunas aceito na configuração do jogo
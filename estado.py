@@ -0,0 +1,362 @@
+# tp_IA/estado.py
+# Estado do jogo guardado por eventos. Cada movimento que muda alguma coisa vira
+# um byte acrescentado ao log do EstadoJogo: o evento (o que aconteceu) nos bits
+# altos e a direção do movimento nos dois bits baixos. O evento e a direção
+# bastam para desfazer o movimento sem guardar cópia do mapa, então desfazer é
+# O(1); e como a geração é determinística, semente + log refazem uma partida
+# inteira (Sessao), o que permite gravar partidas e conferi-las depois.
+#
+# Exemplo:
+#   python estado.py info sessao.tps
+#   python estado.py conferir sessao.tps
+
+import argparse
+import struct
+import sys
+from enum import IntEnum
+
+from grade import Celula
+
+# Direções na ordem do código guardado no log: (linha, coluna)
+DIRECOES = ((-1, 0), (1, 0), (0, -1), (0, 1))
+CODIGO_DIRECAO = {direcao: codigo for codigo, direcao in enumerate(DIRECOES)}
+
+
+class Evento(IntEnum):
+    """Resultado de um movimento. Os eventos até VITORIA mudam o estado e vão para o
+    log; os outros só informam por que nada aconteceu."""
+    ANDOU = 0
+    BAU_VAZIO = 1
+    CHAVE = 2
+    ESPADA = 3
+    INIMIGO_DERROTADO = 4
+    ESPADA_QUEBROU = 5      # derrotou o inimigo e a espada quebrou
+    ATACADO = 6
+    ARMADILHA = 7
+    VITORIA = 8
+    BLOQUEADO = 9           # parede, armadilha ativa, fora do mapa ou jogo já encerrado
+    SEM_CHAVE = 10          # chegou à saída sem a chave
+
+
+# Eventos que mudam a célula de destino, com o código que ela recebe e o código
+# que tinha antes (usado para desfazer)
+_CELULA_APOS = {
+    Evento.BAU_VAZIO: (Celula.VAZIO, Celula.BAU),
+    Evento.CHAVE: (Celula.VAZIO, Celula.BAU),
+    Evento.ESPADA: (Celula.VAZIO, Celula.BAU),
+    Evento.INIMIGO_DERROTADO: (Celula.VAZIO, Celula.INIMIGO),
+    Evento.ESPADA_QUEBROU: (Celula.VAZIO, Celula.INIMIGO),
+    Evento.ARMADILHA: (Celula.ARMADILHA_ATIVA, Celula.ARMADILHA),
+}
+DANO_INIMIGO = 1
+DANO_ARMADILHA = 2
+
+
+def codificar_evento(evento, direcao):
+    """Byte do log para um evento e uma direção (dx, dy)."""
+    return evento << 2 | CODIGO_DIRECAO[direcao]
+
+
+def decodificar_evento(byte):
+    """Inverso de codificar_evento(): (Evento, (dx, dy))."""
+    return Evento(byte >> 2), DIRECOES[byte & 3]
+
+
+class ErroReproducao(ValueError):
+    """O log não corresponde ao mapa: refazer um movimento deu outro evento."""
+
+
+# ========== ESTADO DO JOGO ==========
+
+class EstadoJogo:
+    """Mapa, jogador e log de uma partida. mover() aplica um movimento e o registra;
+    desfazer() volta o último; reproduzir() e avancar() aplicam um log gravado.
+
+    Os campos do jogador também podem ser lidos como no dicionário antigo
+    (estado["vida"]), para o renderizador e as dicas."""
+
+    __slots__ = ('mapa', 'x', 'y', 'tem_chave', 'tem_espada', 'vida_espada', 'vida',
+                 'bau_com_chave', 'bau_com_espada', 'venceu', 'log')
+
+    def __init__(self, mapa, jogador, bau_com_chave, bau_com_espada):
+        self.mapa = mapa
+        self.x, self.y = jogador["x"], jogador["y"]
+        self.tem_chave = jogador["tem_chave"]
+        self.tem_espada = jogador["tem_espada"]
+        self.vida_espada = jogador["vida_espada"]
+        self.vida = jogador["vida"]
+        self.bau_com_chave = tuple(bau_com_chave)
+        self.bau_com_espada = tuple(bau_com_espada)
+        self.venceu = False
+        self.log = bytearray()
+
+    def __getitem__(self, campo):
+        return getattr(self, campo)
+
+    @property
+    def fim(self):
+        """'vitoria', 'derrota' ou None enquanto a partida continua."""
+        if self.venceu:
+            return 'vitoria'
+        return 'derrota' if self.vida <= 0 else None
+
+    def mover(self, dx, dy):
+        """Tenta mover o jogador em (dx, dy), tratando baús, inimigos, armadilhas e
+        a saída. Retorna (evento, células que mudaram) para o redesenho."""
+        if self.fim is not None:
+            return Evento.BLOQUEADO, []
+        mapa = self.mapa
+        colunas = mapa.colunas
+        x, y = self.x, self.y
+        nx, ny = x + dx, y + dy
+        if not (0 <= nx < mapa.linhas and 0 <= ny < colunas):
+            return Evento.BLOQUEADO, []
+        celulas = mapa.celulas
+        i_destino = nx * colunas + ny
+        destino = celulas[i_destino]
+
+        if destino == Celula.VAZIO:
+            celulas[i_destino] = Celula.JOGADOR
+            celulas[x * colunas + y] = Celula.VAZIO
+            self.x, self.y = nx, ny
+            alteradas = [(nx, ny), (x, y)]
+            evento = Evento.ANDOU
+        elif destino == Celula.BAU:
+            if (nx, ny) == self.bau_com_chave:
+                self.tem_chave = True
+                evento = Evento.CHAVE
+            elif (nx, ny) == self.bau_com_espada:
+                self.tem_espada = True
+                evento = Evento.ESPADA
+            else:
+                evento = Evento.BAU_VAZIO
+            celulas[i_destino] = Celula.VAZIO  # baú aberto vira chão
+            alteradas = [(nx, ny)]
+        elif destino == Celula.INIMIGO:
+            if self.tem_espada:
+                celulas[i_destino] = Celula.VAZIO  # inimigo eliminado vira chão
+                self.vida_espada -= 1
+                evento = Evento.INIMIGO_DERROTADO
+                if self.vida_espada <= 0:
+                    self.tem_espada = False
+                    evento = Evento.ESPADA_QUEBROU
+                alteradas = [(nx, ny)]
+            else:
+                self.vida -= DANO_INIMIGO
+                evento = Evento.ATACADO
+                alteradas = []
+        elif destino == Celula.ARMADILHA:
+            self.vida -= DANO_ARMADILHA
+            celulas[i_destino] = Celula.ARMADILHA_ATIVA
+            evento = Evento.ARMADILHA
+            alteradas = [(nx, ny)]
+        elif destino == Celula.SAIDA:
+            if not self.tem_chave:
+                return Evento.SEM_CHAVE, []
+            self.venceu = True
+            evento = Evento.VITORIA
+            alteradas = []
+        else:
+            return Evento.BLOQUEADO, []  # parede ou armadilha já ativa
+        self.log.append(evento << 2 | CODIGO_DIRECAO[(dx, dy)])
+        return evento, alteradas
+
+    def desfazer(self):
+        """Desfaz o último movimento do log. Retorna (evento desfeito, células que
+        mudaram), ou (None, []) se o log estiver vazio."""
+        if not self.log:
+            return None, []
+        evento, (dx, dy) = decodificar_evento(self.log.pop())
+        celulas = self.mapa.celulas
+        colunas = self.mapa.colunas
+        x, y = self.x, self.y
+        if evento == Evento.ANDOU:
+            ox, oy = x - dx, y - dy
+            celulas[x * colunas + y] = Celula.VAZIO
+            celulas[ox * colunas + oy] = Celula.JOGADOR
+            self.x, self.y = ox, oy
+            return evento, [(x, y), (ox, oy)]
+        if evento == Evento.VITORIA:
+            self.venceu = False
+            return evento, []
+        if evento == Evento.ATACADO:
+            self.vida += DANO_INIMIGO
+            return evento, []
+
+        alvo = (x + dx, y + dy)
+        celulas[alvo[0] * colunas + alvo[1]] = _CELULA_APOS[evento][1]
+        if evento == Evento.CHAVE:
+            self.tem_chave = False
+        elif evento == Evento.ESPADA:
+            self.tem_espada = False
+        elif evento in (Evento.INIMIGO_DERROTADO, Evento.ESPADA_QUEBROU):
+            self.vida_espada += 1
+            if evento == Evento.ESPADA_QUEBROU:
+                self.tem_espada = True
+        elif evento == Evento.ARMADILHA:
+            self.vida += DANO_ARMADILHA
+        return evento, [alvo]
+
+    def reproduzir(self, log):
+        """Refaz cada movimento do log pela direção gravada, conferindo se o evento
+        é o mesmo. Levanta ErroReproducao na primeira divergência."""
+        mover = self.mover
+        for n, byte in enumerate(log):
+            gravado, (dx, dy) = decodificar_evento(byte)
+            evento, _alteradas = mover(dx, dy)
+            if evento != gravado:
+                raise ErroReproducao(f"Movimento {n}: esperado {gravado.name}, obtido {evento.name}")
+
+    def avancar(self, log):
+        """Aplica um log inteiro de uma vez, sem renderizar nem conferir os eventos
+        (o log precisa ter sido gravado a partir deste estado).
+
+        Não refaz movimento por movimento: a posição final é a soma dos passos, cada
+        célula alterada só muda uma vez (baú, inimigo e armadilha não voltam) e a vida
+        e a espada saem da contagem de cada evento. O custo continua linear no tamanho
+        do log (cada byte é lido por translate, count e pela soma dos passos), mas com
+        pouco trabalho por byte; o laço em Python roda uma vez por item tocado."""
+        log = bytes(log)
+        if not log:
+            return
+        if self.fim is not None:
+            raise ErroReproducao("A partida já terminou")
+        mapa = self.mapa
+        colunas = mapa.colunas
+        celulas = mapa.celulas
+        deslocamentos = [dx * colunas + dy for dx, dy in DIRECOES]
+        # Quanto cada byte do log move o jogador (só ANDOU move) e se muda uma célula
+        passo = [0] * 256
+        for codigo, deslocamento in enumerate(deslocamentos):
+            passo[Evento.ANDOU << 2 | codigo] = deslocamento
+        tabela_altera = bytearray(256)
+        for evento in _CELULA_APOS:
+            for codigo in range(4):
+                tabela_altera[evento << 2 | codigo] = 1
+        eventos = log.translate(bytes(byte >> 2 for byte in range(256)))
+
+        # Células alteradas: a posição do jogador em cada uma sai da soma dos passos
+        # desde a anterior
+        inicio = posicao = self.x * colunas + self.y
+        alteradas = log.translate(tabela_altera)
+        anterior = 0
+        k = alteradas.find(1)
+        while k >= 0:
+            posicao += sum(map(passo.__getitem__, log[anterior:k]))
+            celulas[posicao + deslocamentos[log[k] & 3]] = _CELULA_APOS[eventos[k]][0]
+            anterior = k
+            k = alteradas.find(1, k + 1)
+        posicao += sum(map(passo.__getitem__, log[anterior:]))
+
+        celulas[inicio] = Celula.VAZIO
+        celulas[posicao] = Celula.JOGADOR
+        self.x, self.y = divmod(posicao, colunas)
+        contagem = eventos.count
+        quebras = contagem(Evento.ESPADA_QUEBROU)
+        self.vida -= DANO_INIMIGO * contagem(Evento.ATACADO) + DANO_ARMADILHA * contagem(Evento.ARMADILHA)
+        self.vida_espada -= contagem(Evento.INIMIGO_DERROTADO) + quebras
+        self.tem_chave = self.tem_chave or Evento.CHAVE in eventos
+        if Evento.ESPADA in eventos:
+            self.tem_espada = not quebras or eventos.rindex(Evento.ESPADA) > eventos.rindex(Evento.ESPADA_QUEBROU)
+        elif quebras:
+            self.tem_espada = False
+        self.venceu = eventos[-1] == Evento.VITORIA
+        self.log += log
+
+
+# ========== SESSÕES GRAVADAS ==========
+
+# Cabeçalho do arquivo de sessão: mágica, versão, linhas, colunas, baús, inimigos,
+# modo (índice em gerador.MODOS), semente; depois vem o log, um byte por evento
+_MAGICA = b'TPSS'
+_VERSAO = 1
+_CABECALHO = struct.Struct('<4sB4HBq')
+
+
+class Sessao:
+    """Partida gravada: os parâmetros do gerador, a semente e o log de eventos."""
+
+    __slots__ = ('linhas', 'colunas', 'num_baus', 'num_inimigos', 'modo', 'semente', 'log')
+
+    def __init__(self, linhas, colunas, num_baus, num_inimigos, semente, log=None, modo='backtracking'):
+        self.linhas = linhas
+        self.colunas = colunas
+        self.num_baus = num_baus
+        self.num_inimigos = num_inimigos
+        self.modo = modo
+        self.semente = semente
+        self.log = bytearray() if log is None else log
+
+    def estado_inicial(self):
+        """Refaz o mapa da semente e devolve o EstadoJogo do início da partida."""
+        from gerador import gerar_mapa_com_backtracking  # só quem refaz a partida precisa do gerador
+        return EstadoJogo(*gerar_mapa_com_backtracking(self.linhas, self.colunas, self.num_baus,
+                                                       self.num_inimigos, modo=self.modo, semente=self.semente))
+
+    def gravar(self, caminho):
+        from gerador import MODOS
+        with open(caminho, 'wb') as arquivo:
+            arquivo.write(_CABECALHO.pack(_MAGICA, _VERSAO, self.linhas, self.colunas, self.num_baus,
+                                          self.num_inimigos, MODOS.index(self.modo), self.semente))
+            arquivo.write(self.log)
+
+    @classmethod
+    def ler(cls, caminho):
+        """Lê uma sessão gravada. Levanta ValueError se o arquivo não for uma sessão."""
+        from gerador import MODOS
+        with open(caminho, 'rb') as arquivo:
+            dados = arquivo.read()
+        if len(dados) < _CABECALHO.size:
+            raise ValueError("Arquivo de sessão truncado")
+        magica, versao, linhas, colunas, num_baus, num_inimigos, modo, semente = _CABECALHO.unpack_from(dados)
+        if magica != _MAGICA or versao != _VERSAO:
+            raise ValueError("Arquivo de sessão com formato desconhecido")
+        return cls(linhas, colunas, num_baus, num_inimigos, semente, bytearray(dados[_CABECALHO.size:]),
+                   modo=MODOS[modo])
+
+
+def conferir(sessao):
+    """Refaz a sessão movimento a movimento e também com avancar(), e compara os
+    dois estados finais. Retorna o estado final; levanta ErroReproducao se o log
+    divergir do mapa ou se os dois caminhos não chegarem ao mesmo estado."""
+    passo_a_passo = sessao.estado_inicial()
+    passo_a_passo.reproduzir(sessao.log)
+    rapido = sessao.estado_inicial()
+    rapido.avancar(sessao.log)
+    for campo in EstadoJogo.__slots__:
+        if campo != 'mapa' and getattr(passo_a_passo, campo) != getattr(rapido, campo):
+            raise ErroReproducao(f"Avanço rápido divergiu em '{campo}'")
+    if bytes(passo_a_passo.mapa.celulas) != bytes(rapido.mapa.celulas):
+        raise ErroReproducao("Avanço rápido divergiu no mapa")
+    return passo_a_passo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspeciona e confere partidas gravadas.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    for comando, ajuda in (("info", "resumo da sessão"),
+                           ("conferir", "refaz a partida e confere cada evento do log")):
+        sub.add_parser(comando, help=ajuda).add_argument("sessoes", nargs="+")
+    args = parser.parse_args(argv)
+
+    falhas = 0
+    for caminho in args.sessoes:
+        sessao = Sessao.ler(caminho)
+        if args.comando == "info":
+            print(f"{caminho}: mapa {sessao.linhas}x{sessao.colunas}, {sessao.num_baus} baús, "
+                  f"{sessao.num_inimigos} inimigos, modo {sessao.modo}, semente {sessao.semente}, "
+                  f"{len(sessao.log)} eventos")
+            continue
+        try:
+            estado = conferir(sessao)
+        except ErroReproducao as erro:
+            falhas += 1
+            print(f"{caminho}: FALHOU - {erro}")
+        else:
+            print(f"{caminho}: ok ({len(sessao.log)} eventos, fim: {estado.fim or 'em andamento'}, "
+                  f"vida {estado.vida})")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
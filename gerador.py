@@ -0,0 +1,576 @@
+# tp_IA/gerador.py
+# Geração de mapas sem interface: não importa pygame, tkinter nem as imagens,
+# então pode ser usado por ferramentas de linha de comando e processos filhos.
+
+import math
+import random
+from collections import deque
+
+from caminhos import SEM_CAMINHO, comprimentos_criticos
+from grade import CODIGOS, PASSAVEIS, Celula, Grade
+from indice import IndiceCelulasLivres
+from metricas import escolher
+from restricoes import (REGRAS_DISTANCIA, VerificadorDistancias, categoria, eh_distribuicao_valida,
+                        relaxar_regras, tabela_minimos)
+from propagacao import resolver_forward_checking
+from conectividade import CODIGOS_BLOQUEIO, ConectividadeIncremental
+
+# Limite de passos de uma tentativa de tamanho fixo, por modo de resolução (usado
+# nos blocos de regioes.py). Um passo do forward checking custa mais, mas poda
+# muito mais do que um passo do backtracking simples.
+LIMITE_PASSOS = {
+    'backtracking': 500,
+    'forward_checking': 5000,
+}
+
+# Orçamento adaptativo da geração (ver orcamento_busca), em passos por item a
+# posicionar: a tentativa k recebe UNIDADE_LUBY * luby(k) passos e a geração para
+# quando gastar ORCAMENTO_TOTAL; os dois crescem com a dificuldade estimada.
+UNIDADE_LUBY = {
+    'backtracking': 2,
+    'forward_checking': 1,
+}
+ORCAMENTO_TOTAL = {
+    'backtracking': 30,
+    'forward_checking': 20,
+}
+# Teto de passos da geração inteira, somando todos os níveis de regras: mesmo
+# mapas enormes ou muito densos devolvem ErroGeracaoImpossivel em tempo limitado
+PASSOS_MAXIMOS = 10000
+# Acima desta dificuldade o mapa quase nunca sai com as regras completas: em vez de
+# gastar mais passos, o orçamento volta ao básico e as regras são relaxadas logo
+DIFICULDADE_MAXIMA = 1.2
+
+# Modos aceitos por gerar_mapa_com_backtracking: os resolvedores acima e a geração
+# por regiões para mapas grandes (ver regioes.py)
+MODOS = tuple(LIMITE_PASSOS) + ('regioes',)
+
+# Ordens em que o backtracking posiciona os itens (ver montar_itens). O forward
+# checking escolhe a ordem sozinho (MRV) e a geração por regiões só aceita a padrão.
+ORDENS = ('essenciais', 'maiores', 'aleatoria')
+
+# ========== FUNÇÕES UTILITÁRIAS ==========
+
+def get_posicoes_porta(linhas, colunas):
+    """Retorna uma lista de posições nas bordas internas do mapa (excluindo os cantos),
+    que são candidatas para colocar portas, jogador ou saída."""
+    posicoes = []
+    # Linhas superior e inferior (exceto cantos)
+    for j in range(1, colunas - 1):
+        posicoes.append((0, j))             # topo
+        posicoes.append((linhas - 1, j))   # base
+    # Colunas esquerda e direita (exceto cantos)
+    for i in range(1, linhas - 1):
+        posicoes.append((i, 0))             # esquerda
+        posicoes.append((i, colunas - 1))   # direita
+    return posicoes
+
+def distancia_manhattan(p1, p2):
+    """Calcula a distância de Manhattan (soma das diferenças absolutas das coordenadas)
+    entre dois pontos p1 e p2."""
+    if not p1 or not p2:
+        return 0
+    return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
+
+def existe_caminho(mapa, inicio, fim, linhas, colunas):
+    """Verifica se existe caminho do ponto 'inicio' até 'fim' no mapa (Grade),
+    considerando apenas células passáveis (chão, baú e saída). Usa busca em largura (BFS)
+    sobre os índices do buffer da grade."""
+    if not inicio or not fim:
+        return False
+
+    celulas = mapa.celulas
+    origem = inicio[0] * colunas + inicio[1]
+    destino = fim[0] * colunas + fim[1]
+    fila = deque([origem])             # fila para BFS
+    visitados = bytearray(linhas * colunas)
+    visitados[origem] = 1
+
+    while fila:
+        i = fila.popleft()
+        if i == destino:
+            return True  # caminho encontrado
+
+        # Verifica vizinhos (cima, baixo, esquerda, direita) sem sair da grade
+        x, y = divmod(i, colunas)
+        for j, dentro in ((i - colunas, x > 0), (i + colunas, x < linhas - 1),
+                          (i - 1, y > 0), (i + 1, y < colunas - 1)):
+            # Se célula é destino ou passável, adiciona para explorar
+            if dentro and not visitados[j] and (j == destino or celulas[j] in PASSAVEIS):
+                visitados[j] = 1
+                fila.append(j)
+    return False  # caminho não encontrado
+
+# ========== ORÇAMENTO DA BUSCA ==========
+
+class ErroGeracaoImpossivel(RuntimeError):
+    """Nenhum mapa válido foi encontrado dentro do orçamento (nem relaxando as regras
+    flexíveis). Quem chama decide o que fazer; o gerador nunca encerra o processo."""
+
+    def __init__(self, linhas, colunas, num_baus, num_inimigos, dificuldade=None, passos=0):
+        super().__init__(
+            f"Não foi possível gerar um mapa {linhas}x{colunas} com {num_baus} baús e {num_inimigos} "
+            f"inimigos (dificuldade estimada {dificuldade if dificuldade is None else round(dificuldade, 2)}, "
+            f"{passos} passos). Aumente o mapa, reduza o número de itens ou diminua a distância mínima "
+            f"entre eles."
+        )
+        self.linhas = linhas
+        self.colunas = colunas
+        self.num_baus = num_baus
+        self.num_inimigos = num_inimigos
+        self.dificuldade = dificuldade
+        self.passos = passos
+
+
+class GeracaoCancelada(RuntimeError):
+    """A geração desistiu porque 'parar' pediu (ver gerar_mapa_com_backtracking)."""
+
+
+def luby(k):
+    """k-ésimo termo (k >= 1) da sequência de Luby: 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ...
+    Reinícios com limites nessa sequência perdem no máximo um fator logarítmico para o
+    melhor limite fixo, sem precisar conhecê-lo."""
+    indice = k - 1
+    tamanho, expoente = 1, 0
+    while tamanho < indice + 1:
+        expoente += 1
+        tamanho = 2 * tamanho + 1  # a sequência se repete em blocos de 2^n - 1 termos
+    while tamanho - 1 != indice:
+        tamanho = (tamanho - 1) // 2
+        expoente -= 1
+        indice %= tamanho
+    return 2 ** expoente
+
+
+def estimar_dificuldade(linhas, colunas, num_baus, num_inimigos, regras=REGRAS_DISTANCIA):
+    """Fração do interior que os itens tomam, contando a área que as regras de
+    distância reservam: itens de uma categoria que precisam ficar a 'd' passos uns
+    dos outros ocupam cerca de d²/2 células cada (o empacotamento mais denso de
+    losangos), e o jogador tira dos itens o losango à sua volta. Perto de 1 o mapa
+    está apertado; bem acima de 1 ele provavelmente não existe."""
+    livre = max(1, (linhas - 2) * (colunas - 2))
+    minimos = tabela_minimos(regras)
+    quantidades = {'CHAVE': 1, 'ESPADA': 1, 'BAU': num_baus, 'INIMIGO': num_inimigos, 'ARMADILHA': 2}
+    ocupada = 0.0
+    for cat, quantidade in quantidades.items():
+        espacamento = max([minimo for (a, b), (minimo, _nome) in minimos.items() if a == cat and b == cat] + [1])
+        ocupada += quantidade * max(1.0, espacamento * espacamento / 2)
+    raio_jogador = max([minimo - 1 for (a, _b), (minimo, _nome) in minimos.items() if a == 'JOGADOR'] + [0])
+    ocupada += raio_jogador * (raio_jogador + 1)  # metade do losango fica dentro do mapa
+    return ocupada / livre
+
+
+def orcamento_busca(modo, num_itens, dificuldade):
+    """(unidade, total) de passos para a geração: a unidade dos reinícios de Luby e o
+    orçamento da geração inteira. Mapas fáceis recebem pouco e reiniciam cedo; mapas
+    densos recebem tentativas mais longas e mais passos no total, até
+    DIFICULDADE_MAXIMA, e o total nunca passa de PASSOS_MAXIMOS."""
+    fator = 1 + max(0.0, dificuldade) ** 2 if dificuldade < DIFICULDADE_MAXIMA else 1
+    total = min(PASSOS_MAXIMOS, max(8, math.ceil(ORCAMENTO_TOTAL[modo] * num_itens * fator)))
+    unidade = min(total, max(8, math.ceil(UNIDADE_LUBY[modo] * num_itens * fator)))
+    return unidade, total
+
+
+def cabe_no_mapa(linhas, colunas, num_baus, num_inimigos):
+    """Os itens que vão para o interior (chave, espada, baús, inimigos e as duas
+    armadilhas) cabem nas células livres? O jogador e a saída ficam na borda. Se
+    não couberem, nenhuma busca acha o mapa."""
+    return 4 + num_baus + num_inimigos <= max(0, linhas - 2) * max(0, colunas - 2)
+
+
+def dificuldade_minima(linhas, colunas, num_baus, num_inimigos, relaxar=True):
+    """Dificuldade estimada com as regras no ponto mais relaxado a que a geração
+    chega (as regras completas se 'relaxar' for falso). Acima de DIFICULDADE_MAXIMA
+    os itens não cabem nem com as distâncias mínimas mais curtas."""
+    regras = REGRAS_DISTANCIA
+    while relaxar:
+        relaxadas = relaxar_regras(regras)
+        if relaxadas is None:
+            break
+        regras = relaxadas
+    return estimar_dificuldade(linhas, colunas, num_baus, num_inimigos, regras)
+
+# ========== FUNÇÕES DE GERAÇÃO (BACKTRACKING) ==========
+
+def obter_posicoes_disponiveis(mapa, linhas, colunas, rng=random):
+    """Retorna uma lista de posições internas do mapa que são chão,
+    ou seja, disponíveis para colocar itens. A lista é embaralhada com 'rng'."""
+    celulas = mapa.celulas
+    posicoes = [(r, c) for r in range(1, linhas - 1) for c in range(1, colunas - 1)
+                if celulas[r * colunas + c] == Celula.VAZIO]
+    rng.shuffle(posicoes)
+    return posicoes
+
+def verificar_caminhos_criticos(mapa, contexto, linhas, colunas, verboso=False, limites_caminho=None,
+                                metricas=None):
+    """Verifica após a geração do mapa se existem caminhos válidos do jogador para a chave
+    e da chave para a saída, para garantir jogabilidade mínima. Uma única busca em
+    largura a partir da chave dá os dois comprimentos (ver caminhos.py).
+
+    limites_caminho=(minimo, maximo) rejeita também mapas cuja rota jogador -> chave ->
+    saída seja curta ou longa demais (qualquer um dos dois pode ser None). As falhas
+    viram eventos de 'metricas' (ver metricas.py)."""
+    metricas = escolher(metricas, verboso)
+    if not all(contexto.get(ponto) for ponto in ('JOGADOR', 'CHAVE', 'SAIDA')):
+        return False
+    jogador_chave, chave_saida = comprimentos_criticos(mapa, contexto, linhas, colunas)
+    metricas.contar('bfs')
+
+    # Valida caminho do jogador para chave
+    if jogador_chave == SEM_CAMINHO:
+        metricas.evento('sem_caminho_chave')
+        return False
+        
+    # Valida caminho da chave para a saída
+    if chave_saida == SEM_CAMINHO:
+        metricas.evento('sem_caminho_saida')
+        return False
+
+    if limites_caminho is not None:
+        minimo, maximo = limites_caminho
+        total = jogador_chave + chave_saida
+        if (minimo is not None and total < minimo) or (maximo is not None and total > maximo):
+            metricas.evento('caminho_fora_dos_limites', total=total, minimo=minimo, maximo=maximo)
+            return False
+        
+    return True  # todos caminhos críticos válidos
+
+def eh_caminho_valido_parcial(mapa, contexto, linhas, colunas):
+    """Valida parcialmente os caminhos importantes durante a geração, para podar soluções ruins.
+    Faz duas buscas em largura; dentro da busca usa-se a ConectividadeIncremental."""
+    pos_jogador = contexto.get('JOGADOR')
+    pos_chave = contexto.get('CHAVE')
+    pos_saida = contexto.get('SAIDA')
+
+    if pos_jogador and pos_chave and not existe_caminho(mapa, pos_jogador, pos_chave, linhas, colunas):
+        return False
+    if pos_chave and pos_saida and not existe_caminho(mapa, pos_chave, pos_saida, linhas, colunas):
+        return False
+    return True
+
+def resolver_backtracking(mapa, itens_a_colocar, contexto, estado_busca, linhas, colunas):
+    """Função recursiva que tenta posicionar os itens no mapa com backtracking.
+    Usa estado_busca para limitar a complexidade da busca e evitar loop infinito."""
+    
+    # Contador de passos para limitar busca
+    estado_busca['passos'] += 1
+    parar = estado_busca.get('parar')
+    if parar is not None and not estado_busca['passos'] % 16 and parar():
+        estado_busca['limite_passos'] = 0  # cancelada: a busca volta como se tivesse estourado o limite
+    if estado_busca['passos'] > estado_busca['limite_passos']:
+        return False, None, None  # aborta busca por limite excedido
+
+    # Caso base: sem itens a colocar, mapa válido encontrado
+    if not itens_a_colocar:
+        return True, mapa, contexto
+
+    # Pega o próximo item a ser posicionado (símbolo e tipo)
+    item_atual, tipo_item = itens_a_colocar[0]
+    codigo_item = CODIGOS[item_atual]
+    celulas = mapa.celulas
+    
+    livres = estado_busca.get('livres')  # índice de células livres (None = varre a grade)
+    restricoes = estado_busca.get('restricoes')  # tabela espacial das regras de distância
+    conectividade = estado_busca.get('conectividade')  # alcançabilidade incremental
+    rng = estado_busca.get('rng', random)  # gerador de números aleatórios da geração
+    metricas = estado_busca.get('metricas')  # None quando ninguém está medindo
+    cat_item = categoria(tipo_item)
+
+    # Para jogador e saída, usar bordas do mapa
+    if tipo_item in ['JOGADOR', 'SAIDA']:
+        posicoes_candidatas = get_posicoes_porta(linhas, colunas)
+        rng.shuffle(posicoes_candidatas)
+    elif livres is not None:
+        # Para outros itens, as células livres vêm do índice, já em ordem aleatória
+        posicoes_candidatas = livres.candidatos_aleatorios()
+    else:
+        # Sem índice, varre o interior em busca de posições disponíveis
+        posicoes_candidatas = obter_posicoes_disponiveis(mapa, linhas, colunas, rng)
+
+    for pos in posicoes_candidatas:
+        r, c = pos
+        i = r * colunas + c
+        codigo_original = celulas[i]
+
+        # Verifica se pode colocar item na posição (parede para JOGADOR/SAIDA, chão para os outros)
+        pode_colocar = (tipo_item in ['JOGADOR', 'SAIDA'] and codigo_original == Celula.PAREDE) or \
+                       (tipo_item not in ['JOGADOR', 'SAIDA'] and codigo_original == Celula.VAZIO)
+        
+        if pode_colocar:
+            # Verifica as regras de distância antes de mexer no mapa
+            if restricoes is not None:
+                regra = restricoes.conflito(cat_item, pos)
+                if regra is not None:
+                    if metricas is not None:
+                        metricas.contar('rejeicoes.' + regra)
+                    continue
+            elif not eh_distribuicao_valida(contexto, tipo_item, pos):
+                continue
+
+            celulas[i] = codigo_item  # coloca item no mapa
+            contexto[tipo_item] = pos # registra posição no contexto
+            if livres is not None and codigo_original == Celula.VAZIO:
+                indice_livre = livres.remover(pos)
+            if restricoes is not None:
+                restricoes.adicionar(cat_item, pos)
+            bloqueou = conectividade is not None and codigo_item in CODIGOS_BLOQUEIO
+            if bloqueou:
+                conectividade.bloquear(pos)
+
+            # Poda por alcançabilidade: jogador, chave e saída ainda estão interligados?
+            if conectividade is None or (not bloqueou and cat_item not in ('JOGADOR', 'SAIDA', 'CHAVE')) \
+                    or conectividade.caminhos_criticos_ok(contexto):
+                sucesso, mapa_final, contexto_final = resolver_backtracking(
+                    mapa, itens_a_colocar[1:], contexto, estado_busca, linhas, colunas
+                )
+                if sucesso:
+                    return True, mapa_final, contexto_final
+            elif metricas is not None:
+                metricas.contar('rejeicoes.conectividade')
+
+            # Se falhou, desfaz (backtrack)
+            if metricas is not None:
+                metricas.contar('retrocessos.' + cat_item)
+            celulas[i] = codigo_original
+            del contexto[tipo_item]
+            if livres is not None and codigo_original == Celula.VAZIO:
+                livres.restaurar(pos, indice_livre)
+            if restricoes is not None:
+                restricoes.remover(cat_item, pos)
+            if bloqueou:
+                conectividade.desbloquear()
+
+            # Limite de passos estourado: não adianta tentar os demais candidatos
+            if estado_busca['passos'] > estado_busca['limite_passos']:
+                break
+
+    return False, None, None  # falha em posicionar o item atual
+
+def criar_mapa_base(linhas, colunas):
+    """Cria o mapa base (Grade) com paredes nas bordas e chão no interior."""
+    return Grade.base(linhas, colunas)
+
+def tamanho_item(cat, regras=REGRAS_DISTANCIA):
+    """Quanto um item da categoria restringe os outros: a maior distância mínima que
+    as regras exigem dele e, no empate, com quantas categorias ele tem regra."""
+    minimos = [minimo for (a, _b), (minimo, _nome) in tabela_minimos(regras).items() if a == cat]
+    return max(minimos + [0]), len(minimos)
+
+def montar_itens(num_baus, num_inimigos, rng=random, ordem='essenciais', regras=REGRAS_DISTANCIA):
+    """Monta a lista de itens (símbolo, tipo) na ordem em que serão posicionados.
+
+    ordem: 'essenciais' (jogador, saída, chave e espada primeiro, o resto embaralhado),
+    'maiores' (os itens que mais restringem os outros primeiro, ver tamanho_item; os
+    empates ficam embaralhados) ou 'aleatoria' (tudo embaralhado)."""
+    # Itens essenciais (jogador, saída, chave e espada)
+    itens_para_colocar = [
+        ('J', 'JOGADOR'), ('S', 'SAIDA'), ('B', 'CHAVE'), ('B', 'ESPADA')
+    ]
+    # Baús, inimigos e armadilhas adicionais
+    itens_para_colocar.extend([('B', f'BAU_{i}') for i in range(num_baus)])
+    itens_para_colocar.extend([('I', f'INIMIGO_{i}') for i in range(num_inimigos)])
+    itens_para_colocar.extend([('T', f'ARMADILHA_{i}') for i in range(2)])
+
+    if ordem == 'aleatoria':
+        rng.shuffle(itens_para_colocar)
+        return itens_para_colocar
+
+    # Randomiza itens menos essenciais para variar a geração
+    itens_essenciais = itens_para_colocar[:4]
+    itens_randomizaveis = itens_para_colocar[4:]
+    rng.shuffle(itens_randomizaveis)
+    itens = itens_essenciais + itens_randomizaveis
+    if ordem == 'maiores':
+        tamanhos = {cat: tamanho_item(cat, regras) for cat in ('JOGADOR', 'SAIDA', 'CHAVE', 'ESPADA', 'BAU',
+                                                               'INIMIGO', 'ARMADILHA')}
+        itens.sort(key=lambda item: tamanhos[categoria(item[1])], reverse=True)  # sort estável
+    return itens
+
+def criar_jogador(pos_jogador):
+    """Estrutura de dados do jogador com a posição e o status inicial."""
+    return {
+        "x": pos_jogador[0], "y": pos_jogador[1], "tem_chave": False,
+        "tem_espada": False, "vida_espada": 3, "vida": 3
+    }
+
+def gerar_mapa_com_backtracking(linhas, colunas, num_baus, num_inimigos, verboso=False,
+                                modo='backtracking', estatisticas=None, semente=None, cache=None,
+                                limites_caminho=None, metricas=None, relaxar=True, ordem='essenciais',
+                                parar=None):
+    """Função principal que tenta gerar um mapa válido com backtracking, reiniciando a
+    busca até achar um mapa ou esgotar o orçamento de passos.
+    Retorna (mapa, jogador, bau_com_chave, bau_com_espada); se nenhum mapa for
+    encontrado levanta ErroGeracaoImpossivel. Nunca encerra o processo nem toca na tela.
+
+    modo escolhe o resolvedor: 'backtracking' (cronológico) ou 'forward_checking'
+    (domínios podados + MRV, ver propagacao.py); 'regioes' divide mapas grandes em
+    blocos resolvidos separadamente (ver regioes.py). Se 'estatisticas' for um dict, ele
+    recebe o total de passos, o número de tentativas usadas, a dificuldade estimada e
+    as regras relaxadas (se houve).
+
+    Orçamento: a dificuldade estimada (área livre contra itens e raios das regras, ver
+    estimar_dificuldade) define a unidade e o total de passos; as tentativas recebem
+    limites na sequência de Luby (muitas tentativas curtas, algumas longas). Se o
+    total acabar e 'relaxar' for verdadeiro, as regras flexíveis (ver restricoes.py)
+    baixam um passo e a busca recomeça com orçamento novo. Somando todos os níveis
+    a geração nunca passa de PASSOS_MAXIMOS; itens que não cabem no interior (ver
+    cabe_no_mapa e dificuldade_minima) levantam ErroGeracaoImpossivel sem busca.
+
+    ordem é a ordem de posicionamento dos itens no backtracking (ver montar_itens);
+    o modo 'regioes' só aceita 'essenciais'. 'parar' é uma função sem argumentos
+    consultada antes de cada tentativa e a cada 16 passos da busca: se ela retornar
+    verdadeiro a geração desiste com GeracaoCancelada (usado pelo portfólio, ver
+    portfolio.py, para interromper as estratégias que perderam a corrida).
+
+    Toda a aleatoriedade vem de um random.Random próprio, criado com 'semente': a
+    mesma semente (com os mesmos parâmetros) gera sempre o mesmo mapa, e o módulo
+    random global não é tocado. Com semente None o mapa é imprevisível. Se 'cache'
+    for um CacheMapas (ver cache_mapas.py) e houver semente, um mapa já resolvido é
+    devolvido direto do cache e um mapa novo é guardado nele.
+
+    limites_caminho=(minimo, maximo) descarta mapas em que a rota jogador -> chave ->
+    saída tem menos de 'minimo' ou mais de 'maximo' passos (mapas triviais ou
+    cansativos); qualquer um dos dois pode ser None.
+
+    O gerador não imprime nada: o progresso vai como eventos para 'metricas' (um
+    metricas.Metricas, que também conta retrocessos, rejeições por regra etc. e
+    cronometra as fases). verboso=True equivale a métricas que imprimem os eventos."""
+    if modo not in MODOS:
+        raise ValueError(f"Modo de geração desconhecido: {modo!r}")
+    if ordem not in ORDENS:
+        raise ValueError(f"Ordem de posicionamento desconhecida: {ordem!r}")
+    if modo == 'regioes' and ordem != 'essenciais':
+        raise ValueError("A geração por regiões só aceita a ordem 'essenciais'")
+    metricas = escolher(metricas, verboso)
+    if estatisticas is None:
+        estatisticas = {}
+    estatisticas['passos'] = 0
+    estatisticas['tentativas'] = 0
+    estatisticas['cache'] = False
+    estatisticas['regras_relaxadas'] = None
+
+    chave_cache = None
+    if cache is not None and semente is not None:
+        chave_cache = cache.chave(linhas, colunas, num_baus, num_inimigos, semente, modo,
+                                  limites_caminho=limites_caminho, relaxar=relaxar, ordem=ordem)
+        em_cache = cache.obter(chave_cache)
+        if em_cache is not None:
+            mapa, pos_jogador, bau_com_chave, bau_com_espada = em_cache
+            estatisticas['cache'] = True
+            metricas.contar('cache')
+            metricas.evento('cache', semente=semente)
+            return mapa, criar_jogador(pos_jogador), bau_com_chave, bau_com_espada
+
+    if not cabe_no_mapa(linhas, colunas, num_baus, num_inimigos) or \
+            dificuldade_minima(linhas, colunas, num_baus, num_inimigos, relaxar) > DIFICULDADE_MAXIMA:
+        metricas.evento('impossivel', tentativas=0)
+        raise ErroGeracaoImpossivel(linhas, colunas, num_baus, num_inimigos,
+                                    estimar_dificuldade(linhas, colunas, num_baus, num_inimigos))
+
+    if modo == 'regioes':
+        from regioes import gerar_mapa_por_regioes  # regioes usa funções deste módulo
+        mapa, jogador, bau_com_chave, bau_com_espada = gerar_mapa_por_regioes(
+            linhas, colunas, num_baus, num_inimigos, estatisticas=estatisticas, semente=semente,
+            limites_caminho=limites_caminho, metricas=metricas, relaxar=relaxar, parar=parar)
+        if chave_cache is not None:
+            cache.guardar(chave_cache, mapa, (jogador["x"], jogador["y"]), bau_com_chave, bau_com_espada)
+        return mapa, jogador, bau_com_chave, bau_com_espada
+
+    rng = random.Random(semente)
+    metricas.evento('inicio', modo=modo)
+
+    regras = REGRAS_DISTANCIA
+    num_itens = 4 + num_baus + num_inimigos + 2  # essenciais, baús, inimigos e armadilhas
+    dificuldade = estimar_dificuldade(linhas, colunas, num_baus, num_inimigos, regras)
+    estatisticas['dificuldade'] = dificuldade
+    unidade, orcamento = orcamento_busca(modo, num_itens, dificuldade)
+    gasto = 0  # passos gastos com as regras atuais
+    tentativas = 0
+    tentativa_nivel = 0  # posição na sequência de Luby (recomeça a cada relaxamento)
+
+    while True:
+        if parar is not None and parar():
+            metricas.evento('cancelada', tentativas=tentativas)
+            raise GeracaoCancelada(f"Geração cancelada após {tentativas} tentativas")
+        if estatisticas['passos'] >= PASSOS_MAXIMOS:
+            break
+        if gasto >= orcamento:
+            regras_relaxadas = relaxar_regras(regras) if relaxar else None
+            if regras_relaxadas is None:
+                break
+            regras = regras_relaxadas
+            estatisticas['regras_relaxadas'] = {regra['nome']: regra['minimo'] for regra in regras}
+            metricas.contar('relaxamentos')
+            metricas.evento('regras_relaxadas', regras=estatisticas['regras_relaxadas'])
+            gasto, tentativa_nivel = 0, 0
+
+        tentativas += 1
+        tentativa_nivel += 1
+        estatisticas['tentativas'] = tentativas
+        metricas.contar('tentativas')
+        limite = min(unidade * luby(tentativa_nivel), orcamento - gasto, PASSOS_MAXIMOS - estatisticas['passos'])
+
+        with metricas.cronometro('fase.preparacao'):
+            mapa_tentativa = criar_mapa_base(linhas, colunas)
+            itens_para_colocar = montar_itens(num_baus, num_inimigos, rng, ordem, regras)
+
+            # Estado de controle da busca para limitar passos
+            estado_busca = {
+                'passos': 0,
+                'limite_passos': limite,  # Limite para abortar busca que demora demais
+                'livres': IndiceCelulasLivres.do_mapa(mapa_tentativa, linhas, colunas, rng),
+                'restricoes': VerificadorDistancias(regras),
+                'conectividade': ConectividadeIncremental(mapa_tentativa, linhas, colunas),
+                'rng': rng,
+                'metricas': metricas if metricas.ativo else None,  # None: a busca nem conta
+                'parar': parar,  # consultada a cada 16 passos
+            }
+        metricas.evento('tentativa', tentativa=tentativas, limite=limite)
+        
+        # Chama função recursiva para posicionar todos os itens
+        with metricas.cronometro('fase.busca'):
+            if modo == 'forward_checking':
+                sucesso_posicionamento, mapa_potencial, contexto_potencial = resolver_forward_checking(
+                    mapa_tentativa, itens_para_colocar, estado_busca, linhas, colunas, rng
+                )
+            else:
+                sucesso_posicionamento, mapa_potencial, contexto_potencial = resolver_backtracking(
+                    mapa_tentativa, itens_para_colocar, {}, estado_busca, linhas, colunas
+                )
+        passos = min(estado_busca['passos'], limite)
+        gasto += passos
+        estatisticas['passos'] += passos
+        metricas.contar('passos', passos)
+
+        # Se ultrapassou limite de passos, reinicia com o próximo limite da sequência
+        if estado_busca['passos'] > limite:
+            metricas.contar('limite_passos')
+            metricas.evento('limite_passos', tentativa=tentativas)
+            continue
+        if not sucesso_posicionamento:
+            # A busca esgotou todas as opções antes do limite (falha rápida): conta ao
+            # menos uma unidade do orçamento, para que configurações impossíveis terminem logo
+            gasto += max(0, unidade - passos)
+            continue
+
+        # Se posicionamento foi bem sucedido e caminhos críticos válidos, retorna resultado
+        with metricas.cronometro('fase.validacao'):
+            valido = verificar_caminhos_criticos(mapa_potencial, contexto_potencial, linhas, colunas,
+                                                 limites_caminho=limites_caminho, metricas=metricas)
+        if valido:
+            metricas.evento('sucesso', passos=estado_busca['passos'])
+            pos_jogador = contexto_potencial['JOGADOR']
+            bau_com_chave = contexto_potencial['CHAVE']
+            bau_com_espada = contexto_potencial['ESPADA']
+            if chave_cache is not None:
+                cache.guardar(chave_cache, mapa_potencial, pos_jogador, bau_com_chave, bau_com_espada)
+            # Cria estrutura de dados do jogador com posições e status inicial
+            jogador = criar_jogador(pos_jogador)
+            return mapa_potencial, jogador, bau_com_chave, bau_com_espada
+        # Se posicionou mas falhou na validação dos caminhos, tenta novamente
+        metricas.contar('validacao_falhou')
+        metricas.evento('validacao_falhou', tentativa=tentativas)
+    
+    # Se esgotou o orçamento sem sucesso, avisa o chamador (quem decide encerrar é o jogo)
+    metricas.evento('impossivel', tentativas=tentativas)
+    raise ErroGeracaoImpossivel(linhas, colunas, num_baus, num_inimigos, dificuldade, estatisticas['passos'])
@@ -0,0 +1,121 @@
+# tp_IA/grade.py
+# Representação compacta do mapa: um bytearray com um byte por célula, em ordem
+# de linhas, e um código inteiro por tipo de célula. Copiar um mapa é copiar o
+# buffer, e as comparações nos laços quentes são entre inteiros, não strings.
+
+from enum import IntEnum
+
+
+class Celula(IntEnum):
+    """Código de cada tipo de célula do mapa (cabe em um byte)."""
+    PAREDE = 0
+    VAZIO = 1
+    JOGADOR = 2
+    SAIDA = 3
+    INIMIGO = 4
+    BAU = 5
+    ARMADILHA = 6
+    ARMADILHA_ATIVA = 7
+
+
+# Símbolos antigos do mapa em lista de listas, indexados pelo código
+SIMBOLOS = ['P', 'V', 'J', 'S', 'I', 'B', 'T', 'TA']
+CODIGOS = {simbolo: codigo for codigo, simbolo in enumerate(SIMBOLOS)}
+
+# Células por onde se anda na verificação de caminhos (chão, baú e saída)
+PASSAVEIS = frozenset((Celula.VAZIO, Celula.BAU, Celula.SAIDA))
+
+
+class _LinhaGrade:
+    """Compatibilidade com o acesso antigo mapa[i][j], que lê e escreve símbolos."""
+
+    __slots__ = ('celulas', 'inicio', 'colunas')
+
+    def __init__(self, grade, i):
+        self.celulas = grade.celulas
+        self.inicio = i * grade.colunas
+        self.colunas = grade.colunas
+
+    def __len__(self):
+        return self.colunas
+
+    def __getitem__(self, j):
+        if not 0 <= j < self.colunas:
+            raise IndexError(j)
+        return SIMBOLOS[self.celulas[self.inicio + j]]
+
+    def __setitem__(self, j, simbolo):
+        if not 0 <= j < self.colunas:
+            raise IndexError(j)
+        self.celulas[self.inicio + j] = CODIGOS[simbolo]
+
+    def __iter__(self):
+        return (SIMBOLOS[codigo] for codigo in self.celulas[self.inicio:self.inicio + self.colunas])
+
+
+class Grade:
+    """Mapa de linhas x colunas guardado em um buffer plano de bytes.
+
+    O código da célula (i, j) fica em celulas[i * colunas + j]. 'celulas' pode ser
+    qualquer buffer gravável de bytes (bytearray, fatia de memoryview...)."""
+
+    __slots__ = ('linhas', 'colunas', 'celulas')
+
+    def __init__(self, linhas, colunas, celulas=None):
+        self.linhas = linhas
+        self.colunas = colunas
+        self.celulas = bytearray(linhas * colunas) if celulas is None else celulas
+
+    @classmethod
+    def base(cls, linhas, colunas):
+        """Mapa com paredes nas bordas e chão no interior."""
+        parede = bytes([Celula.PAREDE]) * colunas
+        meio = bytes([Celula.PAREDE]) + bytes([Celula.VAZIO]) * (colunas - 2) + bytes([Celula.PAREDE])
+        return cls(linhas, colunas, bytearray(parede + meio * (linhas - 2) + parede))
+
+    @classmethod
+    def de_lista(cls, mapa):
+        """Converte um mapa antigo (lista de listas de símbolos)."""
+        linhas, colunas = len(mapa), len(mapa[0])
+        return cls(linhas, colunas, bytearray(CODIGOS[simbolo] for linha in mapa for simbolo in linha))
+
+    def para_lista(self):
+        """Converte para o formato antigo (lista de listas de símbolos)."""
+        return [list(linha) for linha in self]
+
+    def copiar(self):
+        """Cópia independente, feita com uma única cópia do buffer."""
+        return Grade(self.linhas, self.colunas, bytearray(self.celulas))
+
+    def codigo(self, i, j):
+        return self.celulas[i * self.colunas + j]
+
+    def definir(self, i, j, codigo):
+        self.celulas[i * self.colunas + j] = codigo
+
+    def __len__(self):
+        return self.linhas
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.linhas:
+            raise IndexError(i)
+        return _LinhaGrade(self, i)
+
+    def __iter__(self):
+        return (_LinhaGrade(self, i) for i in range(self.linhas))
+
+    def __eq__(self, outra):
+        if not isinstance(outra, Grade):
+            return NotImplemented
+        return (self.linhas, self.colunas) == (outra.linhas, outra.colunas) and self.celulas == outra.celulas
+
+    def __repr__(self):
+        return f"Grade({self.linhas}x{self.colunas})"
+
+    def __getstate__(self):
+        # bytes para que grades sobre memoryview também possam ir para outros processos
+        return self.linhas, self.colunas, bytes(self.celulas)
+
+    def __setstate__(self, estado):
+        self.linhas, self.colunas, celulas = estado
+        self.celulas = bytearray(celulas)
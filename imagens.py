@@ -1,36 +1,95 @@
 # tp_IA/imagens.py
+# Gerenciador de sprites: as imagens só são lidas do disco no primeiro uso,
+# convertidas para o formato da tela (convert_alpha) e guardadas já escaladas
+# para cada tamanho pedido. Importar este módulo não carrega nada, então as
+# ferramentas que só geram mapas não pagam pela leitura das imagens.
+#
+# Os nomes antigos continuam funcionando: imagens.img_parede, imagens.img_bau...
+# devolvem o sprite no tamanho config.TAMANHO_CELULA.
+
+import os
 
 import pygame
-import random   
 import config
 
-# Carregar imagens
-img_parede = pygame.image.load("imagens/parede.png")
-img_parede = pygame.transform.scale(img_parede, (config.TAMANHO_CELULA, config.TAMANHO_CELULA))
+DIRETORIO_IMAGENS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "imagens")
+
+# Nome do sprite -> arquivo dentro de DIRETORIO_IMAGENS
+ARQUIVOS = {
+    'parede': 'parede.png',
+    'bau': 'bau.png',
+    'saida': 'saida.png',
+    'chao': 'chao.png',
+    'jogador': 'jogador.png',
+    'chave': 'chave.png',
+    'espada': 'espada.png',
+    'coracao': 'coracao.png',
+    'inimigo': 'inimigo.png',
+    'armadilha': 'armadilha.png',
+}
+
+_originais = {}  # nome -> superfície lida do disco
+_escaladas = {}  # (nome, tamanho, convertida) -> superfície escalada
+_atlas = {}      # (tamanho, convertida, nomes) -> (superfície, {nome: retângulo})
+
+
+def _tela_pronta():
+    """convert_alpha() só funciona depois de pygame.display.set_mode()."""
+    return pygame.display.get_init() and pygame.display.get_surface() is not None
+
 
-img_bau = pygame.image.load("imagens/bau.png")
-img_bau = pygame.transform.scale(img_bau, (config.TAMANHO_CELULA, config.TAMANHO_CELULA))
+def _original(nome):
+    imagem = _originais.get(nome)
+    if imagem is None:
+        imagem = pygame.image.load(os.path.join(DIRETORIO_IMAGENS, ARQUIVOS[nome]))
+        _originais[nome] = imagem
+    return imagem
 
-img_saida = pygame.image.load("imagens/saida.png")
-img_saida = pygame.transform.scale(img_saida, (config.TAMANHO_CELULA, config.TAMANHO_CELULA))
 
-img_chao = pygame.image.load("imagens/chao.png")
-img_chao = pygame.transform.scale(img_chao, (config.TAMANHO_CELULA, config.TAMANHO_CELULA))
+def carregar(nome, tamanho=None):
+    """Devolve o sprite 'nome' escalado para tamanho x tamanho pixels (padrão:
+    config.TAMANHO_CELULA). Se já existir uma tela, a superfície é convertida para
+    o formato dela, o que evita a conversão de pixels a cada blit."""
+    tamanho = tamanho or config.TAMANHO_CELULA
+    convertida = _tela_pronta()
+    chave = (nome, tamanho, convertida)
+    imagem = _escaladas.get(chave)
+    if imagem is None:
+        imagem = pygame.transform.scale(_original(nome), (tamanho, tamanho))
+        if convertida:
+            imagem = imagem.convert_alpha()
+        _escaladas[chave] = imagem
+    return imagem
 
-img_jogador = pygame.image.load("imagens/jogador.png")
-img_jogador = pygame.transform.scale(img_jogador, (config.TAMANHO_CELULA, config.TAMANHO_CELULA))
 
-img_chave = pygame.image.load("imagens/chave.png")
-img_chave = pygame.transform.scale(img_chave, (config.TAMANHO_CELULA, config.TAMANHO_CELULA))
+def montar_atlas(tamanho=None, nomes=None):
+    """Empacota os sprites em uma única superfície (uma linha de quadros) e devolve
+    (superfície, {nome: retângulo}). Desenhar com tela.blit(atlas, destino, retangulo)
+    usa sempre a mesma superfície de origem."""
+    tamanho = tamanho or config.TAMANHO_CELULA
+    nomes = list(nomes or ARQUIVOS)
+    convertida = _tela_pronta()
+    chave = (tamanho, convertida, tuple(nomes))
+    if chave not in _atlas:
+        superficie = pygame.Surface((tamanho * len(nomes), tamanho), pygame.SRCALPHA)
+        if convertida:
+            superficie = superficie.convert_alpha()
+        retangulos = {}
+        for k, nome in enumerate(nomes):
+            retangulos[nome] = pygame.Rect(k * tamanho, 0, tamanho, tamanho)
+            superficie.blit(carregar(nome, tamanho), retangulos[nome])
+        _atlas[chave] = (superficie, retangulos)
+    return _atlas[chave]
 
-img_espada = pygame.image.load("imagens/espada.png")
-img_espada = pygame.transform.scale(img_espada, (config.TAMANHO_CELULA, config.TAMANHO_CELULA))
 
-img_coracao = pygame.image.load("imagens/coracao.png")
-img_coracao = pygame.transform.scale(img_coracao, (config.TAMANHO_CELULA, config.TAMANHO_CELULA))
+def limpar_cache():
+    """Esquece os sprites escalados e os atlas (ex.: depois de trocar de tela)."""
+    _escaladas.clear()
+    _atlas.clear()
 
-img_inimigo = pygame.image.load("imagens/inimigo.png")
-img_inimigo = pygame.transform.scale(img_inimigo, (config.TAMANHO_CELULA, config.TAMANHO_CELULA))
 
-img_armadilha = pygame.image.load("imagens/armadilha.png")
-img_armadilha = pygame.transform.scale(img_armadilha, (config.TAMANHO_CELULA, config.TAMANHO_CELULA))
+def __getattr__(atributo):
+    # Compatibilidade: imagens.img_<nome> carrega o sprite sob demanda
+    if atributo.startswith('img_') and atributo[4:] in ARQUIVOS:
+        return carregar(atributo[4:])
+    raise AttributeError(f"module {__name__!r} has no attribute {atributo!r}")
@@ -0,0 +1,83 @@
+# tp_IA/indice.py
+# Índice das células livres do interior do mapa, usado pelo backtracking para
+# escolher posições sem precisar varrer a grade inteira a cada nível da recursão.
+
+import random
+
+from grade import Celula
+
+
+class IndiceCelulasLivres:
+    """Conjunto de células livres com remoção, restauração e sorteio em O(1).
+
+    As células ficam em uma lista densa e cada célula sabe o seu índice na lista.
+    Remover troca a célula com a última e encurta a lista; restaurar faz o caminho
+    inverso. Como o backtracking desfaz as jogadas na ordem contrária (pilha), a
+    lista volta exatamente ao estado anterior depois de cada desfazer."""
+
+    def __init__(self, celulas, rng=random):
+        self.celulas = list(celulas)
+        self.posicao = {celula: i for i, celula in enumerate(self.celulas)}
+        self.rng = rng
+
+    @classmethod
+    def do_mapa(cls, mapa, linhas, colunas, rng=random):
+        """Monta o índice com as células internas de chão do mapa (única varredura)."""
+        celulas = mapa.celulas
+        return cls(((r, c) for r in range(1, linhas - 1) for c in range(1, colunas - 1)
+                    if celulas[r * colunas + c] == Celula.VAZIO), rng)
+
+    def __len__(self):
+        return len(self.celulas)
+
+    def __contains__(self, celula):
+        return celula in self.posicao
+
+    def _trocar(self, i, j):
+        celulas = self.celulas
+        celulas[i], celulas[j] = celulas[j], celulas[i]
+        self.posicao[celulas[i]] = i
+        self.posicao[celulas[j]] = j
+
+    def remover(self, celula):
+        """Marca a célula como ocupada. Retorna o índice que ela ocupava, que deve ser
+        passado para restaurar() ao desfazer a jogada."""
+        i = self.posicao.pop(celula)
+        ultima = self.celulas.pop()
+        if ultima != celula:
+            # A última célula ocupa o buraco deixado pela removida
+            self.celulas[i] = ultima
+            self.posicao[ultima] = i
+        return i
+
+    def restaurar(self, celula, i):
+        """Desfaz remover(celula), devolvendo a célula ao índice original."""
+        if i == len(self.celulas):
+            self.celulas.append(celula)
+        else:
+            deslocada = self.celulas[i]
+            self.celulas.append(deslocada)
+            self.posicao[deslocada] = len(self.celulas) - 1
+            self.celulas[i] = celula
+        self.posicao[celula] = i
+
+    def candidatos_aleatorios(self):
+        """Entrega as células livres em ordem aleatória, sem montar uma lista nova.
+
+        É um Fisher-Yates preguiçoso feito sobre a própria lista: cada passo sorteia
+        uma célula ainda não entregue e a move para o prefixo já visitado. Entre um
+        candidato e outro o chamador pode remover/restaurar células (em pilha), pois
+        a lista volta ao mesmo estado. Ao esgotar a iteração as trocas são desfeitas,
+        para que o nível anterior da recursão encontre a lista como a deixou; se o
+        chamador abandonar a iteração no meio, a ordem fica embaralhada (o conteúdo
+        continua correto)."""
+        n = len(self.celulas)
+        trocas = []
+        for i in range(n):
+            j = self.rng.randrange(i, n)
+            if j != i:
+                self._trocar(i, j)
+                trocas.append((i, j))
+            yield self.celulas[i]
+        for i, j in reversed(trocas):
+            self._trocar(i, j)
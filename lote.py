@@ -0,0 +1,201 @@
+# tp_IA/lote.py
+# Geração de mapas em lote, sem janela, para pré-gerar níveis offline.
+#
+# Exemplos:
+#   python lote.py --linhas 18 --colunas 18 --baus 10 --inimigos 12 \
+#       --sementes 0:1000 --processos 4 --saida mapas.jsonl
+#   python lote.py --linhas 18 --colunas 18 --baus 10 --inimigos 12 \
+#       --sementes 0:100000 --formato pacote --saida niveis.tppk
+#   python lote.py --linhas 18 --colunas 18 --baus 10 --inimigos 12 \
+#       --sementes 0:1000 --jogavel --saida mapas.jsonl
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from autojogo import eh_ganhavel
+from cache_mapas import CacheMapas
+from gerador import MODOS, ErroGeracaoImpossivel, gerar_mapa_com_backtracking
+from pacote import EscritorPacote
+
+
+# ========== TRABALHO EXECUTADO EM CADA PROCESSO ==========
+
+def gerar_fatia(linhas, colunas, num_baus, num_inimigos, sementes, modo='backtracking',
+                diretorio_cache=None, limites_caminho=None, exigir_vitoria=False):
+    """Gera um mapa para cada semente da fatia e devolve os registros (com o mapa
+    ainda como Grade, que vai compacta de volta ao processo principal), junto com o
+    pid do processo e o tempo gasto (para medir mapas/s).
+    Com 'diretorio_cache', sementes já resolvidas são lidas do cache em disco;
+    'limites_caminho' é repassado ao gerador. Com 'exigir_vitoria', o jogador
+    automático (autojogo.py) joga cada mapa e os que não podem ser vencidos entram
+    nas falhas."""
+    inicio = time.perf_counter()
+    cache = CacheMapas(diretorio_cache) if diretorio_cache else None
+    registros = []
+    falhas = []
+    for semente in sementes:
+        try:
+            mapa, jogador, bau_com_chave, bau_com_espada = gerar_mapa_com_backtracking(
+                linhas, colunas, num_baus, num_inimigos, verboso=False, modo=modo, semente=semente,
+                cache=cache, limites_caminho=limites_caminho)
+        except ErroGeracaoImpossivel:
+            falhas.append(semente)
+            continue
+        if exigir_vitoria and not eh_ganhavel(mapa, jogador, bau_com_chave, bau_com_espada):
+            falhas.append(semente)
+            continue
+        registros.append({
+            "semente": semente,
+            "linhas": linhas,
+            "colunas": colunas,
+            "mapa": mapa,
+            "jogador": [jogador["x"], jogador["y"]],
+            "bau_com_chave": list(bau_com_chave),
+            "bau_com_espada": list(bau_com_espada),
+        })
+    return os.getpid(), time.perf_counter() - inicio, registros, falhas
+
+
+# ========== ORQUESTRAÇÃO ==========
+
+def dividir_sementes(inicio, fim, tamanho_fatia):
+    """Quebra o intervalo [inicio, fim) em fatias de até 'tamanho_fatia' sementes."""
+    return [range(s, min(s + tamanho_fatia, fim)) for s in range(inicio, fim, tamanho_fatia)]
+
+
+class _SaidaJsonl:
+    """Grava cada registro como uma linha JSON (mapa em lista de listas de símbolos)."""
+
+    def __init__(self, caminho):
+        self.arquivo = open(caminho, "w", encoding="utf-8")
+
+    def gravar(self, registro):
+        self.arquivo.write(json.dumps(dict(registro, mapa=registro["mapa"].para_lista()),
+                                      separators=(",", ":")) + "\n")
+
+    def descarregar(self):
+        self.arquivo.flush()
+
+    def fechar(self):
+        self.arquivo.close()
+
+
+class _SaidaPacote:
+    """Grava os registros em um pacote de níveis binário (ver pacote.py)."""
+
+    def __init__(self, caminho):
+        self.escritor = EscritorPacote(caminho)
+
+    def gravar(self, registro):
+        self.escritor.adicionar(registro["mapa"], registro["jogador"], registro["bau_com_chave"],
+                                registro["bau_com_espada"], semente=registro["semente"])
+
+    def descarregar(self):
+        self.escritor.arquivo.flush()
+
+    def fechar(self):
+        self.escritor.fechar()
+
+
+FORMATOS = {"jsonl": _SaidaJsonl, "pacote": _SaidaPacote}
+
+
+def gerar_em_lote(linhas, colunas, num_baus, num_inimigos, inicio, fim, caminho_saida,
+                  processos=None, tamanho_fatia=50, modo='backtracking', diretorio_cache=None,
+                  formato="jsonl", limites_caminho=None, exigir_vitoria=False):
+    """Distribui as sementes entre os processos e grava cada mapa (uma linha JSON ou
+    um nível do pacote) assim que a fatia correspondente termina. Retorna as
+    estatísticas por processo."""
+    por_processo = {}  # pid -> {'mapas': n, 'tempo': s}
+    total_falhas = []
+
+    saida = FORMATOS[formato](caminho_saida)
+    try:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            futuros = [
+                executor.submit(gerar_fatia, linhas, colunas, num_baus, num_inimigos, fatia, modo, diretorio_cache,
+                                limites_caminho, exigir_vitoria)
+                for fatia in dividir_sementes(inicio, fim, tamanho_fatia)
+            ]
+            for futuro in as_completed(futuros):
+                pid, tempo, registros, falhas = futuro.result()
+                for registro in registros:
+                    saida.gravar(registro)
+                saida.descarregar()  # os mapas vão para o disco conforme ficam prontos
+
+                estatistica = por_processo.setdefault(pid, {"mapas": 0, "tempo": 0.0})
+                estatistica["mapas"] += len(registros)
+                estatistica["tempo"] += tempo
+                total_falhas.extend(falhas)
+    finally:
+        saida.fechar()
+
+    return por_processo, sorted(total_falhas)
+
+
+def ler_intervalo(texto):
+    """Converte 'inicio:fim' (fim exclusivo) ou apenas 'n' (equivale a 0:n) em uma tupla.
+    Um dos lados pode ficar vazio: o início vira 0 e o fim vira None ('10:' ou ':50')."""
+    if ":" in texto:
+        inicio, fim = texto.split(":", 1)
+        return int(inicio) if inicio else 0, int(fim) if fim else None
+    return 0, int(texto)
+
+
+def ler_limites(texto):
+    """Converte 'minimo:maximo' em uma tupla; um dos lados pode ficar vazio ('20:' ou ':60')."""
+    minimo, _, maximo = texto.partition(":")
+    return int(minimo) if minimo else None, int(maximo) if maximo else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera mapas em lote, sem interface gráfica.")
+    parser.add_argument("--linhas", type=int, required=True)
+    parser.add_argument("--colunas", type=int, required=True)
+    parser.add_argument("--baus", type=int, required=True)
+    parser.add_argument("--inimigos", type=int, required=True)
+    parser.add_argument("--sementes", type=ler_intervalo, default=(0, 100),
+                        help="intervalo de sementes 'inicio:fim' (fim exclusivo)")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="número de processos (padrão: número de CPUs)")
+    parser.add_argument("--fatia", type=int, default=50, help="sementes por tarefa enviada a um processo")
+    parser.add_argument("--modo", choices=MODOS, default="backtracking",
+                        help="resolvedor usado no posicionamento dos itens ('regioes' para mapas grandes)")
+    parser.add_argument("--cache", default=None,
+                        help="diretório do cache de mapas (sementes já geradas não são refeitas)")
+    parser.add_argument("--caminho", type=ler_limites, default=None,
+                        help="limites 'minimo:maximo' da rota jogador -> chave -> saída, em passos")
+    parser.add_argument("--jogavel", action="store_true",
+                        help="joga cada mapa com o jogador automático e descarta os que não podem ser vencidos")
+    parser.add_argument("--formato", choices=sorted(FORMATOS), default="jsonl",
+                        help="'jsonl' (um mapa JSON por linha) ou 'pacote' (pacote de níveis binário)")
+    parser.add_argument("--saida", default="mapas.jsonl", help="arquivo de saída")
+    args = parser.parse_args(argv)
+
+    inicio, fim = args.sementes
+    if fim is None:
+        parser.error("--sementes precisa do fim do intervalo")
+    comeco = time.perf_counter()
+    por_processo, falhas = gerar_em_lote(
+        args.linhas, args.colunas, args.baus, args.inimigos, inicio, fim, args.saida,
+        processos=args.processos, tamanho_fatia=args.fatia, modo=args.modo, diretorio_cache=args.cache,
+        formato=args.formato, limites_caminho=args.caminho, exigir_vitoria=args.jogavel,
+    )
+    duracao = time.perf_counter() - comeco
+
+    total = sum(e["mapas"] for e in por_processo.values())
+    for pid, estatistica in sorted(por_processo.items()):
+        taxa = estatistica["mapas"] / estatistica["tempo"] if estatistica["tempo"] else 0.0
+        print(f"processo {pid}: {estatistica['mapas']} mapas, {taxa:.1f} mapas/s")
+    print(f"total: {total} mapas em {duracao:.2f} s ({total / duracao if duracao else 0.0:.1f} mapas/s)")
+    if falhas:
+        print(f"{len(falhas)} sementes sem mapa válido: {falhas[:20]}{' ...' if len(falhas) > 20 else ''}")
+    return 0 if not falhas else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
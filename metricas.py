@@ -0,0 +1,123 @@
+# tp_IA/metricas.py
+# Métricas e eventos da geração. O gerador não imprime nada por conta própria:
+# ele conta passos, retrocessos, rejeições por regra etc., cronometra as fases e
+# emite eventos ('tentativa', 'sucesso'...) para um destino escolhido por quem
+# chama. Sem métricas o gerador usa NULAS, que não guarda nada, e os laços da
+# busca nem chegam a chamar a contagem (recebem None), então o padrão não custa nada.
+#
+# Contadores usados:
+#   passos, tentativas            nós da busca e tentativas (reinícios) feitas
+#   limite_passos                 tentativas abandonadas por estourar o limite de passos
+#   relaxamentos                  vezes em que as regras flexíveis foram relaxadas
+#   validacao_falhou              tentativas que posicionaram tudo mas falharam na validação
+#   cache, reparos                mapas vindos do cache; blocos refeitos (modo 'regioes')
+#   retrocessos.<categoria>       itens retirados de volta, por categoria de item
+#   rejeicoes.<regra>             candidatos barrados por regra de distância (no
+#                                 forward checking: células podadas dos domínios)
+#   rejeicoes.conectividade       posicionamentos que isolariam jogador, chave ou saída
+#   dominio_vazio.<categoria>     falhas antecipadas do forward checking
+#   bfs                           buscas em largura da validação final
+# Tempos (s): fase.preparacao, fase.busca, fase.validacao
+
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+
+
+class Metricas:
+    """Acumula contadores e tempos e repassa eventos para 'destino', uma função
+    destino(tipo, dados) (por exemplo imprimir_evento). A mesma instância pode ser
+    usada em várias gerações para somar os números."""
+
+    ativo = True
+
+    def __init__(self, destino=None):
+        self.destino = destino
+        self.contadores = Counter()
+        self.tempos = defaultdict(float)
+
+    def contar(self, nome, quantidade=1):
+        self.contadores[nome] += quantidade
+
+    @contextmanager
+    def cronometro(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tempos[nome] += time.perf_counter() - inicio
+
+    def evento(self, tipo, **dados):
+        if self.destino is not None:
+            self.destino(tipo, dados)
+
+    def resumo(self):
+        """Dict com os contadores e tempos, pronto para JSON."""
+        return {'contadores': dict(sorted(self.contadores.items())),
+                'tempos': {nome: tempo for nome, tempo in sorted(self.tempos.items())}}
+
+    def relatorio(self):
+        """Texto com um contador ou tempo por linha, agrupados pelo prefixo."""
+        linhas = [f"{nome:<32} {valor:>10}" for nome, valor in sorted(self.contadores.items())]
+        linhas += [f"{nome:<32} {tempo * 1000:>8.2f}ms" for nome, tempo in sorted(self.tempos.items())]
+        return "\n".join(linhas)
+
+
+class _MetricasNulas:
+    """Métricas que descartam tudo (padrão do gerador)."""
+
+    ativo = False
+    _sem_cronometro = nullcontext()
+
+    def contar(self, nome, quantidade=1):
+        pass
+
+    def cronometro(self, nome):
+        return self._sem_cronometro
+
+    def evento(self, tipo, **dados):
+        pass
+
+
+NULAS = _MetricasNulas()
+
+
+# ========== DESTINO QUE IMPRIME NO TERMINAL ==========
+
+# Mensagens dos eventos, no texto que o gerador imprimia antes
+MENSAGENS = {
+    'cache': "Mapa da semente {semente} encontrado no cache.",
+    'inicio': "Iniciando geração com Backtracking e regras de distribuição...",
+    'tentativa': "Tentativa de geração nº {tentativa} (limite de {limite} passos)...",
+    'limite_passos': "Tentativa {tentativa} abortada: Limite de passos de busca atingido.",
+    'sem_caminho_chave': "Falha na validação final: Sem caminho do Jogador para a Chave.",
+    'sem_caminho_saida': "Falha na validação final: Sem caminho da Chave para a Saída.",
+    'caminho_fora_dos_limites': "Falha na validação final: rota de {total} passos fora dos limites "
+                                "(mínimo {minimo}, máximo {maximo}).",
+    'validacao_falhou': "Posicionamento da tentativa {tentativa} bem-sucedido, mas falhou na validação de caminhos.",
+    'regras_relaxadas': "Orçamento de passos esgotado; relaxando as regras de distância: {regras}",
+    'cancelada': "Geração cancelada após {tentativas} tentativas.",
+    'sucesso': "Mapa válido gerado e validado com sucesso!\nPassos na busca: {passos}",
+    'impossivel': "\nNÃO FOI POSSÍVEL GERAR UM MAPA VÁLIDO APÓS {tentativas} TENTATIVAS.\n"
+                  "A combinação de tamanho do mapa, número de itens e restrições de distância provavelmente "
+                  "torna a geração impossível.\n"
+                  "Sugestão: Aumente o mapa, reduza o número de itens ou diminua a distância mínima entre eles.",
+    'regioes_inicio': "Gerando mapa {linhas}x{colunas} em {regioes} regiões...",
+    'regiao_falhou': "Tentativa {tentativa}: uma região não pôde ser resolvida; recomeçando.",
+    'regioes_validacao_falhou': "Tentativa {tentativa}: falhou na validação final.",
+    'regioes_sucesso': "Mapa por regiões gerado e validado com sucesso!",
+}
+
+
+def imprimir_evento(tipo, dados):
+    """Destino que imprime cada evento como o gerador fazia com verboso=True."""
+    mensagem = MENSAGENS.get(tipo)
+    print(mensagem.format(**dados) if mensagem else f"{tipo}: {dados}")
+
+
+def escolher(metricas, verboso):
+    """Métricas efetivas de uma chamada: as recebidas, ou as que imprimem eventos se
+    verboso (compatibilidade com o parâmetro antigo), ou NULAS."""
+    if metricas is not None:
+        return metricas
+    return Metricas(destino=imprimir_evento) if verboso else NULAS
@@ -0,0 +1,212 @@
+# tp_IA/miniaturas.py
+# Miniaturas dos níveis em PNG, sem janela, para navegar por um pacote de níveis
+# pré-gerados e escolher os melhores. Cada código de célula vira um ladrilho
+# pronto (o mesmo do Renderizador, reduzido uma única vez) e a imagem de um mapa
+# é montada direto como array NumPy (dependência opcional, só usada aqui): a
+# grade de códigos indexa a paleta de ladrilhos, sem um blit por célula. Com
+# estilo 'cores' cada célula é um quadrado liso com as cores do minimapa.
+#
+# Os níveis são divididos entre processos; cada processo abre o pacote por conta
+# própria e grava as suas imagens. O SDL usa o driver de vídeo 'dummy', então
+# nenhuma janela é aberta.
+#
+# Exemplos:
+#   python miniaturas.py niveis.tppk --destino miniaturas --lado 8
+#   python miniaturas.py niveis.tppk --destino folhas --por-folha 100 --colunas-folha 10
+#   python miniaturas.py mapas.jsonl --destino miniaturas --estilo cores
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # antes de importar o pygame
+
+try:
+    import numpy as np
+except ImportError:  # o resto do projeto não precisa do numpy
+    np = None
+import pygame
+
+from grade import Celula, Grade
+
+LADO_PADRAO = 8  # pixels por célula da miniatura
+ESTILOS = ('ladrilhos', 'cores')
+MARGEM_FOLHA = 4  # pixels entre as miniaturas de uma folha
+FUNDO_FOLHA = (0, 0, 0)
+
+_paletas = {}  # (lado, estilo) -> array (códigos, lado, lado, 3), por processo
+
+
+def _exigir_numpy():
+    if np is None:
+        raise ImportError("miniaturas precisa do numpy (pip install numpy)")
+
+
+# ========== DESENHO ==========
+
+def paleta(lado=LADO_PADRAO, estilo='ladrilhos'):
+    """Array (códigos, lado, lado, 3) com a imagem RGB de cada código de célula.
+    'ladrilhos' compõe os ladrilhos do jogo no tamanho de célula da tela e os
+    reduz com suavização (mais nítido que escalar cada sprite para poucos pixels);
+    'cores' usa as cores lisas do minimapa."""
+    _exigir_numpy()
+    chave = (lado, estilo)
+    if chave not in _paletas:
+        if estilo == 'cores':
+            from renderizador import CORES_MINIMAPA
+            cores = np.array([CORES_MINIMAPA[codigo] for codigo in Celula], np.uint8)
+            _paletas[chave] = np.broadcast_to(cores[:, None, None, :], (len(cores), lado, lado, 3)).copy()
+        elif estilo == 'ladrilhos':
+            from renderizador import montar_ladrilhos
+            reduzidos = [pygame.transform.smoothscale(ladrilho, (lado, lado)) for ladrilho in montar_ladrilhos()]
+            # surfarray indexa [x][y]; o array da imagem é [linha][coluna]
+            _paletas[chave] = np.stack([pygame.surfarray.array3d(ladrilho).transpose(1, 0, 2)
+                                        for ladrilho in reduzidos])
+        else:
+            raise ValueError(f"Estilo de miniatura desconhecido: {estilo!r}")
+    return _paletas[chave]
+
+
+def desenhar_miniatura(mapa, paleta_celulas):
+    """Imagem do mapa (Grade) como array (linhas * lado, colunas * lado, 3)."""
+    lado = paleta_celulas.shape[1]
+    codigos = np.frombuffer(mapa.celulas, np.uint8).reshape(mapa.linhas, mapa.colunas)
+    # (linhas, colunas, lado, lado, 3) -> (linhas, lado, colunas, lado, 3): cada linha
+    # de células vira 'lado' linhas de pixels
+    return paleta_celulas[codigos].transpose(0, 2, 1, 3, 4).reshape(mapa.linhas * lado, mapa.colunas * lado, 3)
+
+
+def montar_folha(miniaturas, colunas_folha, margem=MARGEM_FOLHA, fundo=FUNDO_FOLHA):
+    """Junta as miniaturas em uma grade com 'colunas_folha' por linha. Mapas menores
+    que o maior da folha ficam no canto do seu espaço."""
+    altura = max(miniatura.shape[0] for miniatura in miniaturas) + margem
+    largura = max(miniatura.shape[1] for miniatura in miniaturas) + margem
+    colunas_folha = min(colunas_folha, len(miniaturas))
+    linhas_folha = -(-len(miniaturas) // colunas_folha)
+    folha = np.empty((linhas_folha * altura + margem, colunas_folha * largura + margem, 3), np.uint8)
+    folha[:] = fundo
+    for k, miniatura in enumerate(miniaturas):
+        y = margem + (k // colunas_folha) * altura
+        x = margem + (k % colunas_folha) * largura
+        folha[y:y + miniatura.shape[0], x:x + miniatura.shape[1]] = miniatura
+    return folha
+
+
+def gravar_png(pixels, caminho):
+    """Grava um array (altura, largura, 3) como PNG."""
+    altura, largura = pixels.shape[:2]
+    pygame.image.save(pygame.image.frombuffer(pixels.tobytes(), (largura, altura), 'RGB'), caminho)
+
+
+# ========== TRABALHO EXECUTADO EM CADA PROCESSO ==========
+
+def _ler_jsonl(caminho):
+    with open(caminho, encoding="utf-8") as arquivo:
+        return [Grade.de_lista(json.loads(linha)["mapa"]) for linha in arquivo if linha.strip()]
+
+
+def renderizar_niveis(fonte, niveis, destino, lado=LADO_PADRAO, estilo='ladrilhos', por_folha=0,
+                      colunas_folha=10):
+    """Grava as miniaturas dos níveis: uma imagem por nível (nivel_<n>.png) ou, com
+    'por_folha', folhas de até esse número de níveis (folha_<primeiro nível>.png,
+    começando em níveis múltiplos de 'por_folha'). 'fonte' é o caminho de um pacote
+    (lido aqui, pelo mmap) ou a lista de Grades dos níveis. Retorna (pid, tempo
+    gasto, imagens gravadas)."""
+    inicio = time.perf_counter()
+    paleta_celulas = paleta(lado, estilo)
+    leitor = None
+    if isinstance(fonte, str):
+        from pacote import LeitorPacote  # só a leitura de pacotes precisa dele
+        leitor = LeitorPacote(fonte)
+        mapas = (leitor.carregar(n)[0] for n in niveis)
+    else:
+        mapas = iter(fonte)
+    gravadas = 0
+    try:
+        folha, primeiro = [], None
+        for n, mapa in zip(niveis, mapas):
+            miniatura = desenhar_miniatura(mapa, paleta_celulas)
+            del mapa  # libera a fatia do mmap antes de fechar o leitor
+            if not por_folha:
+                gravar_png(miniatura, os.path.join(destino, f"nivel_{n:06d}.png"))
+                gravadas += 1
+                continue
+            if folha and n // por_folha != primeiro // por_folha:
+                gravar_png(montar_folha(folha, colunas_folha), os.path.join(destino, f"folha_{primeiro:06d}.png"))
+                gravadas += 1
+                folha = []
+            if not folha:
+                primeiro = n
+            folha.append(miniatura)
+        if folha:
+            gravar_png(montar_folha(folha, colunas_folha), os.path.join(destino, f"folha_{primeiro:06d}.png"))
+            gravadas += 1
+    finally:
+        if leitor is not None:
+            mapas.close()
+            leitor.fechar()
+    return os.getpid(), time.perf_counter() - inicio, gravadas
+
+
+def renderizar_catalogo(caminho, destino, inicio=0, fim=None, processos=None, tamanho_fatia=500, **opcoes):
+    """Distribui os níveis [inicio, fim) de um pacote (.tppk) ou de um arquivo JSON
+    por linha de lote.py entre os processos. 'opcoes' vão para renderizar_niveis.
+    Retorna (níveis, imagens gravadas)."""
+    _exigir_numpy()
+    from lote import dividir_sementes
+    os.makedirs(destino, exist_ok=True)
+    if caminho.endswith(".jsonl"):
+        grades = _ler_jsonl(caminho)
+        total = len(grades)
+    else:
+        from pacote import LeitorPacote
+        grades = None
+        with LeitorPacote(caminho) as leitor:
+            total = len(leitor)
+    fim = total if fim is None else min(fim, total)
+    por_folha = opcoes.get('por_folha') or 0
+    if por_folha:
+        tamanho_fatia = max(por_folha, tamanho_fatia // por_folha * por_folha)  # folhas inteiras por tarefa
+    gravadas = 0
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = [executor.submit(renderizar_niveis, caminho if grades is None else grades[fatia.start:fatia.stop],
+                                   fatia, destino, **opcoes)
+                   for fatia in dividir_sementes(inicio, fim, tamanho_fatia)]
+        for futuro in as_completed(futuros):
+            gravadas += futuro.result()[2]
+    return max(0, fim - inicio), gravadas
+
+
+def main(argv=None):
+    from lote import ler_intervalo
+    parser = argparse.ArgumentParser(description="Grava miniaturas PNG dos níveis de um pacote, sem janela.")
+    parser.add_argument("entrada", help="pacote de níveis (.tppk) ou JSON por linha gerado por lote.py")
+    parser.add_argument("--destino", default="miniaturas", help="diretório das imagens")
+    parser.add_argument("--niveis", type=ler_intervalo, default=(0, None),
+                        help="intervalo 'inicio:fim' (padrão: todos)")
+    parser.add_argument("--lado", type=int, default=LADO_PADRAO, help="pixels por célula")
+    parser.add_argument("--estilo", choices=ESTILOS, default='ladrilhos')
+    parser.add_argument("--por-folha", type=int, default=0,
+                        help="junta os níveis em folhas com esta quantidade (padrão: uma imagem por nível)")
+    parser.add_argument("--colunas-folha", type=int, default=10, help="miniaturas por linha da folha")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="número de processos (padrão: número de CPUs)")
+    parser.add_argument("--fatia", type=int, default=500, help="níveis por tarefa enviada a um processo")
+    args = parser.parse_args(argv)
+
+    inicio, fim = args.niveis
+    comeco = time.perf_counter()
+    niveis, gravadas = renderizar_catalogo(args.entrada, args.destino, inicio, fim, args.processos, args.fatia,
+                                           lado=args.lado, estilo=args.estilo, por_folha=args.por_folha,
+                                           colunas_folha=args.colunas_folha)
+    duracao = time.perf_counter() - comeco
+    print(f"{niveis} níveis em {gravadas} imagens ({args.destino}) em {duracao:.2f} s "
+          f"({niveis / duracao if duracao else 0.0:.0f} níveis/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+# tp_IA/pacote.py
+# Pacote de níveis: vários mapas gerados em um único arquivo binário, gravado em
+# fluxo (um nível por vez, sem guardar o pacote na memória) e lido por mmap, de
+# modo que abrir o nível N de um pacote com 100 mil níveis não exige ler o resto.
+#
+# Formato (inteiros little-endian, versão 1):
+#   cabeçalho   'TPPK', versão (u16), reservado (u16)
+#   nível*      linhas (u16), colunas (u16), semente (i64, -1 se não houver),
+#               nº de itens (u16); tabela de itens: tipo (u8), linha (u16),
+#               coluna (u16); grade: um byte por célula (códigos de Celula)
+#   índice      deslocamento (u64) de cada nível, na ordem de gravação
+#   rodapé      deslocamento do índice (u64), nº de níveis (u32), 'TPPF'
+#
+# A grade é guardada exatamente como a Grade a mantém na memória, então carregar
+# um nível só cria uma Grade sobre uma fatia do mmap, sem copiar as células. O
+# mmap é aberto em modo cópia na escrita (ACCESS_COPY): o jogo pode alterar o mapa
+# carregado sem alterar o arquivo.
+#
+# Exemplo:
+#   python pacote.py info niveis.tppk
+#   python pacote.py json niveis.tppk niveis.jsonl --niveis 0:10
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+
+from grade import Celula, Grade
+
+VERSAO = 1
+MAGICA = b'TPPK'
+MAGICA_RODAPE = b'TPPF'
+
+_CABECALHO = struct.Struct('<4sHH')
+_NIVEL = struct.Struct('<HHqH')
+_ITEM = struct.Struct('<BHH')
+_INDICE = struct.Struct('<Q')
+_RODAPE = struct.Struct('<QI4s')
+
+# Tipos da tabela de itens
+TIPOS_ITEM = ('JOGADOR', 'SAIDA', 'CHAVE', 'ESPADA', 'BAU', 'INIMIGO', 'ARMADILHA')
+_TIPO = {nome: i for i, nome in enumerate(TIPOS_ITEM)}
+_TIPO_POR_CODIGO = {
+    Celula.JOGADOR: _TIPO['JOGADOR'],
+    Celula.SAIDA: _TIPO['SAIDA'],
+    Celula.BAU: _TIPO['BAU'],
+    Celula.INIMIGO: _TIPO['INIMIGO'],
+    Celula.ARMADILHA: _TIPO['ARMADILHA'],
+    Celula.ARMADILHA_ATIVA: _TIPO['ARMADILHA'],
+}
+
+
+class ErroPacote(ValueError):
+    """Arquivo que não é um pacote de níveis válido (ou de outra versão)."""
+
+
+# ========== GRAVAÇÃO ==========
+
+class EscritorPacote:
+    """Grava níveis em um pacote, um por vez. Use como gerenciador de contexto ou
+    chame fechar() no fim: o índice e o rodapé só são gravados ao fechar."""
+
+    def __init__(self, caminho):
+        self.arquivo = open(caminho, 'wb')
+        self.arquivo.write(_CABECALHO.pack(MAGICA, VERSAO, 0))
+        self.deslocamentos = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_erro):
+        self.fechar()
+
+    def __len__(self):
+        return len(self.deslocamentos)
+
+    def adicionar(self, mapa, pos_jogador, bau_com_chave, bau_com_espada, semente=None):
+        """Acrescenta um nível (mapa + posições do gerador) ao fim do pacote."""
+        especiais = {tuple(bau_com_chave): _TIPO['CHAVE'], tuple(bau_com_espada): _TIPO['ESPADA']}
+        itens = []
+        colunas = mapa.colunas
+        for indice, codigo in enumerate(mapa.celulas):
+            tipo = _TIPO_POR_CODIGO.get(codigo)
+            if tipo is not None:
+                r, c = divmod(indice, colunas)
+                itens.append((especiais.get((r, c), tipo), r, c))
+        if not any(tipo == _TIPO['JOGADOR'] for tipo, _r, _c in itens):
+            itens.insert(0, (_TIPO['JOGADOR'], *pos_jogador))  # jogador fora da grade (já se moveu)
+
+        self.deslocamentos.append(self.arquivo.tell())
+        partes = [_NIVEL.pack(mapa.linhas, colunas, -1 if semente is None else semente, len(itens))]
+        partes.extend(_ITEM.pack(*item) for item in itens)
+        partes.append(bytes(mapa.celulas))
+        self.arquivo.write(b''.join(partes))
+
+    def fechar(self):
+        if self.arquivo.closed:
+            return
+        inicio_indice = self.arquivo.tell()
+        self.arquivo.write(b''.join(_INDICE.pack(d) for d in self.deslocamentos))
+        self.arquivo.write(_RODAPE.pack(inicio_indice, len(self.deslocamentos), MAGICA_RODAPE))
+        self.arquivo.close()
+
+
+# ========== LEITURA ==========
+
+class LeitorPacote:
+    """Acesso aleatório aos níveis de um pacote através de mmap.
+
+    carregar(n) devolve (mapa, jogador, bau_com_chave, bau_com_espada), como o
+    gerador, em O(1): lê o deslocamento no índice, a tabela de itens do nível e
+    cria a Grade sobre a fatia do mmap. Um pacote sem rodapé (gravação
+    interrompida) ainda é lido: os níveis completos são encontrados varrendo o
+    arquivo."""
+
+    def __init__(self, caminho):
+        with open(caminho, 'rb') as arquivo:
+            if os.fstat(arquivo.fileno()).st_size < _CABECALHO.size:  # mmap recusa arquivo vazio
+                raise ErroPacote("Arquivo curto demais para um pacote de níveis")
+            self.mmap = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_COPY)
+        self.dados = memoryview(self.mmap)
+        magica, versao, _reservado = _CABECALHO.unpack_from(self.mmap)
+        if magica != MAGICA:
+            raise ErroPacote("Não é um pacote de níveis")
+        if versao != VERSAO:
+            raise ErroPacote(f"Versão de pacote não suportada: {versao}")
+
+        self.recuperado = False
+        fim = len(self.mmap)
+        rodape = _RODAPE.unpack_from(self.mmap, fim - _RODAPE.size) if fim >= _CABECALHO.size + _RODAPE.size \
+            else (0, 0, b'')
+        if rodape[2] == MAGICA_RODAPE:
+            self.inicio_indice, self.quantidade = rodape[0], rodape[1]
+            self.deslocamentos = None  # lidos direto do índice no mmap
+        else:
+            self.deslocamentos = self._varrer(fim)
+            self.quantidade = len(self.deslocamentos)
+            self.recuperado = True
+
+    def _varrer(self, fim):
+        deslocamentos = []
+        posicao = _CABECALHO.size
+        while posicao + _NIVEL.size <= fim:
+            linhas, colunas, _semente, num_itens = _NIVEL.unpack_from(self.mmap, posicao)
+            tamanho = _NIVEL.size + num_itens * _ITEM.size + linhas * colunas
+            if posicao + tamanho > fim or not linhas or not colunas:
+                break
+            deslocamentos.append(posicao)
+            posicao += tamanho
+        return deslocamentos
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_erro):
+        self.fechar()
+
+    def __len__(self):
+        return self.quantidade
+
+    def _deslocamento(self, n):
+        if not -self.quantidade <= n < self.quantidade:
+            raise IndexError(n)
+        n %= self.quantidade
+        if self.deslocamentos is not None:
+            return self.deslocamentos[n]
+        return _INDICE.unpack_from(self.mmap, self.inicio_indice + n * _INDICE.size)[0]
+
+    def info(self, n):
+        """Cabeçalho e tabela de itens do nível n, sem tocar na grade."""
+        posicao = self._deslocamento(n)
+        linhas, colunas, semente, num_itens = _NIVEL.unpack_from(self.mmap, posicao)
+        itens = [_ITEM.unpack_from(self.mmap, posicao + _NIVEL.size + k * _ITEM.size) for k in range(num_itens)]
+        return {
+            'linhas': linhas,
+            'colunas': colunas,
+            'semente': None if semente < 0 else semente,
+            'itens': [(TIPOS_ITEM[tipo], (r, c)) for tipo, r, c in itens],
+            'inicio_grade': posicao + _NIVEL.size + num_itens * _ITEM.size,
+        }
+
+    def carregar(self, n):
+        """Nível n como (mapa, jogador, bau_com_chave, bau_com_espada). A Grade usa a
+        memória do mmap (cópia na escrita), sem copiar as células."""
+        from gerador import criar_jogador  # gerador não é necessário só para ler o índice
+
+        info = self.info(n)
+        posicoes = dict(info['itens'])  # JOGADOR, SAIDA, CHAVE e ESPADA são únicos
+        inicio = info['inicio_grade']
+        celulas = self.dados[inicio:inicio + info['linhas'] * info['colunas']]
+        mapa = Grade(info['linhas'], info['colunas'], celulas)
+        return mapa, criar_jogador(posicoes['JOGADOR']), posicoes['CHAVE'], posicoes['ESPADA']
+
+    def __getitem__(self, n):
+        return self.carregar(n)
+
+    def __iter__(self):
+        return (self.carregar(n) for n in range(self.quantidade))
+
+    def fechar(self):
+        """Fecha o mmap. Se alguma Grade carregada ainda estiver em uso, o mmap fica
+        aberto até ela ser descartada."""
+        try:
+            self.dados.release()
+            self.mmap.close()
+        except BufferError:
+            pass
+
+
+# ========== EXPORTAÇÃO JSON (depuração) ==========
+
+def exportar_json(caminho_pacote, caminho_saida, inicio=0, fim=None):
+    """Grava os níveis [inicio, fim) do pacote como JSON por linha, no mesmo formato
+    de lote.py. Retorna quantos níveis foram exportados."""
+    with LeitorPacote(caminho_pacote) as leitor, open(caminho_saida, 'w', encoding='utf-8') as saida:
+        fim = len(leitor) if fim is None else min(fim, len(leitor))
+        for n in range(inicio, fim):
+            info = leitor.info(n)
+            mapa, jogador, bau_com_chave, bau_com_espada = leitor.carregar(n)
+            saida.write(json.dumps({
+                "nivel": n,
+                "semente": info['semente'],
+                "linhas": info['linhas'],
+                "colunas": info['colunas'],
+                "mapa": mapa.para_lista(),
+                "jogador": [jogador["x"], jogador["y"]],
+                "bau_com_chave": list(bau_com_chave),
+                "bau_com_espada": list(bau_com_espada),
+            }, separators=(",", ":")) + "\n")
+            del mapa  # libera a fatia do mmap antes de fechar o leitor
+        return max(0, fim - inicio)
+
+
+def main(argv=None):
+    from lote import ler_intervalo  # lote importa este módulo
+    parser = argparse.ArgumentParser(description="Inspeciona e exporta pacotes de níveis.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_info = sub.add_parser("info", help="resumo do pacote")
+    p_info.add_argument("pacote")
+    p_json = sub.add_parser("json", help="exporta níveis como JSON por linha")
+    p_json.add_argument("pacote")
+    p_json.add_argument("saida")
+    p_json.add_argument("--niveis", type=ler_intervalo, default=(0, None),
+                        help="intervalo 'inicio:fim' (padrão: todos)")
+    args = parser.parse_args(argv)
+
+    if args.comando == "info":
+        with LeitorPacote(args.pacote) as leitor:
+            print(f"{len(leitor)} níveis (versão {VERSAO}){' - pacote recuperado sem índice' if leitor.recuperado else ''}")
+            if len(leitor):
+                primeiro = leitor.info(0)
+                print(f"primeiro nível: {primeiro['linhas']}x{primeiro['colunas']}, semente {primeiro['semente']}, "
+                      f"{len(primeiro['itens'])} itens")
+    else:
+        inicio, fim = args.niveis
+        print(f"{exportar_json(args.pacote, args.saida, inicio, fim)} níveis exportados para {args.saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
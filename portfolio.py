@@ -0,0 +1,200 @@
+# tp_IA/portfolio.py
+# Portfólio de estratégias de geração. O tempo de uma geração tem cauda longa: a
+# maioria das tentativas acha o mapa quase na hora, mas algumas gastam o orçamento
+# inteiro antes de reiniciar. Em vez de uma busca por vez, o portfólio dispara
+# várias ao mesmo tempo (modos, ordens de posicionamento e sementes diferentes) em
+# um conjunto de processos, fica com o primeiro mapa válido e cancela as outras.
+#
+# O cancelamento usa um contador compartilhado com os processos: cada geração do
+# portfólio é uma rodada, e as buscas de uma rodada que já terminou desistem antes
+# da próxima tentativa (gerador.GeracaoCancelada). O mapa vencedor é reproduzível:
+# a estratégia e a semente dele, passadas a gerar_mapa_com_backtracking, geram o
+# mesmo mapa.
+#
+# Exemplo (latências do portfólio e de cada estratégia sozinha, nas mesmas sementes):
+#   python portfolio.py --linhas 18 --colunas 18 --baus 10 --inimigos 12 --mapas 200 --comparar
+
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from gerador import (MODOS, ORDENS, ErroGeracaoImpossivel, GeracaoCancelada, estimar_dificuldade,
+                     gerar_mapa_com_backtracking)
+
+# Estratégias (modo, ordem) disparadas por padrão, uma por processo
+ESTRATEGIAS = (
+    ('backtracking', 'essenciais'),
+    ('backtracking', 'maiores'),
+    ('backtracking', 'aleatoria'),
+    ('forward_checking', 'essenciais'),
+)
+
+_rodada = None  # contador de rodadas compartilhado, em cada processo do conjunto
+
+
+def _iniciar_processo(rodada):
+    global _rodada
+    _rodada = rodada
+
+
+def _correr(rodada, indice, linhas, colunas, num_baus, num_inimigos, modo, ordem, semente, limites_caminho):
+    """Executado nos processos: uma estratégia da rodada. Retorna (índice da
+    estratégia, resultado do gerador ou None, estatísticas, tempo gasto)."""
+    def parar():
+        return _rodada.value != rodada
+
+    inicio = time.perf_counter()
+    estatisticas = {}
+    resultado = None
+    if not parar():  # a rodada pode ter acabado enquanto a tarefa esperava na fila
+        try:
+            resultado = gerar_mapa_com_backtracking(linhas, colunas, num_baus, num_inimigos, modo=modo,
+                                                    ordem=ordem, semente=semente, estatisticas=estatisticas,
+                                                    limites_caminho=limites_caminho, parar=parar)
+        except (GeracaoCancelada, ErroGeracaoImpossivel):
+            pass
+    return indice, resultado, estatisticas, time.perf_counter() - inicio
+
+
+class GeradorPortfolio:
+    """Gera mapas correndo as 'estrategias' (pares (modo, ordem), ver gerador.MODOS e
+    gerador.ORDENS) em paralelo. 'processos' é o tamanho do conjunto (padrão: uma
+    estratégia por processo).
+
+    Para ajustar o portfólio, 'vitorias' conta quantas gerações cada estratégia
+    venceu, 'tempos' guarda a duração de cada geração e 'falhas' conta as
+    estratégias que esgotaram o orçamento sem mapa."""
+
+    def __init__(self, estrategias=ESTRATEGIAS, processos=None, rng=None):
+        self.estrategias = tuple(tuple(estrategia) for estrategia in estrategias)
+        for modo, ordem in self.estrategias:
+            if modo not in MODOS or modo == 'regioes':
+                raise ValueError(f"Modo sem suporte no portfólio: {modo!r}")
+            if ordem not in ORDENS:
+                raise ValueError(f"Ordem de posicionamento desconhecida: {ordem!r}")
+        self.rng = rng or random.Random()
+        self.rodada = multiprocessing.RawValue('L', 0)  # só o processo principal escreve
+        self.executor = ProcessPoolExecutor(max_workers=processos or len(self.estrategias),
+                                            initializer=_iniciar_processo, initargs=(self.rodada,))
+        self.vitorias = Counter()
+        self.falhas = Counter()
+        self.tempos = []
+
+    def gerar(self, linhas, colunas, num_baus, num_inimigos, semente=None, limites_caminho=None):
+        """Primeiro mapa válido entre as estratégias. Retorna (resultado do gerador,
+        vencedora), onde vencedora é um dict com 'modo', 'ordem' e 'semente' (que
+        reproduzem o mapa), 'passos' e 'tempo'. A estratégia i usa semente + i.
+        Levanta ErroGeracaoImpossivel se todas esgotarem o orçamento."""
+        inicio = time.perf_counter()
+        if semente is None:
+            semente = self.rng.randrange(2 ** 31)
+        self.rodada.value += 1
+        rodada = self.rodada.value
+        pendentes = {self.executor.submit(_correr, rodada, i, linhas, colunas, num_baus, num_inimigos, modo,
+                                          ordem, semente + i, limites_caminho)
+                     for i, (modo, ordem) in enumerate(self.estrategias)}
+        passos = 0
+        while pendentes:
+            prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for indice, resultado, estatisticas, _tempo in sorted(futuro.result() for futuro in prontos):
+                passos += estatisticas.get('passos', 0)
+                estrategia = self.estrategias[indice]
+                if resultado is None:
+                    self.falhas[estrategia] += 1
+                    continue
+                self.rodada.value += 1  # as outras estratégias desistem na próxima tentativa
+                for futuro in pendentes:
+                    futuro.cancel()
+                tempo = time.perf_counter() - inicio
+                self.vitorias[estrategia] += 1
+                self.tempos.append(tempo)
+                modo, ordem = estrategia
+                return resultado, {'modo': modo, 'ordem': ordem, 'semente': semente + indice,
+                                   'passos': estatisticas['passos'], 'tempo': tempo}
+        raise ErroGeracaoImpossivel(linhas, colunas, num_baus, num_inimigos,
+                                    estimar_dificuldade(linhas, colunas, num_baus, num_inimigos), passos)
+
+    def relatorio(self):
+        """Texto com as vitórias e falhas de cada estratégia."""
+        total = sum(self.vitorias.values())
+        linhas = []
+        for estrategia in self.estrategias:
+            vitorias = self.vitorias[estrategia]
+            linhas.append(f"  {estrategia[0]:<17}{estrategia[1]:<11} {vitorias:>6} vitórias "
+                          f"({100 * vitorias / total if total else 0.0:5.1f}%), {self.falhas[estrategia]} falhas")
+        return "\n".join(linhas)
+
+    def encerrar(self):
+        self.rodada.value += 1
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+# ========== COMPARAÇÃO ==========
+
+def percentis(tempos):
+    """Texto com os percentis de uma lista de durações em segundos, em ms."""
+    ordenados = sorted(tempos)
+    if not ordenados:
+        return "sem mapas"
+    valor = lambda fracao: ordenados[min(len(ordenados) - 1, int(fracao * len(ordenados)))] * 1000
+    return (f"p50 {valor(0.5):7.2f}  p90 {valor(0.9):7.2f}  p99 {valor(0.99):7.2f}  "
+            f"máx {ordenados[-1] * 1000:7.2f} ms")
+
+
+def ler_estrategia(texto):
+    modo, _, ordem = texto.partition(":")
+    return modo, ordem or 'essenciais'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera mapas correndo várias estratégias em paralelo.")
+    parser.add_argument("--linhas", type=int, default=18)
+    parser.add_argument("--colunas", type=int, default=18)
+    parser.add_argument("--baus", type=int, default=10)
+    parser.add_argument("--inimigos", type=int, default=12)
+    parser.add_argument("--mapas", type=int, default=100, help="quantos mapas gerar (sementes 0, 1, ...)")
+    parser.add_argument("--estrategias", nargs="+", type=ler_estrategia, default=list(ESTRATEGIAS),
+                        help="pares 'modo:ordem' (ex.: backtracking:maiores forward_checking)")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="número de processos (padrão: um por estratégia)")
+    parser.add_argument("--comparar", action="store_true",
+                        help="mede também cada estratégia sozinha, sem paralelismo, nas mesmas sementes")
+    args = parser.parse_args(argv)
+    configuracao = (args.linhas, args.colunas, args.baus, args.inimigos)
+    passo_semente = len(args.estrategias)  # a estratégia i usa semente + i
+
+    portfolio = GeradorPortfolio(args.estrategias, args.processos)
+    impossiveis = 0
+    try:
+        for n in range(args.mapas):
+            try:
+                portfolio.gerar(*configuracao, semente=n * passo_semente)
+            except ErroGeracaoImpossivel:
+                impossiveis += 1
+    finally:
+        portfolio.encerrar()
+    print(f"Portfólio ({len(args.estrategias)} estratégias): {percentis(portfolio.tempos)}"
+          + (f", {impossiveis} sem mapa" if impossiveis else ""))
+    print(portfolio.relatorio())
+
+    if args.comparar:
+        for i, (modo, ordem) in enumerate(args.estrategias):
+            tempos = []
+            for n in range(args.mapas):
+                inicio = time.perf_counter()
+                try:
+                    gerar_mapa_com_backtracking(*configuracao, modo=modo, ordem=ordem, semente=n * passo_semente + i)
+                except ErroGeracaoImpossivel:
+                    continue
+                tempos.append(time.perf_counter() - inicio)
+            print(f"{modo}:{ordem} sozinha: {percentis(tempos)}"
+                  + (f", {args.mapas - len(tempos)} sem mapa" if len(tempos) < args.mapas else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# tp_IA/pregeracao.py
+# Pré-geração de mapas em segundo plano. Um processo separado gera mapas para a
+# configuração atual e mantém uma pequena fila de mapas prontos; o laço do jogo
+# só consulta a fila (sem esperar), então reiniciar o mapa não trava a janela
+# mesmo quando a busca precisa de várias tentativas.
+
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from gerador import ErroGeracaoImpossivel, gerar_mapa_com_backtracking
+
+
+def _gerar(linhas, colunas, num_baus, num_inimigos, modo, semente):
+    """Executado no processo filho. Retorna (semente, resultado do gerador), com
+    resultado None se a semente não tiver mapa válido."""
+    try:
+        return semente, gerar_mapa_com_backtracking(linhas, colunas, num_baus, num_inimigos, verboso=False,
+                                                    modo=modo, semente=semente)
+    except ErroGeracaoImpossivel:
+        return semente, None
+
+
+class GeradorEmSegundoPlano:
+    """Mantém até 'tamanho_fila' mapas prontos (ou sendo gerados) para uma configuração.
+
+    obter() nunca bloqueia: devolve (semente, mapa, jogador, bau_com_chave,
+    bau_com_espada) se houver um mapa pronto ou None se ainda não houver, e pede
+    outro mapa ao processo para repor a fila."""
+
+    def __init__(self, linhas, colunas, num_baus, num_inimigos, tamanho_fila=3, modo='backtracking',
+                 processos=1, rng=None):
+        self.configuracao = (linhas, colunas, num_baus, num_inimigos, modo)
+        self.tamanho_fila = tamanho_fila
+        self.rng = rng or random.Random()
+        self.executor = ProcessPoolExecutor(max_workers=processos)
+        self.pendentes = deque()  # futuros na ordem em que foram pedidos
+        self.prontos = deque()
+        self.falhas = 0
+        self._repor()
+
+    def _repor(self):
+        while len(self.pendentes) + len(self.prontos) < self.tamanho_fila:
+            semente = self.rng.randrange(2 ** 31)
+            self.pendentes.append(self.executor.submit(_gerar, *self.configuracao, semente))
+
+    def _recolher(self):
+        """Move para 'prontos' os mapas já terminados, sem esperar pelos outros."""
+        for futuro in [f for f in self.pendentes if f.done()]:
+            self.pendentes.remove(futuro)
+            semente, resultado = futuro.result()
+            if resultado is None:
+                self.falhas += 1  # semente sem mapa válido: será reposta por outra
+            else:
+                self.prontos.append((semente, *resultado))
+
+    def disponiveis(self):
+        """Quantos mapas já estão prontos para uso imediato."""
+        self._recolher()
+        return len(self.prontos)
+
+    def obter(self):
+        """Próximo mapa pronto, ou None se nenhum terminou ainda (não bloqueia)."""
+        self._recolher()
+        mapa = self.prontos.popleft() if self.prontos else None
+        self._repor()
+        return mapa
+
+    def encerrar(self):
+        """Cancela os pedidos que ainda não começaram e libera o processo."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,233 @@
+# tp_IA/propagacao.py
+# Resolvedor do posicionamento de itens por forward checking: cada categoria de
+# item mantém o seu domínio (células onde ainda pode ser colocada). Depois de cada
+# posicionamento, as células que passaram a violar as regras de distância são
+# podadas dos domínios das outras categorias, e a busca falha assim que algum
+# domínio fica menor do que a quantidade de itens que ainda faltam.
+
+import random
+
+from conectividade import CODIGOS_BLOQUEIO
+from grade import CODIGOS, Celula
+from restricoes import categoria, tabela_minimos
+
+# Categorias posicionadas nas paredes da borda em vez do interior
+CATEGORIAS_BORDA = ('JOGADOR', 'SAIDA')
+
+
+def _deslocamentos(minimo):
+    """Deslocamentos (dr, dc) com distância de Manhattan menor que 'minimo'."""
+    raio = minimo - 1
+    return [(dr, dc) for dr in range(-raio, raio + 1)
+            for dc in range(-(raio - abs(dr)), raio - abs(dr) + 1)]
+
+
+def _embaralhar_preguicoso(candidatos, rng):
+    """Fisher-Yates que entrega cada elemento assim que ele é sorteado."""
+    n = len(candidatos)
+    for i in range(n):
+        j = rng.randrange(i, n)
+        candidatos[i], candidatos[j] = candidatos[j], candidatos[i]
+        yield candidatos[i]
+
+
+class _Dominios:
+    """Domínios por categoria com uma trilha de remoções para desfazer em pilha."""
+
+    def __init__(self, dominios, restantes, minimos, metricas=None):
+        self.dominios = dominios
+        self.restantes = restantes
+        self.trilha = []
+        self.metricas = metricas  # conta as podas por regra (None = não conta)
+        # Para cada categoria, as categorias vizinhas e os deslocamentos proibidos
+        self.podas = {}
+        # Ordem fixa (as regras vêm de conjuntos de strings, cuja ordem muda entre
+        # execuções): assim a ordem interna dos domínios depende só da semente
+        for (a, b), (minimo, nome) in sorted(minimos.items()):
+            self.podas.setdefault(a, []).append((b, _deslocamentos(minimo), nome))
+        # Células que um item exclui da própria categoria (ex.: espaçamento entre baús)
+        self.exclusao_propria = {a: len(_deslocamentos(minimo)) for (a, b), (minimo, _nome) in minimos.items()
+                                 if a == b}
+
+    def marca(self):
+        return len(self.trilha)
+
+    def desfazer(self, marca):
+        trilha, dominios = self.trilha, self.dominios
+        while len(trilha) > marca:
+            cat, pos = trilha.pop()
+            dominios[cat].add(pos)
+
+    def remover(self, cat, pos):
+        dominio = self.dominios[cat]
+        if pos in dominio:
+            dominio.remove(pos)
+            self.trilha.append((cat, pos))
+
+    def propagar(self, cat, pos):
+        """Remove dos domínios a célula ocupada e tudo o que ficou perto demais de
+        'pos'. Retorna False se alguma categoria ficou sem células suficientes."""
+        restantes, dominios = self.restantes, self.dominios
+        for outra, dominio in dominios.items():
+            if restantes[outra]:
+                self.remover(outra, pos)
+        r, c = pos
+        metricas = self.metricas
+        for outra, deslocamentos, nome in self.podas.get(cat, ()):
+            if not restantes.get(outra):
+                continue
+            dominio = dominios[outra]
+            antes = len(dominio)
+            for dr, dc in deslocamentos:
+                vizinha = (r + dr, c + dc)
+                if vizinha in dominio:
+                    dominio.remove(vizinha)
+                    self.trilha.append((outra, vizinha))
+            if metricas is not None and len(dominio) < antes:
+                metricas.contar('rejeicoes.' + nome, antes - len(dominio))
+        for outra, dominio in dominios.items():
+            if len(dominio) < restantes[outra]:
+                if metricas is not None:
+                    metricas.contar('dominio_vazio.' + outra)
+                return False  # domínio esvaziou: falha antecipada
+        return True
+
+    def custo_poda(self, cat, pos):
+        """Quantas células seriam podadas dos domínios das outras categorias se 'cat'
+        fosse colocada em 'pos' (heurística do valor menos restritivo)."""
+        restantes, dominios = self.restantes, self.dominios
+        r, c = pos
+        custo = 0
+        for outra, deslocamentos, _nome in self.podas.get(cat, ()):
+            if restantes.get(outra):
+                dominio = dominios[outra]
+                for dr, dc in deslocamentos:
+                    if (r + dr, c + dc) in dominio:
+                        custo += 1
+        return custo
+
+    def ordenar_candidatos(self, cat, rng):
+        """Ordem aleatória das células do domínio. Quando a categoria está apertada (os
+        itens que faltam excluiriam mais células do que o domínio tem), usa a ordem do
+        valor menos restritivo, com desempate aleatório, para empacotar os itens.
+
+        Fora desse caso o embaralhamento é preguiçoso: como quase sempre o primeiro
+        candidato já serve, sortear um por vez evita embaralhar o domínio inteiro a
+        cada nó da busca (que custaria proporcional à área do mapa)."""
+        candidatos = list(self.dominios[cat])
+        exclusao = self.exclusao_propria.get(cat, 1)
+        if self.restantes[cat] * exclusao > len(candidatos):
+            candidatos.sort()
+            chaves = {pos: (self.custo_poda(cat, pos), rng.random()) for pos in candidatos}
+            candidatos.sort(key=chaves.__getitem__)
+            return candidatos
+        return _embaralhar_preguicoso(candidatos, rng)
+
+    def escolher_categoria(self):
+        """Heurística MRV: a categoria com menos folga (células livres menos itens que
+        faltam) é a mais restrita e é posicionada primeiro."""
+        melhor, melhor_folga = None, None
+        for cat, restante in self.restantes.items():
+            if restante:
+                folga = len(self.dominios[cat]) - restante
+                if melhor is None or folga < melhor_folga:
+                    melhor, melhor_folga = cat, folga
+        return melhor
+
+
+def _resolver(dominios, codigos, mapa, contexto, estado_busca, rng):
+    estado_busca['passos'] += 1
+    parar = estado_busca.get('parar')
+    if parar is not None and not estado_busca['passos'] % 16 and parar():
+        estado_busca['limite_passos'] = 0  # cancelada (ver gerador.gerar_mapa_com_backtracking)
+    if estado_busca['passos'] > estado_busca['limite_passos']:
+        return False
+
+    cat = dominios.escolher_categoria()
+    if cat is None:
+        return True  # todos os itens posicionados
+
+    for pos in dominios.ordenar_candidatos(cat, rng):
+        if pos not in dominios.dominios[cat]:
+            continue  # podada por uma tentativa anterior deste mesmo nível
+        marca = dominios.marca()
+        numero = dominios.restantes[cat]
+        dominios.restantes[cat] -= 1
+        tipo = cat if cat in ('JOGADOR', 'SAIDA', 'CHAVE', 'ESPADA') else f'{cat}_{numero - 1}'
+        r, c = pos
+        i = r * mapa.colunas + c
+        codigo_original = mapa.celulas[i]
+        mapa.celulas[i] = codigos[cat]
+        contexto[tipo] = pos
+
+        conectividade = estado_busca.get('conectividade')
+        bloqueou = conectividade is not None and codigos[cat] in CODIGOS_BLOQUEIO
+        if bloqueou:
+            conectividade.bloquear(pos)
+        alcancavel = conectividade is None or (not bloqueou and cat not in ('JOGADOR', 'SAIDA', 'CHAVE')) \
+            or conectividade.caminhos_criticos_ok(contexto)
+
+        if alcancavel and dominios.propagar(cat, pos) and \
+                _resolver(dominios, codigos, mapa, contexto, estado_busca, rng):
+            return True
+
+        # Desfaz o posicionamento e as podas que ele causou
+        metricas = dominios.metricas
+        if metricas is not None:
+            metricas.contar('retrocessos.' + cat)
+            if not alcancavel:
+                metricas.contar('rejeicoes.conectividade')
+        if bloqueou:
+            conectividade.desbloquear()
+        dominios.desfazer(marca)
+        mapa.celulas[i] = codigo_original
+        del contexto[tipo]
+        dominios.restantes[cat] += 1
+        if estado_busca['passos'] > estado_busca['limite_passos']:
+            return False
+
+        # Os itens da categoria são intercambiáveis: se 'pos' falhou para um, falha
+        # para todos neste estado, então sai do domínio até este nível ser desfeito
+        dominios.remover(cat, pos)
+        if len(dominios.dominios[cat]) < dominios.restantes[cat]:
+            return False
+    return False
+
+
+def resolver_forward_checking(mapa, itens_a_colocar, estado_busca, linhas, colunas, rng=random):
+    """Posiciona os itens com forward checking e MRV. Mesma interface de retorno de
+    resolver_backtracking: (sucesso, mapa, contexto). Conta um passo por nó da busca
+    em estado_busca['passos'] e respeita estado_busca['limite_passos'].
+
+    Itens de uma mesma categoria (ex.: todos os baús vazios) são intercambiáveis,
+    então a busca trabalha por categoria e conta quantos itens faltam em cada uma."""
+    restricoes = estado_busca.get('restricoes')
+    minimos = restricoes.minimos if restricoes is not None else tabela_minimos()
+
+    restantes = {}
+    codigos = {}
+    for simbolo, tipo in itens_a_colocar:
+        cat = categoria(tipo)
+        restantes[cat] = restantes.get(cat, 0) + 1
+        codigos[cat] = CODIGOS[simbolo]
+
+    # Jogador e saída ficam nas paredes da borda, exceto nos cantos
+    celulas = mapa.celulas
+    portas = {(r, c) for r in range(linhas) for c in range(colunas)
+              if (r in (0, linhas - 1)) != (c in (0, colunas - 1)) and celulas[r * colunas + c] == Celula.PAREDE}
+    interior = {(r, c) for r in range(1, linhas - 1) for c in range(1, colunas - 1)
+                if celulas[r * colunas + c] == Celula.VAZIO}
+    dominios = _Dominios(
+        {cat: set(portas) if cat in CATEGORIAS_BORDA else set(interior) for cat in restantes},
+        restantes,
+        minimos,
+        estado_busca.get('metricas'),
+    )
+    # Itens já fixos fora desta busca (ex.: de regiões vizinhas, ver regioes.py) só podam
+    for cat, pos in estado_busca.get('fixos', ()):
+        if not dominios.propagar(cat, pos):
+            return False, None, None
+    contexto = {}
+    if _resolver(dominios, codigos, mapa, contexto, estado_busca, rng):
+        return True, mapa, contexto
+    return False, None, None
@@ -0,0 +1,343 @@
+# tp_IA/regioes.py
+# Geração de mapas grandes (200x200 ou mais) por regiões. O interior é dividido
+# em blocos de cerca de 'tamanho_regiao' células de lado e os itens são repartidos
+# entre os blocos proporcionalmente à área. Cada bloco é resolvido sozinho, como
+# um mapa pequeno, pelos resolvedores de sempre, então o custo total cresce com o
+# número de blocos (linear na área) e uma falha só refaz o bloco que falhou.
+#
+# Costuras entre blocos:
+#   - Distâncias: os blocos são resolvidos em quatro fases, como em um tabuleiro
+#     de xadrez 2x2. Blocos da mesma fase ficam separados por pelo menos um bloco
+#     inteiro (mais largo que a maior distância das regras), então podem ser
+#     resolvidos em paralelo; os das fases seguintes recebem como fixos os itens
+#     dos vizinhos já resolvidos.
+#   - Conectividade: dentro de cada bloco nenhum bloqueio pode fechar um laço (ver
+#     conectividade.py), o que mantém todo o chão do bloco interligado. Depois
+#     basta que cada costura entre blocos vizinhos tenha um par de células livres
+#     frente a frente; um bloco com costura fechada é refeito. No fim, uma busca em
+#     largura no mapa inteiro confirma jogador -> chave -> saída.
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from conectividade import CODIGOS_BLOQUEIO, ConectividadeIncremental, portal
+from grade import CODIGOS, Celula, Grade
+from indice import IndiceCelulasLivres
+from metricas import escolher
+from propagacao import resolver_forward_checking
+from restricoes import REGRAS_DISTANCIA, VerificadorDistancias, categoria, relaxar_regras
+
+# Lado padrão dos blocos e quantas sementes cada bloco tenta antes de desistir
+TAMANHO_REGIAO = 32
+TENTATIVAS_REGIAO = 10
+
+# Símbolo de cada categoria de item posicionada dentro dos blocos
+SIMBOLO_POR_CATEGORIA = {'CHAVE': 'B', 'ESPADA': 'B', 'BAU': 'B', 'INIMIGO': 'I', 'ARMADILHA': 'T'}
+
+# Maior distância proibida pelas regras: itens mais distantes que isso não interagem
+ALCANCE_REGRAS = max(regra['minimo'] for regra in REGRAS_DISTANCIA) - 1
+
+
+class _ConectividadeRegiao(ConectividadeIncremental):
+    """Dentro de um bloco não há jogador nem saída para ligar: a exigência é que
+    nenhum bloqueio feche um laço, isto é, que o chão do bloco continue inteiro."""
+
+    def caminhos_criticos_ok(self, contexto):
+        return self.lacos == 0
+
+
+# ========== DIVISÃO EM BLOCOS ==========
+
+def _faixas(inicio, fim, tamanho):
+    """Divide [inicio, fim) em faixas de tamanhos parecidos, todas com pelo menos
+    'tamanho' células (exceto quando o intervalo inteiro é menor que isso)."""
+    total = fim - inicio
+    quantidade = max(1, total // tamanho)
+    limites = [inicio + total * k // quantidade for k in range(quantidade + 1)]
+    return list(zip(limites, limites[1:]))
+
+
+def dividir_em_regioes(linhas, colunas, tamanho_regiao=TAMANHO_REGIAO):
+    """Blocos do interior como {(bloco_linha, bloco_coluna): (r0, r1, c0, c1)}, com
+    limites semiabertos em coordenadas do mapa."""
+    return {(bi, bj): (r0, r1, c0, c1)
+            for bi, (r0, r1) in enumerate(_faixas(1, linhas - 1, tamanho_regiao))
+            for bj, (c0, c1) in enumerate(_faixas(1, colunas - 1, tamanho_regiao))}
+
+
+def _repartir(itens, regioes, rng):
+    """Distribui os itens (símbolo, tipo) entre os blocos, proporcionalmente à área.
+    Cada categoria é repartida por maiores restos, com as sobras sorteadas."""
+    areas = {chave: (r1 - r0) * (c1 - c0) for chave, (r0, r1, c0, c1) in regioes.items()}
+    area_total = sum(areas.values())
+    chaves = list(regioes)
+    por_regiao = {chave: [] for chave in chaves}
+    por_categoria = {}
+    for item in itens:
+        por_categoria.setdefault(categoria(item[1]), []).append(item)
+    for grupo in por_categoria.values():
+        cotas = {chave: len(grupo) * areas[chave] / area_total for chave in chaves}
+        inteiras = {chave: int(cota) for chave, cota in cotas.items()}
+        sobras = len(grupo) - sum(inteiras.values())
+        sorteio = sorted(chaves, key=lambda chave: (cotas[chave] - inteiras[chave]) + rng.random(), reverse=True)
+        for chave in sorteio[:sobras]:
+            inteiras[chave] += 1
+        restantes = iter(grupo)
+        for chave in chaves:
+            por_regiao[chave].extend(next(restantes) for _ in range(inteiras[chave]))
+    return por_regiao
+
+
+# ========== RESOLUÇÃO DE UM BLOCO (pode rodar em outro processo) ==========
+
+def resolver_regiao(altura, largura, itens, fixos, reservadas, semente, modo='forward_checking',
+                    regras=REGRAS_DISTANCIA):
+    """Resolve um bloco de altura x largura como o interior de um mapa pequeno.
+
+    'fixos' são itens (categoria, posição) de fora do bloco que ainda impõem
+    distâncias e 'reservadas' são células que devem ficar livres (entradas das
+    portas), ambos em coordenadas do bloco (o interior começa em (1, 1)); 'regras'
+    são as regras de distância em vigor. Tenta até
+    TENTATIVAS_REGIAO sementes derivadas de 'semente'. Retorna ([(tipo, posição)],
+    passos), com None no lugar da lista se nenhuma tentativa deu certo."""
+    from gerador import LIMITE_PASSOS, resolver_backtracking  # evita import circular
+
+    sementes = random.Random(semente)
+    passos = 0
+    for _ in range(TENTATIVAS_REGIAO):
+        rng = random.Random(sementes.getrandbits(64))
+        mapa = Grade.base(altura + 2, largura + 2)
+        for r, c in reservadas:
+            mapa.definir(r, c, Celula.SAIDA)  # passável, mas não é chão livre para itens
+        restricoes = VerificadorDistancias(regras)
+        for cat, pos in fixos:
+            restricoes.adicionar(cat, pos)
+        estado_busca = {
+            'passos': 0,
+            'limite_passos': LIMITE_PASSOS[modo],
+            'livres': IndiceCelulasLivres.do_mapa(mapa, altura + 2, largura + 2, rng),
+            'restricoes': restricoes,
+            'conectividade': _ConectividadeRegiao(mapa, altura + 2, largura + 2),
+            'fixos': fixos,
+            'rng': rng,
+        }
+        ordem = list(itens)
+        rng.shuffle(ordem)
+        if modo == 'forward_checking':
+            sucesso, _mapa, contexto = resolver_forward_checking(mapa, ordem, estado_busca,
+                                                                 altura + 2, largura + 2, rng)
+        else:
+            sucesso, _mapa, contexto = resolver_backtracking(mapa, ordem, {}, estado_busca,
+                                                             altura + 2, largura + 2)
+        passos += min(estado_busca['passos'], estado_busca['limite_passos'])
+        if sucesso:
+            return list(contexto.items()), passos
+    return None, passos
+
+
+# ========== MONTAGEM ==========
+
+def _vizinhas(chave):
+    bi, bj = chave
+    return [(bi + di, bj + dj) for di in (-1, 0, 1) for dj in (-1, 0, 1) if (di, dj) != (0, 0)]
+
+
+def _costura_aberta(mapa, a, b):
+    """Diz se os blocos vizinhos (ortogonais) 'a' e 'b' têm um par de células livres
+    frente a frente na fronteira comum."""
+    celulas, colunas = mapa.celulas, mapa.colunas
+    (ar0, ar1, ac0, ac1), (br0, br1, bc0, bc1) = a, b
+    if ar1 == br0:    # b logo abaixo de a
+        pares = (((ar1 - 1) * colunas + c, br0 * colunas + c) for c in range(max(ac0, bc0), min(ac1, bc1)))
+    elif br1 == ar0:  # b logo acima de a
+        pares = ((ar0 * colunas + c, (br1 - 1) * colunas + c) for c in range(max(ac0, bc0), min(ac1, bc1)))
+    elif ac1 == bc0:  # b à direita de a
+        pares = ((r * colunas + ac1 - 1, r * colunas + bc0) for r in range(max(ar0, br0), min(ar1, br1)))
+    else:             # b à esquerda de a
+        pares = ((r * colunas + ac0, r * colunas + bc1 - 1) for r in range(max(ar0, br0), min(ar1, br1)))
+    return any(celulas[i] not in CODIGOS_BLOQUEIO and celulas[j] not in CODIGOS_BLOQUEIO for i, j in pares)
+
+
+def _regiao_de(pos, regioes_linha, regioes_coluna):
+    r, c = pos
+    bi = next(k for k, (r0, r1) in enumerate(regioes_linha) if r0 <= r < r1)
+    bj = next(k for k, (c0, c1) in enumerate(regioes_coluna) if c0 <= c < c1)
+    return bi, bj
+
+
+def gerar_mapa_por_regioes(linhas, colunas, num_baus, num_inimigos, verboso=False, estatisticas=None,
+                           semente=None, tamanho_regiao=TAMANHO_REGIAO, processos=None,
+                           modo_regiao='forward_checking', limites_caminho=None, metricas=None, relaxar=True,
+                           parar=None):
+    """Gera um mapa grande resolvendo cada bloco separadamente. Mesmo retorno de
+    gerar_mapa_com_backtracking: (mapa, jogador, bau_com_chave, bau_com_espada), ou
+    ErroGeracaoImpossivel depois de três tentativas com cada nível de regras (as
+    regras flexíveis baixam um passo por nível se 'relaxar' for verdadeiro). Com
+    'processos' > 1 os blocos de cada fase são resolvidos em paralelo; o resultado
+    não depende do número de processos. 'metricas' recebe os eventos, os passos, os
+    reparos de costura e os tempos das fases (os blocos podem rodar em outros
+    processos, então os contadores internos de cada bloco não entram). 'parar' é
+    consultada antes de cada tentativa, fase e reparo (ver gerar_mapa_com_backtracking)."""
+    from gerador import (ErroGeracaoImpossivel, GeracaoCancelada, criar_jogador, get_posicoes_porta,
+                         montar_itens, verificar_caminhos_criticos)
+
+    if tamanho_regiao <= ALCANCE_REGRAS:
+        raise ValueError(f"tamanho_regiao precisa ser maior que {ALCANCE_REGRAS}")
+    metricas = escolher(metricas, verboso)
+    if estatisticas is None:
+        estatisticas = {}
+    estatisticas['passos'] = 0
+    estatisticas['tentativas'] = 0
+    estatisticas['regras_relaxadas'] = None
+
+    def conferir_parada():
+        if parar is not None and parar():
+            metricas.evento('cancelada', tentativas=estatisticas['tentativas'])
+            raise GeracaoCancelada(f"Geração cancelada após {estatisticas['tentativas']} tentativas")
+
+    rng = random.Random(semente)
+    faixas_linha = _faixas(1, linhas - 1, tamanho_regiao)
+    faixas_coluna = _faixas(1, colunas - 1, tamanho_regiao)
+    regioes = dividir_em_regioes(linhas, colunas, tamanho_regiao)
+    estatisticas['regioes'] = len(regioes)
+    fases = [[chave for chave in regioes if (chave[0] % 2) * 2 + chave[1] % 2 == fase] for fase in range(4)]
+    executor = ProcessPoolExecutor(max_workers=processos) if processos and processos > 1 else None
+    metricas.evento('regioes_inicio', linhas=linhas, colunas=colunas, regioes=len(regioes))
+
+    try:
+        regras = REGRAS_DISTANCIA
+        while True:
+            for tentativa in range(1, 4):
+                conferir_parada()
+                estatisticas['tentativas'] += 1
+                metricas.contar('tentativas')
+                mapa = Grade.base(linhas, colunas)
+
+                # Jogador e saída nas bordas, em portas diferentes; as entradas ficam livres
+                portas = get_posicoes_porta(linhas, colunas)
+                pos_jogador, pos_saida = rng.sample(portas, 2)
+                mapa.definir(*pos_jogador, Celula.JOGADOR)
+                mapa.definir(*pos_saida, Celula.SAIDA)
+                reservadas = {}
+                for pos in (pos_jogador, pos_saida):
+                    entrada = portal(pos, linhas, colunas)
+                    reservadas.setdefault(_regiao_de(entrada, faixas_linha, faixas_coluna), []).append(entrada)
+
+                itens = [item for item in montar_itens(num_baus, num_inimigos, rng)
+                         if item[1] not in ('JOGADOR', 'SAIDA')]
+                por_regiao = _repartir(itens, regioes, rng)
+                sementes = {chave: rng.getrandbits(64) for chave in regioes}
+
+                # Itens já posicionados, por bloco (o jogador entra no bloco da sua entrada)
+                posicionados = {chave: [] for chave in regioes}
+                prontas = set()
+                posicionados[_regiao_de(portal(pos_jogador, linhas, colunas), faixas_linha, faixas_coluna)].append(
+                    ('JOGADOR', pos_jogador))
+
+                def pedido(chave, semente_bloco):
+                    r0, r1, c0, c1 = regioes[chave]
+                    desloc = (r0 - 1, c0 - 1)  # do mapa para o bloco: (r, c) -> (r - r0 + 1, c - c0 + 1)
+                    fixos = [(categoria(tipo), (pos[0] - desloc[0], pos[1] - desloc[1]))
+                             for vizinha in _vizinhas(chave) + [chave] for tipo, pos in posicionados.get(vizinha, ())]
+                    locais = [(r - desloc[0], c - desloc[1]) for r, c in reservadas.get(chave, ())]
+                    return (r1 - r0, c1 - c0, por_regiao[chave], fixos, locais, semente_bloco, modo_regiao,
+                            regras)
+
+                def aplicar(chave, resultado):
+                    r0, _r1, c0, _c1 = regioes[chave]
+                    for tipo, (r, c) in resultado:
+                        pos = (r + r0 - 1, c + c0 - 1)
+                        posicionados[chave].append((tipo, pos))
+                        mapa.definir(*pos, CODIGOS[SIMBOLO_POR_CATEGORIA[categoria(tipo)]])
+                    prontas.add(chave)
+
+                def limpar(chave):
+                    for _tipo, pos in posicionados[chave]:
+                        if pos not in (pos_jogador, pos_saida):
+                            mapa.definir(*pos, Celula.VAZIO)
+                    posicionados[chave] = [item for item in posicionados[chave] if item[0] == 'JOGADOR']
+
+                falhou = False
+                for fase in fases:
+                    conferir_parada()
+                    pedidos = [pedido(chave, sementes[chave]) for chave in fase]
+                    with metricas.cronometro('fase.busca'):
+                        if executor is not None:
+                            resultados = list(executor.map(resolver_regiao, *zip(*pedidos))) if pedidos else []
+                        else:
+                            resultados = [resolver_regiao(*p) for p in pedidos]
+                    for chave, (resultado, passos) in zip(fase, resultados):
+                        estatisticas['passos'] += passos
+                        metricas.contar('passos', passos)
+                        if resultado is None:
+                            falhou = True
+                            break
+                        aplicar(chave, resultado)
+                    if falhou:
+                        break
+
+                    # Costuras com os blocos já prontos: um bloco com costura fechada é refeito
+                    for chave in fase:
+                        for reparo in range(TENTATIVAS_REGIAO + 1):
+                            fechadas = [v for v in _vizinhas(chave) if v in prontas
+                                        and (v[0] == chave[0] or v[1] == chave[1])
+                                        and not _costura_aberta(mapa, regioes[chave], regioes[v])]
+                            if not fechadas:
+                                break
+                            if reparo == TENTATIVAS_REGIAO:
+                                falhou = True
+                                break
+                            conferir_parada()
+                            limpar(chave)
+                            sementes[chave] = rng.getrandbits(64)
+                            with metricas.cronometro('fase.busca'):
+                                resultado, passos = resolver_regiao(*pedido(chave, sementes[chave]))
+                            estatisticas['passos'] += passos
+                            estatisticas['reparos'] = estatisticas.get('reparos', 0) + 1
+                            metricas.contar('passos', passos)
+                            metricas.contar('reparos')
+                            if resultado is None:
+                                falhou = True
+                                break
+                            aplicar(chave, resultado)
+                        if falhou:
+                            break
+                    if falhou:
+                        break
+
+                if falhou:
+                    metricas.evento('regiao_falhou', tentativa=tentativa)
+                    continue
+
+                # Verificação final: regras de distância em todas as costuras e caminhos críticos
+                with metricas.cronometro('fase.validacao'):
+                    contexto = {'JOGADOR': pos_jogador, 'SAIDA': pos_saida}
+                    verificador = VerificadorDistancias(regras)
+                    distancias_ok = True
+                    for itens_bloco in posicionados.values():
+                        for tipo, pos in itens_bloco:
+                            cat = categoria(tipo)
+                            regra = verificador.conflito(cat, pos)
+                            if regra is not None:
+                                distancias_ok = False
+                                metricas.contar('rejeicoes.' + regra)
+                            verificador.adicionar(cat, pos)
+                            if tipo in ('CHAVE', 'ESPADA'):
+                                contexto[tipo] = pos
+                    valido = distancias_ok and verificar_caminhos_criticos(
+                        mapa, contexto, linhas, colunas, limites_caminho=limites_caminho, metricas=metricas)
+                if valido:
+                    metricas.evento('regioes_sucesso')
+                    return mapa, criar_jogador(pos_jogador), contexto['CHAVE'], contexto['ESPADA']
+                metricas.evento('regioes_validacao_falhou', tentativa=tentativa)
+            regras = relaxar_regras(regras) if relaxar else None
+            if regras is None:
+                break
+            estatisticas['regras_relaxadas'] = {regra['nome']: regra['minimo'] for regra in regras}
+            metricas.contar('relaxamentos')
+            metricas.evento('regras_relaxadas', regras=estatisticas['regras_relaxadas'])
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    metricas.evento('impossivel', tentativas=estatisticas['tentativas'])
+    raise ErroGeracaoImpossivel(linhas, colunas, num_baus, num_inimigos, passos=estatisticas['passos'])
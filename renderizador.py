@@ -0,0 +1,320 @@
+# tp_IA/renderizador.py
+# Desenho do mapa e da HUD. Além das funções que redesenham tudo, tem o
+# Renderizador, que mostra só a parte do mapa que cabe na janela (a Camera segue
+# o jogador com rolagem suave) e, a cada quadro, só redesenha as células que
+# mudaram e a HUD quando o estado do jogador muda, enviando à tela apenas essas
+# áreas. O Minimapa mostra o mapa inteiro em miniatura.
+
+import pygame
+import imagens
+import config
+from grade import Celula
+
+# ========== IMAGENS ==========
+
+# Nome do sprite (ver imagens.ARQUIVOS) de cada código de célula. As superfícies
+# são pedidas ao módulo imagens só na hora de desenhar, já com a tela criada.
+SPRITES = {
+    Celula.PAREDE: 'parede',            # Parede
+    Celula.VAZIO: 'chao',               # Chão (vazio)
+    Celula.JOGADOR: 'jogador',          # Jogador
+    Celula.SAIDA: 'saida',              # Saída
+    Celula.INIMIGO: 'inimigo',          # Inimigo
+    Celula.BAU: 'bau',                  # Baú
+    Celula.ARMADILHA: 'chao',           # Armadilha escondida: desenhada como chão
+    Celula.ARMADILHA_ATIVA: 'armadilha', # Armadilha ativa
+}
+# Códigos cuja imagem não é a do fundo estático e precisa ser desenhada por cima
+CODIGOS_DINAMICOS = frozenset(codigo for codigo in Celula
+                              if SPRITES[codigo] != 'chao' and codigo != Celula.PAREDE)
+
+
+def imagens_por_codigo(tamanho=None):
+    """Lista de superfícies indexada pelo código da célula, para o laço de desenho."""
+    return [imagens.carregar(SPRITES[codigo], tamanho) for codigo in Celula]
+
+
+def montar_ladrilhos(tamanho=None):
+    """Superfície pronta de uma célula para cada código (borda, fundo e imagem do
+    item), como o desenho em camadas de desenhar_mapa."""
+    imagens_celulas = imagens_por_codigo(tamanho)
+    tam = tamanho or config.TAMANHO_CELULA
+    ladrilhos = []
+    for codigo in Celula:
+        ladrilho = pygame.Surface((tam, tam))
+        pygame.draw.rect(ladrilho, (0, 0, 0), (0, 0, tam, tam), 1)
+        estatica = Celula.PAREDE if codigo == Celula.PAREDE else Celula.VAZIO
+        ladrilho.blit(imagens_celulas[estatica], (0, 0))
+        if codigo in CODIGOS_DINAMICOS:
+            ladrilho.blit(imagens_celulas[codigo], (0, 0))
+        ladrilhos.append(ladrilho)
+    return ladrilhos
+
+
+# ========== FUNÇÕES DE DESENHO ==========
+
+def desenhar_hud(tela, jogador):
+    # Define cores e tamanho dos elementos da HUD (Heads-Up Display)
+    HUD_BG = (60, 60, 60)  # Fundo cinza escuro para os retângulos da HUD
+    BORDER_COLOR = (255, 255, 255)  # Borda branca dos retângulos
+    RECT_SIZE = (50, 50)  # Tamanho dos retângulos da HUD (largura x altura)
+
+    # Define a posição inicial (x, y) onde a HUD será desenhada na tela
+    x, y = 20, 20
+
+    # --- Retângulo e ícone da chave ---
+    pygame.draw.rect(tela, HUD_BG, (x + 4, y - 15, *RECT_SIZE))       # Fundo do retângulo
+    pygame.draw.rect(tela, BORDER_COLOR, (x + 4, y - 15, *RECT_SIZE), 2)  # Borda do retângulo
+    if jogador["tem_chave"] == True:   # Se o jogador possui a chave, desenha o ícone da chave
+        tela.blit(imagens.img_chave, (x + 6, y - 12))  # Blita a imagem da chave na posição
+
+    # --- Retângulo e ícone da espada ---
+    x += RECT_SIZE[0] + 10  # Move a posição x para o próximo retângulo, com espaço entre eles
+    pygame.draw.rect(tela, HUD_BG, (x + 4, y - 15, *RECT_SIZE))       # Fundo do retângulo
+    pygame.draw.rect(tela, BORDER_COLOR, (x + 4, y - 15, *RECT_SIZE), 2)  # Borda do retângulo
+    if jogador["tem_espada"] == True:  # Se o jogador possui a espada, desenha o ícone da espada
+        tela.blit(imagens.img_espada, (x + 6, y - 12))
+
+    # --- Desenha os corações que representam a vida do jogador ---
+    x += RECT_SIZE[0] + 20  # Move mais para a direita para desenhar os corações
+    for i in range(jogador["vida"]):  # Para cada ponto de vida, desenha um coração
+        # Desenha o coração com espaçamento horizontal entre eles
+        tela.blit(imagens.img_coracao, (x + i * (imagens.img_coracao.get_width() + 5), y - 15))
+
+
+def desenhar_mapa(tela, mapa, linhas, colunas, camera=None):
+    celulas = mapa.celulas
+    imagens_celulas = imagens_por_codigo()
+    # Com uma câmera, só as linhas e colunas visíveis são percorridas
+    i0, i1, j0, j1 = camera.intervalo_visivel() if camera else (0, linhas, 0, colunas)
+    ox, oy = camera.origem() if camera else (0, 0)
+    # Percorre as células do mapa para desenhá-las na tela
+    for i in range(i0, i1):
+        for j in range(j0, j1):
+            tipo = celulas[i * colunas + j]  # Código da célula na posição atual (ex: parede, chão, jogador, etc)
+
+            # Calcula a posição na tela para desenhar a célula
+            x = j * config.TAMANHO_CELULA - ox
+            y = i * config.TAMANHO_CELULA + config.HUD_HEIGHT - oy  # Compensa altura do HUD
+
+            # Desenha o retângulo de borda da célula
+            pygame.draw.rect(tela, (0, 0, 0), (x, y, config.TAMANHO_CELULA, config.TAMANHO_CELULA), 1)
+
+            # Desenha a imagem correspondente ao tipo da célula
+            tela.blit(imagens_celulas[tipo], (x, y))
+
+
+# ========== CÂMERA ==========
+
+class Camera:
+    """Parte do mapa que aparece na tela, com a origem em pixels do mapa. Segue o
+    jogador com rolagem suave (a cada quadro anda uma fração da distância até o
+    alvo) e nunca mostra nada além das bordas do mapa. Em mapas que cabem na
+    janela ela fica parada na origem."""
+
+    def __init__(self, linhas, colunas, largura, altura, suavidade=config.SUAVIDADE_CAMERA):
+        tam = config.TAMANHO_CELULA
+        self.linhas, self.colunas = linhas, colunas
+        self.largura = min(largura, colunas * tam)
+        self.altura = min(altura, linhas * tam)
+        self.maximo_x = colunas * tam - self.largura
+        self.maximo_y = linhas * tam - self.altura
+        self.suavidade = suavidade
+        self.x = self.y = 0.0
+        self.alvo_x = self.alvo_y = 0
+
+    def mirar(self, linha, coluna):
+        """Põe o alvo da câmera com a célula (linha, coluna) no centro da visão."""
+        tam = config.TAMANHO_CELULA
+        self.alvo_x = min(max(coluna * tam + tam // 2 - self.largura // 2, 0), self.maximo_x)
+        self.alvo_y = min(max(linha * tam + tam // 2 - self.altura // 2, 0), self.maximo_y)
+
+    def pular(self):
+        """Vai direto ao alvo, sem rolagem (ao trocar de mapa)."""
+        self.x, self.y = float(self.alvo_x), float(self.alvo_y)
+
+    def avancar(self):
+        """Um quadro de rolagem em direção ao alvo. Retorna True se a câmera andou."""
+        dx, dy = self.alvo_x - self.x, self.alvo_y - self.y
+        if not dx and not dy:
+            return False
+        antes = self.origem()
+        if abs(dx) < 1 and abs(dy) < 1:
+            self.x, self.y = float(self.alvo_x), float(self.alvo_y)
+        else:
+            self.x += dx * self.suavidade
+            self.y += dy * self.suavidade
+        return self.origem() != antes
+
+    def origem(self):
+        """Pixel do mapa que aparece no canto superior esquerdo da visão."""
+        return round(self.x), round(self.y)
+
+    def intervalo_visivel(self):
+        """(linha_inicial, linha_final, coluna_inicial, coluna_final), com o final
+        exclusivo: as células que aparecem, mesmo que só em parte."""
+        tam = config.TAMANHO_CELULA
+        ox, oy = self.origem()
+        return (oy // tam, min(self.linhas, (oy + self.altura + tam - 1) // tam),
+                ox // tam, min(self.colunas, (ox + self.largura + tam - 1) // tam))
+
+
+# ========== MINIMAPA ==========
+
+# Cor de cada código de célula no minimapa (armadilha escondida aparece como chão)
+CORES_MINIMAPA = {
+    Celula.PAREDE: (90, 90, 90),
+    Celula.VAZIO: (30, 30, 30),
+    Celula.JOGADOR: (60, 220, 60),
+    Celula.SAIDA: (240, 200, 40),
+    Celula.INIMIGO: (220, 50, 50),
+    Celula.BAU: (170, 110, 40),
+    Celula.ARMADILHA: (30, 30, 30),
+    Celula.ARMADILHA_ATIVA: (150, 40, 150),
+}
+
+
+class Minimapa:
+    """Miniatura do mapa inteiro com um pixel por célula, ampliada ou reduzida para
+    caber em config.LADO_MINIMAPA. A superfície de um pixel por célula usa paleta
+    (os códigos das células são os próprios índices de cor, então é criada direto do
+    buffer do mapa) e a versão escalada fica guardada: só é refeita quando alguma
+    célula muda."""
+
+    def __init__(self, mapa, linhas, colunas, lado=config.LADO_MINIMAPA):
+        self.mapa = mapa
+        self.colunas = colunas
+        self.escala = min(lado / colunas, lado / linhas)
+        self.tamanho = (max(1, round(colunas * self.escala)), max(1, round(linhas * self.escala)))
+        self.base = pygame.image.frombytes(bytes(mapa.celulas), (colunas, linhas), 'P')
+        self.base.set_palette([CORES_MINIMAPA[codigo] for codigo in Celula])
+        self.escalada = None
+
+    def marcar(self, posicoes):
+        for i, j in posicoes:
+            self.base.set_at((j, i), self.mapa.celulas[i * self.colunas + j])
+            self.escalada = None
+
+    def desenhar(self, tela, posicao, camera):
+        """Desenha a miniatura em 'posicao' com o contorno da área visível."""
+        if self.escalada is None:
+            self.escalada = pygame.transform.scale(self.base, self.tamanho)
+        tela.blit(self.escalada, posicao)
+        tam = config.TAMANHO_CELULA
+        ox, oy = camera.origem()
+        escala = self.escala / tam  # pixels do minimapa por pixel do mapa
+        visao = pygame.Rect(posicao[0] + ox * escala, posicao[1] + oy * escala,
+                            max(2, camera.largura * escala), max(2, camera.altura * escala))
+        pygame.draw.rect(tela, (255, 255, 255), visao, 1)
+        borda = pygame.Rect(posicao, self.tamanho)
+        pygame.draw.rect(tela, (255, 255, 255), borda.inflate(2, 2), 1)
+        return borda.inflate(2, 2)
+
+
+# ========== RENDERIZADOR COM RETÂNGULOS SUJOS ==========
+
+class Renderizador:
+    """Mantém na tela a parte visível do mapa redesenhando só o que mudou.
+
+    Cada código de célula tem um ladrilho pronto (fundo, borda e imagem do item), e
+    só as células dentro da visão da câmera são desenhadas, então o custo de um
+    quadro depende do tamanho da janela e não do mapa. Com a câmera parada, uma
+    célula suja é redesenhada com um único blit e a tela recebe apenas os
+    retângulos alterados com pygame.display.update(retangulos); enquanto a câmera
+    rola, a visão inteira é redesenhada."""
+
+    def __init__(self, tela, mapa, linhas, colunas):
+        self.tela = tela
+        self.area = pygame.Rect(0, config.HUD_HEIGHT, tela.get_width(), tela.get_height() - config.HUD_HEIGHT)
+        self.ladrilhos = montar_ladrilhos()
+        self.mostrar_minimapa = False
+        self.trocar_mapa(mapa, linhas, colunas)
+
+    def trocar_mapa(self, mapa, linhas, colunas):
+        """Prepara a câmera e o minimapa do novo mapa e marca a tela inteira para desenho."""
+        self.mapa, self.linhas, self.colunas = mapa, linhas, colunas
+        self.camera = Camera(linhas, colunas, self.area.width, self.area.height)
+        self.minimapa = Minimapa(mapa, linhas, colunas)
+        self.sujas = set()
+        self.estado_hud = None
+        self.tudo_sujo = True
+
+    def alternar_minimapa(self):
+        self.mostrar_minimapa = not self.mostrar_minimapa
+        self.tudo_sujo = True
+
+    def marcar(self, posicoes):
+        """Marca células (linha, coluna) que mudaram e precisam ser redesenhadas."""
+        self.sujas.update(posicoes)
+        self.minimapa.marcar(posicoes)
+
+    def _desenhar_visao(self):
+        """Desenha todas as células visíveis (cortando as que aparecem só em parte)."""
+        tam = config.TAMANHO_CELULA
+        ox, oy = self.camera.origem()
+        oy -= self.area.top
+        i0, i1, j0, j1 = self.camera.intervalo_visivel()
+        celulas, colunas, ladrilhos = self.mapa.celulas, self.colunas, self.ladrilhos
+        self.tela.set_clip(self.area)
+        self.tela.blits([(ladrilhos[celulas[i * colunas + j]], (j * tam - ox, i * tam - oy))
+                         for i in range(i0, i1) for j in range(j0, j1)], False)
+        self.tela.set_clip(None)
+        return self.area
+
+    def _desenhar_celula(self, i, j):
+        """Redesenha a célula se ela estiver na visão; retorna a área alterada ou None."""
+        tam = config.TAMANHO_CELULA
+        ox, oy = self.camera.origem()
+        retangulo = pygame.Rect(j * tam - ox, i * tam - oy + self.area.top, tam, tam).clip(self.area)
+        if not retangulo:
+            return None
+        self.tela.set_clip(retangulo)
+        self.tela.blit(self.ladrilhos[self.mapa.celulas[i * self.colunas + j]],
+                       (j * tam - ox, i * tam - oy + self.area.top))
+        self.tela.set_clip(None)
+        return retangulo
+
+    def _desenhar_minimapa(self):
+        margem = 8
+        posicao = (self.area.right - self.minimapa.tamanho[0] - margem, self.area.top + margem)
+        return self.minimapa.desenhar(self.tela, posicao, self.camera)
+
+    def _desenhar_hud(self, jogador):
+        area = pygame.Rect(0, 0, self.tela.get_width(), config.HUD_HEIGHT)
+        self.tela.fill((0, 0, 0), area)
+        desenhar_hud(self.tela, jogador)
+        return area
+
+    def atualizar(self, jogador):
+        """Move a câmera um quadro em direção ao jogador, desenha o que está sujo e
+        envia só essas áreas para a tela. Retorna a lista de retângulos atualizados
+        (vazia quando nada mudou)."""
+        estado_hud = (jogador["tem_chave"], jogador["tem_espada"], jogador["vida"])
+        self.camera.mirar(jogador["x"], jogador["y"])
+
+        if self.tudo_sujo:
+            self.camera.pular()
+            self.tela.fill((0, 0, 0))
+            self._desenhar_visao()
+            if self.mostrar_minimapa:
+                self._desenhar_minimapa()
+            desenhar_hud(self.tela, jogador)
+            pygame.display.flip()
+            self.tudo_sujo = False
+            self.sujas.clear()
+            self.estado_hud = estado_hud
+            return [self.tela.get_rect()]
+
+        if self.camera.avancar():
+            retangulos = [self._desenhar_visao()]  # a visão rolou: as sujas já entram aqui
+        else:
+            retangulos = [r for r in (self._desenhar_celula(i, j) for i, j in self.sujas) if r]
+        self.sujas.clear()
+        if retangulos and self.mostrar_minimapa:
+            retangulos.append(self._desenhar_minimapa())  # por cima das células redesenhadas
+        if estado_hud != self.estado_hud:
+            retangulos.append(self._desenhar_hud(jogador))
+            self.estado_hud = estado_hud
+        if retangulos:
+            pygame.display.update(retangulos)
+        return retangulos
@@ -0,0 +1,139 @@
+# tp_IA/restricoes.py
+# Regras de distância mínima entre itens do mapa, descritas como dados, e um
+# verificador que guarda os itens já posicionados em uma tabela espacial (hash
+# de baldes) para consultar apenas a vizinhança da célula candidata.
+
+import hashlib
+import json
+
+# ========== REGRAS ==========
+
+# Cada regra diz que qualquer item de 'grupo_a' deve ficar a pelo menos 'minimo'
+# (distância de Manhattan) de qualquer item de 'grupo_b', e vice-versa. Regras com
+# 'relaxavel_ate' são flexíveis: se o mapa não sai com elas, o gerador pode baixar
+# o mínimo, um passo por vez, até esse valor (ver relaxar_regras). As demais nunca mudam.
+REGRAS_DISTANCIA = [
+    {   # Itens não podem nascer colados no jogador
+        'nome': 'distancia_jogador',
+        'grupo_a': {'JOGADOR'},
+        'grupo_b': {'CHAVE', 'ESPADA', 'BAU', 'INIMIGO', 'ARMADILHA'},
+        'minimo': 3,
+    },
+    {   # Chave e espada não podem estar próximas
+        'nome': 'chave_espada',
+        'grupo_a': {'CHAVE'},
+        'grupo_b': {'ESPADA'},
+        'minimo': 5,
+        'relaxavel_ate': 3,
+    },
+    {   # Baús, chave e espada devem estar razoavelmente distantes entre si
+        'nome': 'espacamento_baus',
+        'grupo_a': {'BAU', 'CHAVE', 'ESPADA'},
+        'grupo_b': {'BAU', 'CHAVE', 'ESPADA'},
+        'minimo': 3,
+        'relaxavel_ate': 2,
+    },
+]
+
+
+def categoria(tipo_item):
+    """Converte o tipo do item no contexto ('BAU_3', 'INIMIGO_0', 'CHAVE'...) na
+    categoria usada pelas regras ('BAU', 'INIMIGO', 'CHAVE'...)."""
+    return tipo_item.split('_', 1)[0]
+
+
+def tabela_minimos(regras=REGRAS_DISTANCIA):
+    """Monta {(categoria_a, categoria_b): (minimo, nome_da_regra)} com a maior
+    distância exigida para cada par (as regras valem nos dois sentidos)."""
+    tabela = {}
+    for regra in regras:
+        for a in regra['grupo_a']:
+            for b in regra['grupo_b']:
+                for par in ((a, b), (b, a)):
+                    if par not in tabela or regra['minimo'] > tabela[par][0]:
+                        tabela[par] = (regra['minimo'], regra['nome'])
+    return tabela
+
+
+_MINIMOS = tabela_minimos()
+
+
+def assinatura_regras(regras=REGRAS_DISTANCIA):
+    """Resumo (hex) do conjunto de regras, independente da ordem das regras e dos
+    grupos. Mapas gerados com regras diferentes nunca compartilham uma entrada de cache."""
+    canonico = sorted((regra['nome'], sorted(regra['grupo_a']), sorted(regra['grupo_b']), regra['minimo'])
+                      for regra in regras)
+    return hashlib.sha1(json.dumps(canonico).encode('utf-8')).hexdigest()
+
+
+def relaxar_regras(regras=REGRAS_DISTANCIA):
+    """Cópia das regras com o mínimo de cada regra flexível um passo menor (sem
+    passar de 'relaxavel_ate'), ou None se nenhuma regra pode ser relaxada mais."""
+    relaxadas = []
+    mudou = False
+    for regra in regras:
+        limite = regra.get('relaxavel_ate')
+        if limite is not None and regra['minimo'] > limite:
+            regra = dict(regra, minimo=regra['minimo'] - 1)
+            mudou = True
+        relaxadas.append(regra)
+    return relaxadas if mudou else None
+
+
+def eh_distribuicao_valida(contexto, tipo_item_atual, pos_atual, minimos=_MINIMOS):
+    """Verifica se a distância entre o item atual e os demais itens no contexto respeita
+    as regras de distância. Percorre o contexto inteiro; serve para checagens avulsas
+    (dentro da busca usa-se o VerificadorDistancias)."""
+    cat_atual = categoria(tipo_item_atual)
+    for tipo, pos in contexto.items():
+        if tipo == tipo_item_atual:
+            continue
+        regra = minimos.get((cat_atual, categoria(tipo)))
+        if regra and abs(pos_atual[0] - pos[0]) + abs(pos_atual[1] - pos[1]) < regra[0]:
+            return False
+    return True
+
+
+# ========== VERIFICADOR COM TABELA ESPACIAL ==========
+
+class VerificadorDistancias:
+    """Guarda os itens posicionados em baldes quadrados e checa as regras de distância
+    olhando só os baldes vizinhos da célula candidata.
+
+    O lado do balde é a maior distância proibida (minimo - 1), então todo item que
+    pode violar uma regra está no balde da célula ou em um dos 8 vizinhos. Assim o
+    custo de uma checagem não depende de quantos itens já foram posicionados."""
+
+    def __init__(self, regras=REGRAS_DISTANCIA):
+        self.minimos = tabela_minimos(regras)
+        self.lado = max([regra['minimo'] - 1 for regra in regras] + [1])
+        # Para cada categoria, as categorias que ela precisa consultar
+        self.alvos = {}
+        for (a, b), (minimo, nome) in self.minimos.items():
+            self.alvos.setdefault(a, []).append((b, minimo, nome))
+        self.baldes = {}  # categoria -> {(balde_linha, balde_coluna): [posições]}
+
+    def _balde(self, pos):
+        return pos[0] // self.lado, pos[1] // self.lado
+
+    def conflito(self, cat, pos):
+        """Retorna o nome da primeira regra violada se um item da categoria 'cat' fosse
+        colocado em 'pos', ou None se a posição respeita todas as regras."""
+        r, c = pos
+        br, bc = r // self.lado, c // self.lado
+        for alvo, minimo, nome in self.alvos.get(cat, ()):
+            baldes = self.baldes.get(alvo)
+            if not baldes:
+                continue
+            for i in (br - 1, br, br + 1):
+                for j in (bc - 1, bc, bc + 1):
+                    for outro in baldes.get((i, j), ()):
+                        if abs(r - outro[0]) + abs(c - outro[1]) < minimo:
+                            return nome
+        return None
+
+    def adicionar(self, cat, pos):
+        self.baldes.setdefault(cat, {}).setdefault(self._balde(pos), []).append(pos)
+
+    def remover(self, cat, pos):
+        self.baldes[cat][self._balde(pos)].remove(pos)
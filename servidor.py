@@ -0,0 +1,280 @@
+# tp_IA/servidor.py
+# Servidor de partidas com asyncio: um processo mantém muitas sessões
+# independentes, cada uma com o seu EstadoJogo (mapa, jogador, baús da chave e da
+# espada), e aplica os movimentos com as regras de estado.py, sem tela e sem
+# efeitos colaterais. Os mapas novos vêm de um conjunto de processos geradores
+# compartilhado por todas as sessões, então gerar um mapa não trava o laço.
+#
+# Protocolo (socket local, TCP em 127.0.0.1 ou Unix): cada mensagem começa com um
+# byte de tipo e tem tamanho fixo por tipo; só o mapa de CRIADA vem depois do
+# cabeçalho, com linhas * colunas bytes (códigos de Celula). Inteiros little-endian.
+#   CRIAR      tipo, pedido (u32, escolhido pelo cliente), linhas, colunas, baús,
+#              inimigos (u16), semente (i64, -1 = aleatória)
+#   MOVER      tipo, sessão (u32), direção (u8, índice em estado.DIRECOES)
+#   DESFAZER   tipo, sessão (u32)
+#   ENCERRAR   tipo, sessão (u32)
+# Respostas:
+#   CRIADA     tipo, pedido, sessão (u32), linhas, colunas (u16), semente (i64), células
+#   MOVIDA     tipo, sessão (u32), evento (u8), vida (i8), situação (u8), durabilidade (u8)
+#   ENCERRADA  tipo, sessão (u32)
+#   ERRO       tipo, sessão (u32, o pedido em CRIAR), tipo do pedido (u8), código (u8)
+# A situação junta tem_chave (bit 0), tem_espada (bit 1), vitória (bit 2) e
+# derrota (bit 3). O evento basta para o cliente aplicar o movimento no seu mapa
+# (como estado.EstadoJogo.desfazer faz ao contrário); em DESFAZER ele é o evento
+# desfeito, ou SEM_EVENTO se não havia o que desfazer.
+#
+# As sessões pertencem à conexão que as criou e somem quando ela fecha; os mapas
+# que ela ainda esperava deixam de ser gerados (cada conexão tem uma posição em um
+# contador compartilhado com os processos geradores, como em portfolio.py). CRIAR
+# com itens que não cabem no mapa recebe PEDIDO_INVALIDO sem passar pelo gerador.
+# A memória de cada sessão é limitada: o mapa tem no máximo LADO_MAXIMO de lado e
+# o log guarda só os últimos LIMITE_LOG movimentos (o quanto se pode desfazer).
+#
+# Exemplo:
+#   python servidor.py --porta 8765 --processos 2
+#   python carga.py --porta 8765 --sessoes 2000 --movimentos 200
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from estado import DIRECOES, EstadoJogo
+from gerador import (DIFICULDADE_MAXIMA, ErroGeracaoImpossivel, GeracaoCancelada, cabe_no_mapa,
+                     dificuldade_minima, gerar_mapa_com_backtracking)
+
+# Tipos de mensagem
+CRIAR, MOVER, DESFAZER, ENCERRAR = 1, 2, 3, 4
+CRIADA, MOVIDA, ENCERRADA, ERRO = 0x81, 0x82, 0x83, 0xFF
+
+# Formato de cada mensagem, sem o byte de tipo
+PEDIDOS = {
+    CRIAR: struct.Struct('<I4Hq'),
+    MOVER: struct.Struct('<IB'),
+    DESFAZER: struct.Struct('<I'),
+    ENCERRAR: struct.Struct('<I'),
+}
+RESPOSTAS = {
+    CRIADA: struct.Struct('<IIHHq'),
+    MOVIDA: struct.Struct('<IBbBB'),
+    ENCERRADA: struct.Struct('<I'),
+    ERRO: struct.Struct('<IBB'),
+}
+
+# Códigos de ERRO
+SESSAO_DESCONHECIDA = 1
+GERACAO_IMPOSSIVEL = 2
+LIMITE_SESSOES = 3
+PEDIDO_INVALIDO = 4
+
+SEM_EVENTO = 0xFF  # DESFAZER sem movimento para desfazer
+
+# Bits do campo situação de MOVIDA
+TEM_CHAVE, TEM_ESPADA, VITORIA, DERROTA = 1, 2, 4, 8
+
+LADO_MAXIMO = 64
+LIMITE_LOG = 4096
+MAXIMO_SESSOES = 20000
+MAXIMO_CONEXOES = 1024  # conexões com posição no contador (as demais não cancelam os seus mapas)
+BUFFER_ESCRITA = 1 << 16  # bytes pendentes na conexão antes de esperar o cliente ler
+
+
+def empacotar(tipo, *valores):
+    """Bytes de uma mensagem: o tipo seguido dos valores no formato do tipo."""
+    formato = PEDIDOS[tipo] if tipo in PEDIDOS else RESPOSTAS[tipo]
+    return bytes((tipo,)) + formato.pack(*valores)
+
+
+async def ler_mensagem(leitor, formatos):
+    """Lê uma mensagem de 'leitor'. Retorna (tipo, valores); levanta
+    asyncio.IncompleteReadError quando a conexão fecha e ValueError com um tipo
+    desconhecido."""
+    tipo = (await leitor.readexactly(1))[0]
+    formato = formatos.get(tipo)
+    if formato is None:
+        raise ValueError(f"Tipo de mensagem desconhecido: {tipo}")
+    return tipo, formato.unpack(await leitor.readexactly(formato.size))
+
+
+def situacao(estado):
+    """Campo situação de MOVIDA para o estado."""
+    fim = estado.fim
+    return (TEM_CHAVE * estado.tem_chave | TEM_ESPADA * estado.tem_espada
+            | (VITORIA if fim == 'vitoria' else 0) | (DERROTA if fim == 'derrota' else 0))
+
+
+_conexoes = None  # contador de cada posição de conexão, em cada processo gerador
+
+
+def _iniciar_processo(conexoes):
+    global _conexoes
+    _conexoes = conexoes
+
+
+def _gerar_mapa(linhas, colunas, num_baus, num_inimigos, semente, posicao=None, valor=0):
+    """Executado nos processos geradores. Retorna o resultado do gerador, ou None se
+    a configuração não tiver mapa válido ou se a conexão do pedido fechou (o
+    contador na 'posicao' dela mudou de 'valor')."""
+    parar = None
+    if posicao is not None:
+        def parar():
+            return _conexoes[posicao] != valor
+    try:
+        return gerar_mapa_com_backtracking(linhas, colunas, num_baus, num_inimigos, verboso=False,
+                                           semente=semente, parar=parar)
+    except (ErroGeracaoImpossivel, GeracaoCancelada):
+        return None
+
+
+# ========== SERVIDOR ==========
+
+class ServidorJogo:
+    """Sessões de jogo servidas por asyncio. 'processos' é o número de processos do
+    conjunto de geradores de mapas."""
+
+    def __init__(self, processos=None, maximo_sessoes=MAXIMO_SESSOES, limite_log=LIMITE_LOG, rng=None):
+        # Cada conexão aberta ocupa uma posição; fechar a conexão avança o contador
+        # dela e os mapas pedidos por ela desistem (só o processo principal escreve)
+        self.conexoes = multiprocessing.RawArray('L', MAXIMO_CONEXOES)
+        self.posicoes_livres = list(range(MAXIMO_CONEXOES - 1, -1, -1))
+        self.executor = ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo,
+                                            initargs=(self.conexoes,))
+        self.maximo_sessoes = maximo_sessoes
+        self.limite_log = limite_log
+        self.rng = rng or random.Random()
+        self.sessoes = {}  # id -> EstadoJogo
+        self.proximo_id = 1
+        self.movimentos = 0
+
+    async def _criar(self, escritor, donas, posicao, pedido, linhas, colunas, num_baus, num_inimigos, semente):
+        if not (3 <= linhas <= LADO_MAXIMO and 3 <= colunas <= LADO_MAXIMO) \
+                or not cabe_no_mapa(linhas, colunas, num_baus, num_inimigos) \
+                or dificuldade_minima(linhas, colunas, num_baus, num_inimigos) > DIFICULDADE_MAXIMA:
+            escritor.write(empacotar(ERRO, pedido, CRIAR, PEDIDO_INVALIDO))
+            return
+        if len(self.sessoes) >= self.maximo_sessoes:
+            escritor.write(empacotar(ERRO, pedido, CRIAR, LIMITE_SESSOES))
+            return
+        if semente < 0:
+            semente = self.rng.randrange(2 ** 31)
+        valor = self.conexoes[posicao] if posicao is not None else 0
+        resultado = await asyncio.get_running_loop().run_in_executor(
+            self.executor, _gerar_mapa, linhas, colunas, num_baus, num_inimigos, semente, posicao, valor)
+        if resultado is None:
+            escritor.write(empacotar(ERRO, pedido, CRIAR, GERACAO_IMPOSSIVEL))
+            return
+        if escritor.is_closing():
+            return  # o cliente foi embora enquanto o mapa era gerado
+        sessao = self.proximo_id
+        self.proximo_id += 1
+        estado = EstadoJogo(*resultado)
+        self.sessoes[sessao] = estado
+        donas.add(sessao)
+        escritor.write(empacotar(CRIADA, pedido, sessao, linhas, colunas, semente) + bytes(estado.mapa.celulas))
+
+    def _mover(self, sessao, direcao):
+        estado = self.sessoes[sessao]
+        evento, _alteradas = estado.mover(*DIRECOES[direcao])
+        log = estado.log
+        if len(log) > 2 * self.limite_log:
+            del log[:len(log) - self.limite_log]  # só os últimos movimentos podem ser desfeitos
+        self.movimentos += 1
+        return empacotar(MOVIDA, sessao, evento, estado.vida, situacao(estado), estado.vida_espada)
+
+    def _desfazer(self, sessao):
+        estado = self.sessoes[sessao]
+        evento, _alteradas = estado.desfazer()
+        return empacotar(MOVIDA, sessao, SEM_EVENTO if evento is None else evento, estado.vida,
+                         situacao(estado), estado.vida_espada)
+
+    async def atender(self, leitor, escritor):
+        """Trata uma conexão: lê as mensagens em sequência e responde. CRIAR espera o
+        gerador em uma tarefa própria, para os movimentos de outras sessões da mesma
+        conexão não ficarem parados atrás dele."""
+        donas = set()  # sessões criadas por esta conexão
+        criacoes = set()
+        posicao = self.posicoes_livres.pop() if self.posicoes_livres else None
+        try:
+            while True:
+                try:
+                    tipo, valores = await ler_mensagem(leitor, PEDIDOS)
+                except ValueError:
+                    escritor.write(empacotar(ERRO, 0, 0, PEDIDO_INVALIDO))
+                    break  # sem saber o tamanho da mensagem não há como continuar lendo
+                if tipo == CRIAR:
+                    tarefa = asyncio.create_task(self._criar(escritor, donas, posicao, *valores))
+                    criacoes.add(tarefa)
+                    tarefa.add_done_callback(criacoes.discard)
+                    continue
+                sessao = valores[0]
+                if sessao not in donas:
+                    escritor.write(empacotar(ERRO, sessao, tipo, SESSAO_DESCONHECIDA))
+                elif tipo == MOVER:
+                    if valores[1] >= len(DIRECOES):
+                        escritor.write(empacotar(ERRO, sessao, tipo, PEDIDO_INVALIDO))
+                    else:
+                        escritor.write(self._mover(sessao, valores[1]))
+                elif tipo == DESFAZER:
+                    escritor.write(self._desfazer(sessao))
+                else:
+                    donas.discard(sessao)
+                    del self.sessoes[sessao]
+                    escritor.write(empacotar(ENCERRADA, sessao))
+                if escritor.transport.get_write_buffer_size() > BUFFER_ESCRITA:
+                    await escritor.drain()  # o cliente não está lendo: espera antes de seguir
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if posicao is not None:
+                self.conexoes[posicao] += 1  # os mapas ainda pedidos por esta conexão desistem
+                self.posicoes_livres.append(posicao)
+            for tarefa in criacoes:
+                tarefa.cancel()
+            for sessao in donas:
+                self.sessoes.pop(sessao, None)
+            escritor.close()
+
+    async def iniciar(self, porta=None, caminho_unix=None):
+        """Abre o socket (Unix se 'caminho_unix', senão TCP em 127.0.0.1:porta)."""
+        if caminho_unix:
+            return await asyncio.start_unix_server(self.atender, path=caminho_unix)
+        return await asyncio.start_server(self.atender, host='127.0.0.1', port=porta)
+
+    def encerrar(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _servir(args):
+    servidor = ServidorJogo(processos=args.processos, maximo_sessoes=args.max_sessoes)
+    socket = await servidor.iniciar(args.porta, args.unix)
+    print(f"Servidor ouvindo em {args.unix or f'127.0.0.1:{args.porta}'}")
+    try:
+        async with socket:
+            while True:
+                await asyncio.sleep(args.intervalo)
+                print(f"{len(servidor.sessoes)} sessões, {servidor.movimentos} movimentos")
+    finally:
+        servidor.encerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de partidas com várias sessões simultâneas.")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="caminho de um socket Unix (em vez de TCP)")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="processos geradores de mapas (padrão: número de CPUs)")
+    parser.add_argument("--max-sessoes", type=int, default=MAXIMO_SESSOES)
+    parser.add_argument("--intervalo", type=float, default=10.0, help="segundos entre as linhas de resumo")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_servir(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
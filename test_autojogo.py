@@ -0,0 +1,48 @@
+# tp_IA/test_autojogo.py
+# Testes do jogador automático com mapas pequenos montados à mão (python -m pytest).
+
+from autojogo import eh_ganhavel, jogar, planejar
+from estado import EstadoJogo, Evento, decodificar_evento
+from gerador import criar_jogador
+from grade import Grade
+
+
+def _estado(linhas, jogador, bau_com_chave, bau_com_espada):
+    mapa = Grade.de_lista([linha.split() for linha in linhas])
+    return EstadoJogo(mapa, criar_jogador(jogador), bau_com_chave, bau_com_espada)
+
+
+def test_alvo_alcancado_no_caminho_de_outro():
+    # O caminho até a espada abre o baú da chave antes de ele ser o alvo
+    linhas = ['P J P P P',
+              'P B B B P',
+              'P B T I P',
+              'P T B B P',
+              'P P S P P']
+    mapa = Grade.de_lista([linha.split() for linha in linhas])
+    assert eh_ganhavel(mapa, criar_jogador((0, 1)), (1, 3), (2, 1))
+
+
+def test_mapa_que_exige_eliminar_inimigo():
+    linhas = ['P J P P P',
+              'P V B P P',
+              'P I P P P',
+              'P B P P P',
+              'P S P P P']
+    estado = _estado(linhas, (0, 1), (3, 1), (1, 2))
+    assert planejar(estado) == [(2, 1)]
+    assert jogar(estado)
+    assert Evento.INIMIGO_DERROTADO in [decodificar_evento(byte)[0] for byte in estado.log]
+
+
+def test_mapa_sem_vitoria_possivel():
+    # Chave e espada atrás do único inimigo: sem espada não há como passar
+    linhas = ['P J P P P',
+              'P V P P P',
+              'P I P P P',
+              'P B B P P',
+              'P S P P P']
+    estado = _estado(linhas, (0, 1), (3, 1), (3, 2))
+    assert planejar(estado) is None
+    assert not jogar(estado)
+    assert not estado.log
@@ -0,0 +1,254 @@
+# tp_IA/validacao_lote.py
+# Validação e pontuação de muitos mapas de uma vez com NumPy (dependência
+# opcional, só usada aqui). Os mapas de mesmo tamanho são empilhados em um array
+# (mapas, linhas, colunas) e todas as checagens são feitas sobre o lote inteiro:
+#   - alcançabilidade e comprimento dos caminhos jogador -> chave -> saída, por
+#     busca em largura feita como dilatações sucessivas das fronteiras;
+#   - regras de distância (restricoes.REGRAS_DISTANCIA), com a matriz de
+#     distâncias de Manhattan entre todos os pares de itens de cada mapa;
+#   - espalhamento dos itens pelos quatro quadrantes do mapa.
+#
+# Exemplo (arquivo gerado por lote.py):
+#   python validacao_lote.py mapas.jsonl --saida relatorio.jsonl
+
+import argparse
+import json
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # o resto do projeto não precisa do numpy
+    np = None
+
+from grade import PASSAVEIS, Celula, Grade
+from restricoes import REGRAS_DISTANCIA, tabela_minimos
+
+# Categorias das regras de distância, na ordem usada nos arrays
+CATEGORIAS = ('JOGADOR', 'CHAVE', 'ESPADA', 'BAU', 'INIMIGO', 'ARMADILHA')
+_ID = {nome: i for i, nome in enumerate(CATEGORIAS)}
+
+# Categoria de cada código de célula (-1: não é item). Chave e espada são baús e
+# recebem a categoria própria a partir das posições informadas.
+_CATEGORIA_POR_CODIGO = [-1] * len(Celula)
+_CATEGORIA_POR_CODIGO[Celula.JOGADOR] = _ID['JOGADOR']
+_CATEGORIA_POR_CODIGO[Celula.BAU] = _ID['BAU']
+_CATEGORIA_POR_CODIGO[Celula.INIMIGO] = _ID['INIMIGO']
+_CATEGORIA_POR_CODIGO[Celula.ARMADILHA] = _ID['ARMADILHA']
+_CATEGORIA_POR_CODIGO[Celula.ARMADILHA_ATIVA] = _ID['ARMADILHA']
+
+
+def _exigir_numpy():
+    if np is None:
+        raise ImportError("validacao_lote precisa do numpy (pip install numpy)")
+
+
+def _tabelas_regras(regras):
+    """Matrizes (categoria x categoria) com a distância mínima e o índice da regra."""
+    n = len(CATEGORIAS)
+    minimo = np.zeros((n, n), np.int16)
+    regra = np.full((n, n), -1, np.int16)
+    nomes = [r['nome'] for r in regras]
+    for (a, b), (valor, nome) in tabela_minimos(regras).items():
+        if a in _ID and b in _ID:
+            minimo[_ID[a], _ID[b]] = valor
+            regra[_ID[a], _ID[b]] = nomes.index(nome)
+    return minimo, regra, nomes
+
+
+# ========== BUSCA EM LARGURA VETORIZADA ==========
+
+def distancias_em_lote(passavel, origens, alvos):
+    """Distância (em passos) da origem até a célula alvo de cada mapa, andando só por
+    células passáveis; -1 se o alvo não é alcançado. 'passavel' e 'origens' são arrays
+    booleanos (mapas, linhas, colunas) e 'alvos' tem uma linha (linha, coluna) por mapa.
+
+    Cada iteração avança a fronteira de todos os mapas em um passo (dilatação com
+    vizinhança de 4). Um mapa sai das iterações assim que alcança o alvo ou quando a
+    sua fronteira acaba, então o custo acompanha o caminho mais longo do lote."""
+    n = len(passavel)
+    distancias = np.full(n, -1, np.int32)
+    ativos = np.arange(n)
+    alvo_linha, alvo_coluna = alvos[:, 0], alvos[:, 1]
+    fronteira = origens.copy()
+    alcancado = fronteira.copy()
+    livres = passavel
+    vizinhos = np.empty_like(fronteira)
+    passo = 0
+    while len(ativos):
+        chegou = fronteira[np.arange(len(ativos)), alvo_linha, alvo_coluna]
+        distancias[ativos[chegou]] = passo
+        continua = ~chegou & fronteira.any(axis=(1, 2))
+        if not continua.all():
+            ativos, fronteira, alcancado, livres = (ativos[continua], fronteira[continua],
+                                                    alcancado[continua], livres[continua])
+            alvo_linha, alvo_coluna = alvo_linha[continua], alvo_coluna[continua]
+            vizinhos = np.empty_like(fronteira)
+            if not len(ativos):
+                break
+        passo += 1
+        vizinhos[:] = False
+        vizinhos[:, 1:, :] |= fronteira[:, :-1, :]
+        vizinhos[:, :-1, :] |= fronteira[:, 1:, :]
+        vizinhos[:, :, 1:] |= fronteira[:, :, :-1]
+        vizinhos[:, :, :-1] |= fronteira[:, :, 1:]
+        np.logical_and(vizinhos, livres, out=fronteira)
+        fronteira &= ~alcancado
+        alcancado |= fronteira
+    return distancias
+
+
+# ========== RELATÓRIO ==========
+
+class RelatorioLote:
+    """Resultado da validação de um lote: arrays com uma posição por mapa, na ordem
+    em que os mapas foram passados. relatorio[i] devolve o resumo do mapa i."""
+
+    def __init__(self, n, nomes_regras):
+        self.nomes_regras = nomes_regras
+        self.caminho_jogador_chave = np.full(n, -1, np.int32)  # -1: chave inalcançável
+        self.caminho_chave_saida = np.full(n, -1, np.int32)    # -1: saída inalcançável
+        self.violacoes = np.zeros((n, len(nomes_regras)), np.int32)  # pares que violam cada regra
+        self.quadrantes = np.zeros((n, 4), np.int32)  # itens por quadrante (NO, NE, SO, SE)
+        self.espalhamento = np.zeros(n)  # entropia normalizada dos quadrantes (0 a 1)
+
+    def __len__(self):
+        return len(self.espalhamento)
+
+    @property
+    def alcancavel(self):
+        return (self.caminho_jogador_chave >= 0) & (self.caminho_chave_saida >= 0)
+
+    @property
+    def valido(self):
+        """Mapas jogáveis que respeitam todas as regras de distância."""
+        return self.alcancavel & (self.violacoes.sum(axis=1) == 0)
+
+    def __getitem__(self, i):
+        return {
+            "valido": bool(self.valido[i]),
+            "caminho_jogador_chave": int(self.caminho_jogador_chave[i]),
+            "caminho_chave_saida": int(self.caminho_chave_saida[i]),
+            "violacoes": {nome: int(v) for nome, v in zip(self.nomes_regras, self.violacoes[i]) if v},
+            "quadrantes": self.quadrantes[i].tolist(),
+            "espalhamento": round(float(self.espalhamento[i]), 4),
+        }
+
+
+def _validar_mesmo_tamanho(relatorio, indices, mapas, chaves, espadas, tabelas):
+    """Valida mapas de mesmo tamanho e grava os resultados nas posições 'indices'."""
+    minimo, regra, nomes = tabelas
+    n = len(indices)
+    linhas, colunas = mapas[0].linhas, mapas[0].colunas
+    codigos = np.frombuffer(b''.join(bytes(m.celulas) for m in mapas), np.uint8).reshape(n, linhas, colunas)
+    lote = np.arange(n)
+    chaves = np.asarray(chaves, np.intp).reshape(n, 2)
+    espadas = np.asarray(espadas, np.intp).reshape(n, 2)
+
+    # Caminhos: distância do jogador até a chave e da saída até a chave
+    passavel = np.isin(codigos, list(PASSAVEIS))
+    relatorio.caminho_jogador_chave[indices] = distancias_em_lote(passavel, codigos == Celula.JOGADOR, chaves)
+    relatorio.caminho_chave_saida[indices] = distancias_em_lote(passavel, codigos == Celula.SAIDA, chaves)
+
+    # Itens de cada mapa em arrays preenchidos até o maior número de itens do lote
+    categorias = np.asarray(_CATEGORIA_POR_CODIGO, np.int16)[codigos]
+    categorias[lote, chaves[:, 0], chaves[:, 1]] = _ID['CHAVE']
+    categorias[lote, espadas[:, 0], espadas[:, 1]] = _ID['ESPADA']
+    k, r, c = np.nonzero(categorias >= 0)
+    por_mapa = np.bincount(k, minlength=n)
+    if not len(k):
+        return
+    ordem = np.arange(len(k)) - np.repeat(np.cumsum(por_mapa) - por_mapa, por_mapa)
+    largura = por_mapa.max()
+    presente = np.zeros((n, largura), bool)
+    presente[k, ordem] = True
+    item_linha = np.zeros((n, largura), np.int16)
+    item_coluna = np.zeros((n, largura), np.int16)
+    item_cat = np.zeros((n, largura), np.int16)
+    item_linha[k, ordem] = r
+    item_coluna[k, ordem] = c
+    item_cat[k, ordem] = categorias[k, r, c]
+
+    # Matriz de distâncias entre todos os pares de itens, comparada com as regras
+    distancia = np.abs(item_linha[:, :, None] - item_linha[:, None, :]) + \
+        np.abs(item_coluna[:, :, None] - item_coluna[:, None, :])
+    par_cat = (item_cat[:, :, None], item_cat[:, None, :])
+    viola = (distancia < minimo[par_cat]) & presente[:, :, None] & presente[:, None, :]
+    viola &= np.triu(np.ones((largura, largura), bool), 1)  # cada par uma vez só
+    regra_par = regra[par_cat]
+    for indice_regra in range(len(nomes)):
+        relatorio.violacoes[indices, indice_regra] = (viola & (regra_par == indice_regra)).sum(axis=(1, 2))
+
+    # Espalhamento: itens (menos o jogador) por quadrante e entropia normalizada
+    eh_item = categorias[k, r, c] != _ID['JOGADOR']
+    quadrante = (r >= linhas // 2) * 2 + (c >= colunas // 2)
+    contagem = np.bincount(k[eh_item] * 4 + quadrante[eh_item], minlength=n * 4).reshape(n, 4)
+    relatorio.quadrantes[indices] = contagem
+    total = np.maximum(contagem.sum(axis=1, keepdims=True), 1)
+    p = contagem / total
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entropia = -np.where(p > 0, p * np.log(p), 0.0).sum(axis=1)
+    relatorio.espalhamento[indices] = entropia / np.log(4)
+
+
+def validar_lote(mapas, chaves, espadas, regras=REGRAS_DISTANCIA):
+    """Valida uma lista de mapas (Grade ou lista de listas de símbolos). 'chaves' e
+    'espadas' são as posições dos baús com a chave e com a espada de cada mapa.
+    Mapas de tamanhos diferentes são agrupados por tamanho. Retorna um RelatorioLote."""
+    _exigir_numpy()
+    mapas = [m if isinstance(m, Grade) else Grade.de_lista(m) for m in mapas]
+    tabelas = _tabelas_regras(regras)
+    relatorio = RelatorioLote(len(mapas), tabelas[2])
+    grupos = {}
+    for i, mapa in enumerate(mapas):
+        grupos.setdefault((mapa.linhas, mapa.colunas), []).append(i)
+    for indices in grupos.values():
+        _validar_mesmo_tamanho(relatorio, np.asarray(indices), [mapas[i] for i in indices],
+                               [chaves[i] for i in indices], [espadas[i] for i in indices], tabelas)
+    return relatorio
+
+
+# ========== LINHA DE COMANDO ==========
+
+def ler_registros(caminho):
+    """Lê os mapas de um arquivo JSON por linha no formato de lote.py."""
+    with open(caminho, encoding="utf-8") as arquivo:
+        return [json.loads(linha) for linha in arquivo if linha.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Valida e pontua em lote os mapas gerados por lote.py.")
+    parser.add_argument("entrada", help="arquivo JSON por linha gerado por lote.py")
+    parser.add_argument("--saida", help="grava um relatório por mapa (JSON por linha)")
+    args = parser.parse_args(argv)
+
+    registros = ler_registros(args.entrada)
+    mapas = [Grade.de_lista(r["mapa"]) for r in registros]
+    inicio = time.perf_counter()
+    relatorio = validar_lote(mapas, [r["bau_com_chave"] for r in registros],
+                             [r["bau_com_espada"] for r in registros])
+    duracao = time.perf_counter() - inicio
+
+    validos = int(relatorio.valido.sum())
+    print(f"{len(relatorio)} mapas validados em {duracao:.3f} s "
+          f"({len(relatorio) / duracao if duracao else 0.0:.0f} mapas/s)")
+    print(f"válidos: {validos}, inalcançáveis: {int((~relatorio.alcancavel).sum())}, "
+          f"com violação de distância: {int((relatorio.violacoes.sum(axis=1) > 0).sum())}")
+    if len(relatorio):
+        alcancavel = relatorio.alcancavel
+        if alcancavel.any():
+            caminho = relatorio.caminho_jogador_chave[alcancavel] + relatorio.caminho_chave_saida[alcancavel]
+            print(f"caminho jogador -> chave -> saída: média {caminho.mean():.1f}, mín {caminho.min()}, "
+                  f"máx {caminho.max()}")
+        print(f"espalhamento médio: {relatorio.espalhamento.mean():.3f}")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as saida:
+            for registro, i in zip(registros, range(len(relatorio))):
+                saida.write(json.dumps({"semente": registro.get("semente"), **relatorio[i]},
+                                       ensure_ascii=False) + "\n")
+    return 0 if validos == len(relatorio) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())